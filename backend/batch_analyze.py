@@ -0,0 +1,339 @@
+"""
+Offline batch analysis of stored resumes.
+
+Scores every PDF/DOCX resume in a directory (recursively) or a .zip archive against one or
+more job titles. It uses the API's own text extraction, ATS scoring and skill gap analysis
+across a process pool. Results are appended to CSV, JSONL or Parquet in batches. After each
+batch is written, the finished files are recorded in a checkpoint. An interrupted run picks up
+where it stopped when started again with the same arguments:
+
+    python batch_analyze.py resumes/ --output scores.csv --job-title "software engineer"
+    python batch_analyze.py resumes.zip --output scores.parquet --job-title "data scientist" --workers 8
+
+Resumes that could not be read completely because OCR was busy, timed out or failed on a page
+are not written or checkpointed; the run reports them and the next run retries them. Each
+worker runs OCR itself rather than starting its own OCR process pool.
+
+Parquet output is a directory of part files, one per batch, readable with
+pandas.read_parquet(path). A checkpoint is tied to the keyword and skill taxonomy it was
+written with. After a taxonomy change, use --restart to rescore everything.
+"""
+import argparse
+import csv
+import hashlib
+import io
+import json
+import multiprocessing
+import os
+import sys
+import time
+import zipfile
+from concurrent.futures import FIRST_COMPLETED, Future, ProcessPoolExecutor, wait
+from typing import Dict, Iterator, List, Tuple
+
+BACKEND_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, BACKEND_DIR)
+
+import main  # noqa: E402
+
+OUTPUT_FORMATS = ("csv", "jsonl", "parquet")
+RESULT_FIELDS = [
+    "id", "job_title", "ats_score", "keyword_score", "format_score", "readability_score",
+    "structure_score", "keywords_matched", "total_keywords_checked", "skill_match_percentage",
+    "existing_skills", "missing_skills", "characters", "elapsed_ms", "error",
+]
+
+# Archives opened by this worker process, reused across items
+_open_archives: Dict[str, zipfile.ZipFile] = {}
+
+
+class _InlineOCRPool:
+    """Runs OCR in the calling worker; the batch pool already has one process per core"""
+
+    def submit(self, fn, *args) -> Future:
+        future = Future()
+        try:
+            future.set_result(fn(*args))
+        except Exception as e:
+            future.set_exception(e)
+        return future
+
+    def shutdown(self, wait: bool = True, cancel_futures: bool = False) -> None:
+        pass
+
+
+def init_worker() -> None:
+    """Process pool initializer: keep N batch workers from starting N OCR pools"""
+    main._ocr_process_pool = _InlineOCRPool()
+
+
+def taxonomy_version() -> str:
+    """Hash of the keyword and skill tables that scores depend on"""
+    taxonomy = [main.ATS_KEYWORDS, main.JOB_SKILLS_MAP, main.TECHNICAL_SKILLS, main.SKILL_ALIASES, main.SKILL_IMPLICATIONS]
+    return hashlib.sha1(json.dumps(taxonomy, sort_keys=True, default=list).encode()).hexdigest()[:12]
+
+
+def list_items(source: str) -> Iterator[Tuple[str, str]]:
+    """(id, member) pairs in a stable order; member is None for plain files"""
+    if zipfile.is_zipfile(source):
+        with zipfile.ZipFile(source) as archive:
+            for name in sorted(archive.namelist()):
+                if os.path.splitext(name)[1].lower() in main.SUPPORTED_UPLOAD_EXTENSIONS:
+                    yield name, name
+        return
+    for root, dirs, files in os.walk(source):
+        dirs.sort()
+        for name in sorted(files):
+            if os.path.splitext(name)[1].lower() in main.SUPPORTED_UPLOAD_EXTENSIONS:
+                path = os.path.join(root, name)
+                yield os.path.relpath(path, source), None
+
+
+def _extract_text(source: str, item_id: str, member: str) -> str:
+    if member is None:
+        return main.extract_text_from_file(os.path.join(source, item_id))
+    archive = _open_archives.get(source)
+    if archive is None:
+        archive = _open_archives[source] = zipfile.ZipFile(source)
+    # Archive members are not seekable; the parsers need a seekable stream
+    stream = io.BytesIO(archive.read(member))
+    return main.extract_text_from_stream(stream, os.path.splitext(member)[1].lower())
+
+
+def analyze_item(source: str, item_id: str, member: str, job_titles: List[str]) -> Tuple[List[dict], bool]:
+    """
+    (rows, complete) for one resume, one row per job title; runs in the process pool.
+    complete is False when OCR was busy or missed pages, so the resume should be retried.
+    """
+    start = time.perf_counter()
+    try:
+        text = _extract_text(source, item_id, member)
+    except main.OCRBusyError as e:
+        return [{"id": item_id, "job_title": job_title, "error": f"{type(e).__name__}: {e}"} for job_title in job_titles], False
+    except Exception as e:
+        return [{"id": item_id, "job_title": job_title, "error": f"{type(e).__name__}: {e}"} for job_title in job_titles], True
+    if isinstance(text, main.PartialText):
+        return [{"id": item_id, "job_title": job_title, "error": "OCR failed on some pages"} for job_title in job_titles], False
+
+    rows = []
+    for job_title in job_titles:
+        row = {"id": item_id, "job_title": job_title, "characters": len(text)}
+        try:
+            ats = main._analyze_ats_internal(text, job_title)
+            gap = main._skill_gap_internal(text, job_title)
+            row.update({key: ats[key] for key in (
+                "ats_score", "keyword_score", "format_score", "readability_score", "structure_score",
+                "keywords_matched", "total_keywords_checked",
+            )})
+            row["skill_match_percentage"] = gap["skill_match_percentage"]
+            row["existing_skills"] = ";".join(gap["existing_skills"])
+            row["missing_skills"] = ";".join(gap["missing_skills"])
+        except Exception as e:
+            row["error"] = f"{type(e).__name__}: {e}"
+        rows.append(row)
+    elapsed_ms = round((time.perf_counter() - start) * 1000, 2)
+    for row in rows:
+        row["elapsed_ms"] = elapsed_ms
+    return rows, True
+
+
+class ResultWriter:
+    """Appends result batches; position() is what a checkpoint needs to roll back a partial batch"""
+
+    def __init__(self, path: str, output_format: str):
+        self.path = path
+        self.output_format = output_format
+        if output_format == "parquet":
+            os.makedirs(path, exist_ok=True)
+
+    def position(self) -> int:
+        if self.output_format == "parquet":
+            return len(self._parts())
+        return os.path.getsize(self.path) if os.path.exists(self.path) else 0
+
+    def _parts(self) -> List[str]:
+        return sorted(name for name in os.listdir(self.path) if name.startswith("part-") and name.endswith(".parquet"))
+
+    def rollback(self, position: int) -> None:
+        """Drop anything written after the last checkpointed batch"""
+        if self.output_format == "parquet":
+            for name in self._parts()[position:]:
+                os.remove(os.path.join(self.path, name))
+        elif os.path.exists(self.path):
+            with open(self.path, "r+b") as f:
+                f.truncate(position)
+
+    def write(self, rows: List[dict]) -> None:
+        if self.output_format == "parquet":
+            import pandas as pd
+
+            part = os.path.join(self.path, f"part-{len(self._parts()):06d}.parquet")
+            pd.DataFrame(rows, columns=RESULT_FIELDS).to_parquet(part, index=False)
+            return
+        new_file = self.position() == 0
+        with open(self.path, "a", newline="", encoding="utf-8") as f:
+            if self.output_format == "csv":
+                writer = csv.DictWriter(f, fieldnames=RESULT_FIELDS)
+                if new_file:
+                    writer.writeheader()
+                writer.writerows(rows)
+            else:
+                for row in rows:
+                    f.write(json.dumps(row, ensure_ascii=False) + "\n")
+            f.flush()
+            os.fsync(f.fileno())
+
+
+class Checkpoint:
+    """Append-only log of finished ids, written only after their results are on disk"""
+
+    def __init__(self, path: str, header: dict):
+        self.path = path
+        self.header = header
+        self.done = set()
+        self.position = 0
+
+    def load(self) -> bool:
+        """Read an existing checkpoint; False if there is none"""
+        if not os.path.exists(self.path):
+            return False
+        lines = []
+        valid_size = 0
+        with open(self.path, "rb") as f:
+            for line in f:
+                if not line.endswith(b"\n"):
+                    # A record cut short by a crash; its batch is rolled back by the caller
+                    break
+                try:
+                    lines.append(json.loads(line))
+                except json.JSONDecodeError:
+                    break
+                valid_size += len(line)
+        if not lines:
+            return False
+        if lines[0] != self.header:
+            raise SystemExit(
+                f"Checkpoint {self.path} was written with different settings or taxonomy "
+                f"({lines[0]}); rerun with --restart to rescore everything"
+            )
+        if valid_size < os.path.getsize(self.path):
+            # New records must not be appended after the partial one, or the next load stops there
+            with open(self.path, "r+b") as f:
+                f.truncate(valid_size)
+        for entry in lines[1:]:
+            self.done.update(entry["ids"])
+            self.position = entry["position"]
+        return True
+
+    def start(self) -> None:
+        with open(self.path, "w", encoding="utf-8") as f:
+            f.write(json.dumps(self.header) + "\n")
+
+    def record(self, ids: List[str], position: int) -> None:
+        with open(self.path, "a", encoding="utf-8") as f:
+            f.write(json.dumps({"ids": ids, "position": position}) + "\n")
+            f.flush()
+            os.fsync(f.fileno())
+        self.done.update(ids)
+        self.position = position
+
+
+def _require_parquet_engine() -> None:
+    """Fail before any work is done rather than at the first batch"""
+    for engine in ("pyarrow", "fastparquet"):
+        try:
+            __import__(engine)
+            return
+        except ImportError:
+            continue
+    raise SystemExit("Parquet output needs pyarrow (pip install pyarrow); use .csv or .jsonl otherwise")
+
+
+def run(args) -> int:
+    output_format = args.format or os.path.splitext(args.output)[1].lstrip(".").lower()
+    if output_format not in OUTPUT_FORMATS:
+        raise SystemExit(f"Unknown output format '{output_format}'. Use --format with one of: {', '.join(OUTPUT_FORMATS)}")
+    if output_format == "parquet":
+        _require_parquet_engine()
+    source = os.path.abspath(args.source)
+    job_titles = args.job_title or ["software engineer"]
+
+    writer = ResultWriter(args.output, output_format)
+    checkpoint = Checkpoint(args.checkpoint or f"{args.output.rstrip('/')}.checkpoint", {
+        "source": source, "job_titles": job_titles, "format": output_format, "taxonomy": taxonomy_version(),
+    })
+    if args.restart or not checkpoint.load():
+        writer.rollback(0)
+        checkpoint.start()
+    else:
+        writer.rollback(checkpoint.position)
+        print(f"Resuming: {len(checkpoint.done)} resumes already scored")
+
+    pending_items = ((item_id, member) for item_id, member in list_items(source) if item_id not in checkpoint.done)
+    # Forked workers inherit the loaded models and taxonomy instead of re-importing the app
+    context = multiprocessing.get_context("fork") if "fork" in multiprocessing.get_all_start_methods() else None
+    batch_rows, batch_ids = [], []
+    scored = errors = retry = 0
+    start = time.perf_counter()
+
+    def flush() -> None:
+        if batch_ids:
+            writer.write(batch_rows)
+            checkpoint.record(list(batch_ids), writer.position())
+            batch_rows.clear()
+            batch_ids.clear()
+
+    with ProcessPoolExecutor(max_workers=args.workers, mp_context=context, initializer=init_worker) as pool:
+        in_flight = {}
+        exhausted = False
+        while in_flight or not exhausted:
+            # Keep a bounded window of submitted work so huge corpora are streamed, not queued at once
+            while not exhausted and len(in_flight) < args.workers * 4:
+                item = next(pending_items, None)
+                if item is None:
+                    exhausted = True
+                    break
+                in_flight[pool.submit(analyze_item, source, item[0], item[1], job_titles)] = item[0]
+            if not in_flight:
+                break
+            finished, _ = wait(in_flight, return_when=FIRST_COMPLETED)
+            for future in finished:
+                item_id = in_flight.pop(future)
+                rows, complete = future.result()
+                if not complete:
+                    # Neither written nor checkpointed, so the next run scores it again
+                    retry += 1
+                    print(f"  {item_id}: {rows[0]['error']}; will be retried on the next run")
+                    continue
+                batch_rows.extend(rows)
+                batch_ids.append(item_id)
+                scored += 1
+                errors += any(row.get("error") for row in rows)
+            if len(batch_ids) >= args.batch_size:
+                flush()
+                rate = scored / (time.perf_counter() - start)
+                print(f"  {len(checkpoint.done)} scored ({rate:.1f}/s, {errors} with errors)")
+        flush()
+
+    print(f"Done: {scored} resumes scored this run, {errors} with errors, results in {args.output}")
+    if retry:
+        print(f"{retry} resumes could not be read completely; run again to retry them")
+        return 1
+    return 0
+
+
+def main_cli() -> int:
+    parser = argparse.ArgumentParser(description="Score a directory or .zip of resumes offline")
+    parser.add_argument("source", help="Directory of PDF/DOCX resumes or a .zip archive")
+    parser.add_argument("--output", required=True, help="Result file (.csv, .jsonl) or Parquet directory (.parquet)")
+    parser.add_argument("--format", choices=OUTPUT_FORMATS, help="Output format (default: from the output extension)")
+    parser.add_argument("--job-title", action="append", help="Job title to score against; repeat for several")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 2, help="Worker processes")
+    parser.add_argument("--batch-size", type=int, default=500, help="Resumes per write and checkpoint")
+    parser.add_argument("--checkpoint", help="Checkpoint file (default: <output>.checkpoint)")
+    parser.add_argument("--restart", action="store_true", help="Ignore any checkpoint and start over")
+    return run(parser.parse_args())
+
+
+if __name__ == "__main__":
+    sys.exit(main_cli())
@@ -0,0 +1,123 @@
+"""
+Synthetic resume corpus for the benchmark suite.
+
+Resumes are generated locally with ReportLab (PDF) and python-docx (DOCX) from a seeded
+random generator, so every run benchmarks exactly the same documents.
+"""
+import os
+import random
+from typing import Dict, List
+
+from docx import Document
+from reportlab.lib.pagesizes import letter
+from reportlab.lib.styles import getSampleStyleSheet
+from reportlab.platypus import PageBreak, Paragraph, SimpleDocTemplate, Spacer
+
+# name -> number of experience entries; roughly one page per three entries
+CORPUS_SIZES = {
+    "small": 3,
+    "medium": 9,
+    "large": 30,
+}
+
+SKILLS = [
+    "Python", "JavaScript", "React", "Node.js", "SQL", "PostgreSQL", "Docker", "Kubernetes",
+    "AWS", "Azure", "Git", "Jenkins", "Agile", "Scrum", "Machine Learning", "Pandas", "NumPy",
+    "TensorFlow", "REST", "GraphQL", "Microservices", "Figma", "Excel", "Jira",
+]
+VERBS = ["Developed", "Implemented", "Led", "Designed", "Built", "Optimized", "Maintained", "Worked on", "Helped with"]
+OBJECTS = [
+    "a customer-facing web platform", "internal data pipelines", "the billing service",
+    "CI/CD workflows", "a recommendation engine", "reporting dashboards", "the mobile backend API",
+]
+COMPANIES = ["Acme Corp", "Globex Inc", "Initech LLC", "Umbrella Ltd", "Hooli Company", "Stark Industries Inc"]
+
+
+def build_resume_sections(entries: int, seed: int = 42) -> Dict[str, object]:
+    """Build deterministic resume content with the given number of experience entries"""
+    rng = random.Random(seed + entries)
+    experience = []
+    for index in range(entries):
+        bullets = []
+        for _ in range(rng.randint(3, 6)):
+            bullet = f"{rng.choice(VERBS)} {rng.choice(OBJECTS)} using {rng.choice(SKILLS)} and {rng.choice(SKILLS)}"
+            if rng.random() < 0.5:
+                bullet += f", improving throughput by {rng.randint(5, 60)}%"
+            bullets.append(bullet)
+        experience.append({
+            "title": rng.choice(["Software Engineer", "Data Scientist", "Backend Developer", "Product Analyst"]),
+            "company": rng.choice(COMPANIES),
+            "dates": f"{2024 - index} - {'Present' if index == 0 else 2025 - index}",
+            "bullets": bullets,
+        })
+    return {
+        "name": "Jordan Example",
+        "contact": "jordan@example.com | (555) 010-0000 | linkedin.com/in/jordan-example",
+        "summary": "Engineer with experience building scalable systems. " * 3,
+        "experience": experience,
+        "education": "B.S. Computer Science - State University | 2014 - 2018",
+        "skills": ", ".join(rng.sample(SKILLS, 14)),
+    }
+
+
+def resume_sections_to_text(sections: Dict[str, object]) -> str:
+    """Flatten resume content into the plain text the analyzers receive"""
+    lines = [sections["name"], sections["contact"], "", "SUMMARY", sections["summary"], "", "EXPERIENCE"]
+    for entry in sections["experience"]:
+        lines.append(f"{entry['title']} - {entry['company']} | {entry['dates']}")
+        lines.extend(f"• {bullet}" for bullet in entry["bullets"])
+        lines.append("")
+    lines.extend(["EDUCATION", sections["education"], "", "SKILLS", sections["skills"]])
+    return "\n".join(lines)
+
+
+def write_pdf(sections: Dict[str, object], path: str) -> None:
+    styles = getSampleStyleSheet()
+    story = [Paragraph(sections["name"], styles["Title"]), Paragraph(sections["contact"], styles["Normal"])]
+    story += [Paragraph("SUMMARY", styles["Heading2"]), Paragraph(sections["summary"], styles["Normal"])]
+    story.append(Paragraph("EXPERIENCE", styles["Heading2"]))
+    for index, entry in enumerate(sections["experience"]):
+        story.append(Paragraph(f"<b>{entry['title']}</b> - {entry['company']} | {entry['dates']}", styles["Normal"]))
+        story.extend(Paragraph(f"• {bullet}", styles["Normal"]) for bullet in entry["bullets"])
+        story.append(Spacer(1, 6))
+        if index % 3 == 2:
+            story.append(PageBreak())
+    story += [Paragraph("EDUCATION", styles["Heading2"]), Paragraph(sections["education"], styles["Normal"])]
+    story += [Paragraph("SKILLS", styles["Heading2"]), Paragraph(sections["skills"], styles["Normal"])]
+    SimpleDocTemplate(path, pagesize=letter).build(story)
+
+
+def write_docx(sections: Dict[str, object], path: str) -> None:
+    document = Document()
+    document.add_heading(sections["name"], level=0)
+    document.add_paragraph(sections["contact"])
+    document.add_heading("SUMMARY", level=1)
+    document.add_paragraph(sections["summary"])
+    document.add_heading("EXPERIENCE", level=1)
+    for entry in sections["experience"]:
+        document.add_paragraph(f"{entry['title']} - {entry['company']} | {entry['dates']}")
+        for bullet in entry["bullets"]:
+            document.add_paragraph(f"• {bullet}")
+    document.add_heading("EDUCATION", level=1)
+    document.add_paragraph(sections["education"])
+    document.add_heading("SKILLS", level=1)
+    document.add_paragraph(sections["skills"])
+    document.save(path)
+
+
+def generate_corpus(directory: str, sizes: Dict[str, int] = CORPUS_SIZES) -> List[Dict[str, str]]:
+    """Write one PDF and one DOCX per corpus size and return their descriptions"""
+    os.makedirs(directory, exist_ok=True)
+    corpus = []
+    for size, entries in sizes.items():
+        sections = build_resume_sections(entries)
+        for ext, writer in (("pdf", write_pdf), ("docx", write_docx)):
+            path = os.path.join(directory, f"resume_{size}.{ext}")
+            writer(sections, path)
+            corpus.append({
+                "size": size,
+                "format": ext,
+                "path": path,
+                "text": resume_sections_to_text(sections),
+            })
+    return corpus
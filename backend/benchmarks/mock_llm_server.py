@@ -0,0 +1,111 @@
+"""
+Groq/OpenAI-compatible HTTP stand-in backed by MockLLMProvider.
+
+Pointing the real Groq client at this server load-tests the full HTTP path (connection
+handling, retries, 429s) without touching the real API:
+
+    MOCK_LLM_LATENCY=lognormal:300,0.5 MOCK_LLM_RATE_LIMIT_RPM=600 \\
+        python benchmarks/mock_llm_server.py --port 9000
+    GROQ_API_KEY=mock GROQ_BASE_URL=http://127.0.0.1:9000 python main.py
+
+Latency, error rate, rate limit, seed and canned responses use the same MOCK_LLM_* variables
+as LLM_PROVIDER=mock. Requests with "stream": true get server-sent event chunks, as the bullet
+rewrites use.
+"""
+import argparse
+import os
+import sys
+import time
+import json
+import uuid
+
+import uvicorn
+from fastapi import FastAPI
+from fastapi.responses import JSONResponse, StreamingResponse
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BACKEND_DIR)
+
+from main import LLMError, MockLLMProvider  # noqa: E402
+
+app = FastAPI(title="ResuScan mock LLM server")
+provider = MockLLMProvider.from_env()
+
+
+def _error_response(error: LLMError) -> JSONResponse:
+    headers = {}
+    if error.retry_after is not None:
+        headers["retry-after"] = f"{error.retry_after:.2f}"
+    return JSONResponse(
+        status_code=error.status_code,
+        content={"error": {"message": str(error), "type": "rate_limit_exceeded" if error.status_code == 429 else "server_error"}},
+        headers=headers,
+    )
+
+
+def _chunk(completion_id: str, model: str, delta: dict, finish_reason: str = None) -> str:
+    chunk = {
+        "id": completion_id,
+        "object": "chat.completion.chunk",
+        "created": int(time.time()),
+        "model": model,
+        "choices": [{"index": 0, "delta": delta, "finish_reason": finish_reason}],
+    }
+    return f"data: {json.dumps(chunk)}\n\n"
+
+
+def _stream_response(prompt: str, model: str, body: dict):
+    pieces = provider.stream(prompt, model, body.get("temperature", 0.7), body.get("max_tokens") or 1024)
+    try:
+        # The simulated rate limit and errors happen before the first piece; answer them with a status
+        first = next(pieces, None)
+    except LLMError as e:
+        return _error_response(e)
+    completion_id = f"chatcmpl-{uuid.uuid4().hex}"
+
+    def events():
+        yield _chunk(completion_id, model, {"role": "assistant", "content": ""})
+        if first is not None:
+            yield _chunk(completion_id, model, {"content": first})
+        for piece in pieces:
+            yield _chunk(completion_id, model, {"content": piece})
+        yield _chunk(completion_id, model, {}, "stop")
+        yield "data: [DONE]\n\n"
+
+    return StreamingResponse(events(), media_type="text/event-stream")
+
+
+@app.post("/openai/v1/chat/completions")
+def chat_completions(body: dict):
+    prompt = "\n".join(str(message.get("content", "")) for message in body.get("messages", []))
+    model = body.get("model", "mock")
+    if body.get("stream"):
+        return _stream_response(prompt, model, body)
+    try:
+        response = provider.complete(prompt, model, body.get("temperature", 0.7), body.get("max_tokens") or 1024)
+    except LLMError as e:
+        return _error_response(e)
+    return {
+        "id": f"chatcmpl-{uuid.uuid4().hex}",
+        "object": "chat.completion",
+        "created": int(time.time()),
+        "model": model,
+        "choices": [{
+            "index": 0,
+            "message": {"role": "assistant", "content": response.text},
+            "finish_reason": "stop",
+        }],
+        "usage": {
+            "prompt_tokens": response.prompt_tokens,
+            "completion_tokens": response.completion_tokens,
+            "total_tokens": response.prompt_tokens + response.completion_tokens,
+        },
+    }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Run the mock LLM server")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=9000)
+    args = parser.parse_args()
+    uvicorn.run(app, host=args.host, port=args.port)
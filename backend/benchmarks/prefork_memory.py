@@ -0,0 +1,156 @@
+"""
+Memory benchmark for the pre-fork server.
+
+Starts the API as N independent single-process servers and as one pre-fork server with N
+workers, sends the same warm-up traffic to both, and sums the proportional set size (PSS) of
+every process. PSS splits shared pages between the processes that map them, so the totals are
+comparable. Linux only. Run from the backend directory:
+
+    python benchmarks/prefork_memory.py --workers 1,2,4 --output prefork_memory.json
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+import urllib.parse
+import urllib.request
+from datetime import datetime
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BACKEND_DIR)
+
+from benchmarks.corpus import generate_corpus  # noqa: E402
+
+MAIN_PY = os.path.join(BACKEND_DIR, "main.py")
+BASE_PORT = 18700
+
+
+def pss_bytes(pid: int) -> int:
+    with open(f"/proc/{pid}/smaps_rollup") as f:
+        for line in f:
+            if line.startswith("Pss:"):
+                return int(line.split()[1]) * 1024
+    return 0
+
+
+def child_pids(pid: int) -> list:
+    with open(f"/proc/{pid}/task/{pid}/children") as f:
+        return [int(child) for child in f.read().split()]
+
+
+def get_json(url: str):
+    with urllib.request.urlopen(url, timeout=5) as response:
+        return json.loads(response.read())
+
+
+def post_form(url: str, fields: dict) -> None:
+    data = urllib.parse.urlencode(fields).encode()
+    with urllib.request.urlopen(urllib.request.Request(url, data=data), timeout=30) as response:
+        response.read()
+
+
+def wait_until_serving(port: int, workers: int, timeout: float = 120.0) -> None:
+    """Poll /health until every worker behind the port has answered"""
+    deadline = time.monotonic() + timeout
+    seen = set()
+    while time.monotonic() < deadline:
+        try:
+            seen.add(get_json(f"http://127.0.0.1:{port}/health")["pid"])
+            if len(seen) >= workers:
+                return
+        except OSError:
+            time.sleep(0.2)
+    raise RuntimeError(f"Server on port {port} did not start {workers} workers in {timeout:.0f}s")
+
+
+def warm_up(ports: list, texts: list, requests_per_port: int) -> None:
+    """Exercise the analysis paths so every worker has touched its caches"""
+    for port in ports:
+        for i in range(requests_per_port):
+            text = texts[i % len(texts)]
+            post_form(f"http://127.0.0.1:{port}/analyze-ats", {"resume_text": text, "job_title": "software engineer"})
+            post_form(f"http://127.0.0.1:{port}/skill-gap-analysis", {"resume_text": text, "target_job": "software engineer"})
+
+
+def measure(mode: str, workers: int, work_dir: str, texts: list, requests_per_worker: int) -> dict:
+    env = dict(os.environ, LLM_PROVIDER="mock", VERSIONS_DB_PATH=os.path.join(work_dir, "versions.db"),
+               RATE_LIMIT_PER_MINUTE="0", LOG_LEVEL="warning")
+    if mode == "prefork":
+        commands = [[sys.executable, MAIN_PY, "--port", str(BASE_PORT), "--workers", str(workers)]]
+    else:
+        commands = [[sys.executable, MAIN_PY, "--port", str(BASE_PORT + i), "--workers", "1"] for i in range(workers)]
+    processes = [
+        subprocess.Popen(command, cwd=work_dir, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+        for command in commands
+    ]
+    try:
+        ports = [BASE_PORT] if mode == "prefork" else [BASE_PORT + i for i in range(workers)]
+        for port in ports:
+            wait_until_serving(port, workers if mode == "prefork" else 1)
+        # Connections are spread by the kernel, so send enough for every pre-fork worker to get some
+        warm_up(ports, texts, requests_per_worker * (workers if mode == "prefork" else 1))
+
+        pids = [process.pid for process in processes]
+        if mode == "prefork" and workers > 1:
+            pids += child_pids(processes[0].pid)
+        per_process = {pid: pss_bytes(pid) for pid in pids}
+        total = sum(per_process.values())
+        return {
+            "mode": mode,
+            "workers": workers,
+            "processes": len(pids),
+            "total_pss_mb": round(total / 2**20, 1),
+            "per_process_pss_mb": [round(value / 2**20, 1) for value in per_process.values()],
+        }
+    finally:
+        for process in processes:
+            process.terminate()
+        for process in processes:
+            try:
+                process.wait(timeout=20)
+            except subprocess.TimeoutExpired:
+                process.kill()
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Compare memory of pre-fork and independent workers")
+    parser.add_argument("--workers", default="1,2,4", help="Comma-separated worker counts")
+    parser.add_argument("--requests", type=int, default=10, help="Warm-up requests per worker")
+    parser.add_argument("--output", help="Write results to this JSON file")
+    args = parser.parse_args()
+    worker_counts = sorted({int(count) for count in args.workers.split(",")})
+
+    with tempfile.TemporaryDirectory(prefix="resuscan-prefork-") as work_dir:
+        texts = [doc["text"] for doc in generate_corpus(os.path.join(work_dir, "corpus")) if doc["format"] == "pdf"]
+        runs = []
+        for workers in worker_counts:
+            for mode in ("independent", "prefork"):
+                result = measure(mode, workers, work_dir, texts, args.requests)
+                runs.append(result)
+                print(f"  {mode:<12} workers={workers:<3} total PSS {result['total_pss_mb']:>8.1f} MB")
+
+    # Memory each added worker costs, from the smallest to the largest worker count measured
+    summary = {}
+    if len(worker_counts) > 1:
+        low, high = worker_counts[0], worker_counts[-1]
+        totals = {(run["mode"], run["workers"]): run["total_pss_mb"] for run in runs}
+        for mode in ("independent", "prefork"):
+            summary[f"{mode}_mb_per_added_worker"] = round((totals[(mode, high)] - totals[(mode, low)]) / (high - low), 1)
+        summary["saved_mb_per_added_worker"] = round(
+            summary["independent_mb_per_added_worker"] - summary["prefork_mb_per_added_worker"], 1
+        )
+        print(f"\n  per added worker: independent {summary['independent_mb_per_added_worker']} MB, "
+              f"prefork {summary['prefork_mb_per_added_worker']} MB, saved {summary['saved_mb_per_added_worker']} MB")
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump({"meta": {"created_at": datetime.now().isoformat(), "cpu_count": os.cpu_count()},
+                       "runs": runs, "summary": summary}, f, indent=2)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
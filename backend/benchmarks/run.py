@@ -0,0 +1,182 @@
+"""
+Benchmark suite for the ResuScan analysis pipeline.
+
+Times text extraction, ATS scoring, skill-gap analysis, bullet extraction and improvement,
+PDF generation and the resume versions store against a synthetic corpus, with LLM calls
+served by the local mock provider. Run from the backend directory:
+
+    python benchmarks/run.py --output baseline.json
+    python benchmarks/run.py --compare baseline.json --threshold 0.2
+
+Compare mode exits with status 1 when any benchmark's median regresses past the threshold.
+"""
+import argparse
+import json
+import os
+import platform
+import statistics
+import sys
+import tempfile
+import time
+from datetime import datetime
+
+from docx import Document
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BACKEND_DIR)
+
+from benchmarks.corpus import CORPUS_SIZES, build_resume_sections, generate_corpus  # noqa: E402
+
+VERSIONS_STORE_SIZE = 500
+
+
+def time_call(func, repeat: int, warmup: int = 1) -> dict:
+    """Run func repeatedly and summarise wall-clock timings in milliseconds"""
+    for _ in range(warmup):
+        func()
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        samples.append((time.perf_counter() - start) * 1000)
+    samples.sort()
+    return {
+        "runs": repeat,
+        "min_ms": round(samples[0], 4),
+        "median_ms": round(statistics.median(samples), 4),
+        "p95_ms": round(samples[min(len(samples) - 1, int(len(samples) * 0.95))], 4),
+        "mean_ms": round(statistics.fmean(samples), 4),
+    }
+
+
+def builder_resume_data(entries: int) -> dict:
+    """Resume builder payload (as sent to /generate-resume-pdf) for a corpus size"""
+    sections = build_resume_sections(entries)
+    return {
+        "name": sections["name"],
+        "email": "jordan@example.com",
+        "phone": "(555) 010-0000",
+        "summary": sections["summary"],
+        "experience": [
+            {"title": e["title"], "company": e["company"], "dates": e["dates"], "description": " ".join(e["bullets"])}
+            for e in sections["experience"]
+        ],
+        "education": [{"degree": "B.S. Computer Science", "school": "State University", "dates": "2014 - 2018"}],
+        "skills": sections["skills"].split(", "),
+    }
+
+
+def run_benchmarks(repeat: int, work_dir: str) -> dict:
+    import main
+
+    # Zero-latency mock provider so LLM paths measure only our own overhead
+    main.llm_provider = main.MockLLMProvider(latency="fixed:0")
+    main.llm_gateway = main.LLMGateway(rpm_limit=0, tpm_limit=0)
+    corpus = generate_corpus(os.path.join(work_dir, "corpus"))
+    # PDF generation and the versions store write relative to the working directory
+    os.chdir(work_dir)
+    results = {}
+
+    def bench(name, func, runs=repeat):
+        results[name] = time_call(func, runs)
+        print(f"  {name:<45} median {results[name]['median_ms']:>10.3f} ms")
+
+    for doc in corpus:
+        bench(f"extract_text_from_file/{doc['size']}/{doc['format']}", lambda p=doc["path"]: main.extract_text_from_file(p))
+        if doc["format"] == "docx":
+            # The python-docx object model the streaming extractor replaced, for comparison
+            bench(f"docx_text/python_docx/{doc['size']}", lambda p=doc["path"]: "".join(para.text + "\n" for para in Document(p).paragraphs))
+            bench(f"docx_text/streaming/{doc['size']}", lambda p=doc["path"]: main.extract_docx_text(p))
+
+    for doc in (d for d in corpus if d["format"] == "pdf"):
+        text, size = doc["text"], doc["size"]
+        bench(f"analyze_ats/{size}", lambda t=text: main._analyze_ats_internal(t, "software engineer"))
+        bench(f"skill_gap/{size}", lambda t=text: main._skill_gap_internal(t, "software engineer"))
+        bench(f"best_fit_roles/{size}", lambda t=text: main._best_fit_roles_internal(t, 3))
+        bench(f"match_resume_skills/{size}", lambda t=text: main.match_resume_skills(t))
+        bench(f"extract_bullet_points/{size}", lambda t=text: main.extract_bullet_points(t))
+        bench(f"select_bullets/{size}", lambda t=text: main.select_bullets_for_improvement(main.extract_bullet_points(t), 10))
+        bullets = main.select_bullets_for_improvement(main.extract_bullet_points(text), main.bullet_limit_for_plan("free"))
+        bench(f"improve_bullets_mock_llm/{size}", lambda b=bullets: main._improve_bullets_internal(b, "software engineer"))
+
+    for size, entries in CORPUS_SIZES.items():
+        resume_data = builder_resume_data(entries)
+        bench(f"create_ats_friendly_pdf/{size}", lambda d=resume_data: main.create_ats_friendly_pdf(d, "professional"))
+
+    payload = builder_resume_data(CORPUS_SIZES["small"])
+    versions = {
+        f"version-{i}": {
+            "id": f"version-{i}", "name": f"Version {i}", "job_title": "Software Engineer",
+            "resume_data": payload, "created_at": "2025-01-01T00:00:00", "updated_at": "2025-01-01T00:00:00",
+        }
+        for i in range(VERSIONS_STORE_SIZE)
+    }
+    store = main.ResumeVersionStore(os.path.join(work_dir, "versions_bench.db"))
+    bench(f"versions_store_write/{VERSIONS_STORE_SIZE}", lambda: store.update_many(versions), runs=max(3, repeat // 4))
+    bench(f"versions_store_list/{VERSIONS_STORE_SIZE}", store.items, runs=max(3, repeat // 4))
+    bench("versions_store_put/1", lambda: store.__setitem__("version-0", versions["version-0"]))
+
+    return {
+        "meta": {
+            "created_at": datetime.now().isoformat(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "cpu_count": os.cpu_count(),
+            "repeat": repeat,
+        },
+        "benchmarks": results,
+    }
+
+
+def compare_results(current: dict, baseline: dict, threshold: float) -> list:
+    """Print a comparison table and return the benchmarks whose median regressed"""
+    regressions = []
+    print(f"\n{'benchmark':<45} {'baseline':>10} {'current':>10} {'change':>8}")
+    for name, stats in current["benchmarks"].items():
+        base = baseline.get("benchmarks", {}).get(name)
+        if base is None:
+            print(f"{name:<45} {'-':>10} {stats['median_ms']:>10.3f} {'new':>8}")
+            continue
+        change = (stats["median_ms"] - base["median_ms"]) / base["median_ms"] if base["median_ms"] else 0.0
+        flag = "  REGRESSION" if change > threshold else ""
+        print(f"{name:<45} {base['median_ms']:>10.3f} {stats['median_ms']:>10.3f} {change:>+7.1%}{flag}")
+        if change > threshold:
+            regressions.append(name)
+    return regressions
+
+
+def main_cli(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Benchmark the ResuScan analysis pipeline")
+    parser.add_argument("--output", help="Write results JSON to this path")
+    parser.add_argument("--compare", help="Baseline results JSON to compare against")
+    parser.add_argument("--threshold", type=float, default=0.2,
+                        help="Allowed median slowdown before a benchmark counts as a regression (default 0.2 = 20%%)")
+    parser.add_argument("--repeat", type=int, default=20, help="Timed runs per benchmark")
+    args = parser.parse_args(argv)
+
+    cwd = os.getcwd()
+    with tempfile.TemporaryDirectory(prefix="resuscan-bench-") as work_dir:
+        print(f"Running benchmarks ({args.repeat} runs each)")
+        try:
+            results = run_benchmarks(args.repeat, work_dir)
+        finally:
+            os.chdir(cwd)
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(results, f, indent=2)
+        print(f"\nResults written to {args.output}")
+
+    if args.compare:
+        with open(args.compare, "r") as f:
+            baseline = json.load(f)
+        regressions = compare_results(results, baseline, args.threshold)
+        if regressions:
+            print(f"\n{len(regressions)} benchmark(s) regressed more than {args.threshold:.0%}")
+            return 1
+        print("\nNo regressions")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main_cli())
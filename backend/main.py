@@ -1,12 +1,15 @@
-from fastapi import FastAPI, File, UploadFile, HTTPException, Form
+from fastapi import FastAPI, File, UploadFile, HTTPException, Form, Header, Depends, WebSocket, WebSocketDisconnect
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import JSONResponse, FileResponse
+from fastapi.concurrency import run_in_threadpool as _run_in_threadpool
+from fastapi.responses import JSONResponse, FileResponse, StreamingResponse, Response, PlainTextResponse
 import uvicorn
 from dotenv import load_dotenv
 import os
+import sys
 import json
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Iterator
 import groq
+import httpx
 import spacy
 import nltk
 from nltk.corpus import stopwords
@@ -14,11 +17,40 @@ from nltk.tokenize import word_tokenize
 import re
 import pdfplumber
 from docx import Document
+from docx.enum.text import WD_ALIGN_PARAGRAPH
+from docx.shared import Inches, Mm, Pt
 from PIL import Image
 import numpy as np
 import io
 from datetime import datetime
 import uuid
+import hashlib
+import gc
+import signal
+import socket
+import sqlite3
+import asyncio
+import threading
+import time
+import functools
+import contextvars
+import math
+import random
+import hmac
+import cProfile
+import pstats
+import marshal
+import zipfile
+from xml.etree import ElementTree
+import zlib
+import multiprocessing
+from abc import ABC, abstractmethod
+from collections import OrderedDict, deque
+from collections.abc import MutableMapping
+from contextlib import contextmanager
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor, TimeoutError as FutureTimeoutError
+from urllib.parse import parse_qs
+from xml.sax.saxutils import escape as xml_escape
 from reportlab.lib.pagesizes import letter, A4
 from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer, Table, TableStyle
 from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
@@ -27,13 +59,1452 @@ from reportlab.lib import colors
 from reportlab.lib.enums import TA_LEFT, TA_CENTER, TA_RIGHT, TA_JUSTIFY
 import requests
 import base64
+from starlette.middleware.gzip import GZipMiddleware
+from starlette.formparsers import MultiPartParser
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    from brotli_asgi import BrotliMiddleware
+except ImportError:
+    BrotliMiddleware = None
+
+try:
+    import pytesseract
+except ImportError:
+    pytesseract = None
 
 # Load environment variables
 load_dotenv()
 
-app = FastAPI(title="ResuScan API", description="Resume Analyzer + ATS Matcher")
+# ==================== RESPONSE ENCODING ====================
+
+COMPRESSION_MINIMUM_SIZE = int(os.getenv("COMPRESSION_MINIMUM_SIZE", "1000"))
+BROTLI_QUALITY = int(os.getenv("BROTLI_QUALITY", "4"))
+
+def _json_default(value: Any) -> Any:
+    """Convert values orjson cannot serialize natively"""
+    if isinstance(value, np.generic):
+        return value.item()
+    if isinstance(value, (set, frozenset, tuple)):
+        return list(value)
+    raise TypeError(f"Type is not JSON serializable: {type(value).__name__}")
+
+def encode_json(content: Any) -> bytes:
+    """Serialize to compact UTF-8 JSON with orjson when it is installed"""
+    if orjson is None:
+        return json.dumps(content, ensure_ascii=False, separators=(",", ":"), default=_json_default).encode("utf-8")
+    return orjson.dumps(
+        content,
+        default=_json_default,
+        option=orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_NON_STR_KEYS
+    )
+
+class FastJSONResponse(JSONResponse):
+    """JSON response serialized with orjson, falling back to the stdlib encoder"""
+
+    def render(self, content: Any) -> bytes:
+        return encode_json(content)
+
+# Index of this process under the pre-fork server; 0 when running as a single process
+WORKER_ID = 0
+
+app = FastAPI(
+    title="ResuScan API",
+    description="Resume Analyzer + ATS Matcher",
+    default_response_class=FastJSONResponse
+)
+
+# Response compression: brotli for clients that accept it, gzip otherwise
+if BrotliMiddleware is not None:
+    app.add_middleware(
+        BrotliMiddleware,
+        quality=BROTLI_QUALITY,
+        minimum_size=COMPRESSION_MINIMUM_SIZE,
+        gzip_fallback=True,
+        # brotli-asgi buffers inside the compressor, which would hold back server-sent events
+        excluded_handlers=[r"^/improve-bullet-points/stream$"]
+    )
+else:
+    app.add_middleware(GZipMiddleware, minimum_size=COMPRESSION_MINIMUM_SIZE)
+
+# ==================== METRICS ====================
+# Minimal in-process Prometheus registry; every update is a dict write under a lock
+
+METRICS_REGISTRY = []
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+SIZE_BUCKETS = (10_000, 50_000, 100_000, 250_000, 500_000, 1_000_000, 2_500_000, 5_000_000, 10_000_000, 25_000_000)
+
+def _escape_label_value(value: Any) -> str:
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+def _format_labels(names, values, extra: str = "") -> str:
+    pairs = [f'{name}="{_escape_label_value(value)}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+class Counter:
+    """Monotonic counter with optional labels"""
+    kind = "counter"
+
+    def __init__(self, name: str, documentation: str, labelnames: tuple = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = labelnames
+        self._values = {}
+        self._lock = threading.Lock()
+        METRICS_REGISTRY.append(self)
+
+    def _key(self, labels: Dict[str, Any]) -> tuple:
+        return tuple(labels.get(name, "") for name in self.labelnames)
+
+    def inc(self, amount: float = 1.0, **labels) -> None:
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+    def render(self) -> List[str]:
+        with self._lock:
+            items = list(self._values.items())
+        return [f"{self.name}{_format_labels(self.labelnames, key)} {value}" for key, value in items]
+
+class Gauge(Counter):
+    """Value that can go up and down"""
+    kind = "gauge"
+
+    def set(self, value: float, **labels) -> None:
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = value
+
+    def dec(self, amount: float = 1.0, **labels) -> None:
+        self.inc(-amount, **labels)
+
+class Histogram(Counter):
+    """Cumulative bucket histogram"""
+    kind = "histogram"
+
+    def __init__(self, name: str, documentation: str, labelnames: tuple = (), buckets: tuple = LATENCY_BUCKETS):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = buckets
+
+    def observe(self, value: float, **labels) -> None:
+        key = self._key(labels)
+        with self._lock:
+            state = self._values.get(key)
+            if state is None:
+                state = self._values[key] = [[0] * len(self.buckets), 0.0, 0]
+            for index, bound in enumerate(self.buckets):
+                if value <= bound:
+                    state[0][index] += 1
+                    break
+            state[1] += value
+            state[2] += 1
+
+    def render(self) -> List[str]:
+        with self._lock:
+            items = [(key, (list(state[0]), state[1], state[2])) for key, state in self._values.items()]
+        lines = []
+        for key, (bucket_counts, total, count) in items:
+            cumulative = 0
+            for bound, bucket_count in zip(self.buckets, bucket_counts):
+                cumulative += bucket_count
+                le_label = f'le="{bound}"'
+                lines.append(f"{self.name}_bucket{_format_labels(self.labelnames, key, le_label)} {cumulative}")
+            inf_label = 'le="+Inf"'
+            lines.append(f"{self.name}_bucket{_format_labels(self.labelnames, key, inf_label)} {count}")
+            lines.append(f"{self.name}_sum{_format_labels(self.labelnames, key)} {total}")
+            lines.append(f"{self.name}_count{_format_labels(self.labelnames, key)} {count}")
+        return lines
+
+def render_metrics() -> str:
+    """Render every registered metric in the Prometheus text exposition format"""
+    lines = []
+    for metric in METRICS_REGISTRY:
+        lines.append(f"# HELP {metric.name} {metric.documentation}")
+        lines.append(f"# TYPE {metric.name} {metric.kind}")
+        lines.extend(metric.render())
+    return "\n".join(lines) + "\n"
+
+HTTP_REQUESTS = Counter("resuscan_http_requests_total", "HTTP requests by route and status", ("method", "route", "status"))
+HTTP_DURATION = Histogram("resuscan_http_request_duration_seconds", "HTTP request latency", ("method", "route"))
+HTTP_IN_FLIGHT = Gauge("resuscan_http_requests_in_flight", "HTTP requests currently being served")
+STAGE_DURATION = Histogram("resuscan_stage_duration_seconds", "Time spent in each pipeline stage", ("stage",))
+LLM_REQUESTS = Counter("resuscan_llm_requests_total", "LLM completion calls by outcome", ("model", "outcome"))
+LLM_DURATION = Histogram("resuscan_llm_request_duration_seconds", "LLM completion latency", ("model",))
+LLM_TOKENS = Counter("resuscan_llm_tokens_total", "LLM tokens consumed", ("model", "kind"))
+LLM_FIRST_TOKEN = Histogram("resuscan_llm_time_to_first_token_seconds", "Time until a streamed LLM completion produced text", ("model",))
+CACHE_REQUESTS = Counter("resuscan_cache_requests_total", "Cache lookups by result", ("cache", "result"))
+EXECUTOR_QUEUE_DEPTH = Gauge("resuscan_executor_queue_depth", "Jobs submitted to an executor and not yet finished", ("executor",))
+UPLOAD_SIZE = Histogram("resuscan_upload_size_bytes", "Size of uploaded resume files", ("extension",), buckets=SIZE_BUCKETS)
+DOCUMENT_SIZE = Histogram("resuscan_generated_document_bytes", "Size of generated resume documents", ("format",), buckets=SIZE_BUCKETS)
+
+@contextmanager
+def stage_timer(stage: str):
+    """Record how long a block of pipeline work takes"""
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        STAGE_DURATION.observe(time.perf_counter() - start, stage=stage)
+
+def timed_stage(stage: str):
+    """Decorator form of stage_timer"""
+    def decorator(func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            with stage_timer(stage):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorator
+
+class MetricsMiddleware:
+    """ASGI middleware recording request counts and latency per route template"""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        
+        start = time.perf_counter()
+        status = {"code": 500}
+        
+        async def send_wrapper(message):
+            if message["type"] == "http.response.start":
+                status["code"] = message["status"]
+            await send(message)
+        
+        HTTP_IN_FLIGHT.inc()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            HTTP_IN_FLIGHT.dec()
+            # Use the matched route template so path parameters don't explode label cardinality
+            route = getattr(scope.get("route"), "path", "unmatched")
+            HTTP_DURATION.observe(time.perf_counter() - start, method=scope["method"], route=route)
+            HTTP_REQUESTS.inc(method=scope["method"], route=route, status=status["code"])
+
+app.add_middleware(MetricsMiddleware)
+
+# ==================== SHARED STATE ====================
+# Pre-forked workers share no memory, so state every worker must see (resume versions, editor
+# sessions, rate limit buckets, stored profiles) lives in SQLite in WAL mode. Paths default to
+# backend/data, wherever the server is started from.
+
+DATA_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "data")
+SHARED_STATE_DB_PATH = os.getenv("SHARED_STATE_DB_PATH") or os.path.join(DATA_DIR, "shared_state.db")
+
+class SQLiteConnections:
+    """Connections to one WAL-mode SQLite database, one per thread and per process"""
+
+    def __init__(self, path: str, schema: List[str] = ()):
+        self.path = path
+        self._local = threading.local()
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        connection = self()
+        for statement in schema:
+            connection.execute(statement)
+
+    def __call__(self) -> sqlite3.Connection:
+        # A forked worker must not reuse its parent's connection
+        connection = getattr(self._local, "connection", None)
+        if connection is None or self._local.pid != os.getpid():
+            connection = sqlite3.connect(self.path, timeout=10, isolation_level=None, check_same_thread=False)
+            connection.execute("PRAGMA journal_mode=WAL")
+            connection.execute("PRAGMA synchronous=NORMAL")
+            self._local.connection = connection
+            self._local.pid = os.getpid()
+        return connection
+
+    @contextmanager
+    def transaction(self) -> Iterator[sqlite3.Connection]:
+        """Write transaction holding the database lock from the start, for read-modify-write"""
+        connection = self()
+        with connection:
+            connection.execute("BEGIN IMMEDIATE")
+            yield connection
+
+shared_state_db = SQLiteConnections(SHARED_STATE_DB_PATH, [
+    "CREATE TABLE IF NOT EXISTS rate_limit_buckets (client TEXT PRIMARY KEY, tokens REAL NOT NULL, updated_at REAL NOT NULL)",
+    "CREATE INDEX IF NOT EXISTS rate_limit_buckets_updated_at ON rate_limit_buckets (updated_at)",
+    "CREATE TABLE IF NOT EXISTS editor_sessions ("
+    "id TEXT PRIMARY KEY, job_title TEXT NOT NULL, sections TEXT NOT NULL, revision INTEGER NOT NULL, last_access REAL NOT NULL)",
+    "CREATE INDEX IF NOT EXISTS editor_sessions_last_access ON editor_sessions (last_access)",
+    "CREATE TABLE IF NOT EXISTS profiles ("
+    "seq INTEGER PRIMARY KEY AUTOINCREMENT, id TEXT UNIQUE NOT NULL, summary TEXT NOT NULL, artifact BLOB NOT NULL)"
+])
+
+# ==================== PROFILING ====================
+# Opt-in per-request profiling: send `X-Profile: cprofile|sample` (or `?profile=...`) together
+# with `X-Admin-Token`. The last PROFILE_RING_SIZE profiles are kept in the shared state database,
+# so /admin/profiles lists them whichever worker served the profiled request.
+
+ADMIN_TOKEN = os.getenv("ADMIN_TOKEN", "")
+PROFILE_RING_SIZE = int(os.getenv("PROFILE_RING_SIZE", "20"))
+PROFILE_SAMPLE_INTERVAL = float(os.getenv("PROFILE_SAMPLE_INTERVAL_MS", "5")) / 1000
+PROFILE_TOP_FUNCTIONS = 25
+
+class ProfileStore:
+    """Bounded ring of request profiles in the shared state database"""
+
+    def __init__(self, db: SQLiteConnections, size: int):
+        self.db = db
+        self.size = size
+
+    def append(self, summary: dict, artifact: bytes) -> None:
+        with self.db.transaction() as connection:
+            cursor = connection.execute(
+                "INSERT INTO profiles (id, summary, artifact) VALUES (?, ?, ?)",
+                (summary["id"], encode_json(summary).decode("utf-8"), artifact)
+            )
+            connection.execute("DELETE FROM profiles WHERE seq <= ?", (cursor.lastrowid - self.size,))
+
+    def summaries(self) -> List[dict]:
+        """Stored profiles without their artifacts, newest first"""
+        rows = self.db().execute("SELECT summary FROM profiles ORDER BY seq DESC").fetchall()
+        return [json.loads(row[0]) for row in rows]
+
+    def get(self, profile_id: str) -> tuple:
+        """(summary, artifact) for a stored profile, or None"""
+        row = self.db().execute("SELECT summary, artifact FROM profiles WHERE id = ?", (profile_id,)).fetchone()
+        return None if row is None else (json.loads(row[0]), row[1])
+
+profile_store = ProfileStore(shared_state_db, PROFILE_RING_SIZE)
+# Profiled requests run one at a time so their profiles never contain each other; requests
+# that are not profiled never wait on this
+_profile_lock = asyncio.Lock()
+# Stacks ending in these files are idle threads waiting for work
+_IDLE_STACK_FILES = ("threading.py", "selectors.py", "queue.py", "thread.py")
+# The profile of the request being handled; its threadpool calls see it through their context
+_request_profile = contextvars.ContextVar("request_profile", default=None)
+
+def is_admin_token_valid(token: str) -> bool:
+    return bool(ADMIN_TOKEN) and hmac.compare_digest(token or "", ADMIN_TOKEN)
+
+def require_admin_token(x_admin_token: str = Header("")):
+    """FastAPI dependency guarding admin endpoints"""
+    if not is_admin_token_valid(x_admin_token):
+        raise HTTPException(status_code=403, detail="Admin token required")
+
+def _frame_label(code) -> str:
+    return f"{os.path.basename(code.co_filename)}:{code.co_name}"
+
+class StackSampler:
+    """Background thread that samples Python stacks into collapsed-stack counts"""
+
+    def __init__(self, interval: float = PROFILE_SAMPLE_INTERVAL, loop=None, task=None):
+        self.interval = interval
+        self.stacks = {}
+        # Created on the event-loop thread; its samples only count while `task` is running there
+        self._loop = loop
+        self._loop_thread_id = threading.get_ident() if loop is not None else None
+        self._task = task
+        # Threadpool threads currently running the profiled request's work
+        self._threads = set()
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="resuscan-profiler", daemon=True)
+
+    def _run(self):
+        own_id = threading.get_ident()
+        while not self._stop.wait(self.interval):
+            for thread_id, frame in sys._current_frames().items():
+                if thread_id == own_id:
+                    continue
+                if os.path.basename(frame.f_code.co_filename) in _IDLE_STACK_FILES:
+                    continue
+                if thread_id == self._loop_thread_id:
+                    if asyncio.current_task(self._loop) is not self._task:
+                        continue
+                elif self._loop is not None and thread_id not in self._threads:
+                    # Another request's threadpool work
+                    continue
+                labels = []
+                while frame is not None:
+                    labels.append(_frame_label(frame.f_code))
+                    frame = frame.f_back
+                stack = ";".join(reversed(labels))
+                self.stacks[stack] = self.stacks.get(stack, 0) + 1
+
+    def track_thread(self, thread_id: int) -> None:
+        self._threads.add(thread_id)
+
+    def untrack_thread(self, thread_id: int) -> None:
+        self._threads.discard(thread_id)
+
+    def __enter__(self):
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc_info):
+        self._stop.set()
+        self._thread.join()
+
+    def collapsed(self) -> str:
+        """Flamegraph-compatible collapsed stacks (one `frame;frame;leaf count` per line)"""
+        return "".join(f"{stack} {count}\n" for stack, count in sorted(self.stacks.items(), key=lambda item: -item[1]))
+
+    def hot_functions(self) -> List[Dict[str, Any]]:
+        """Functions ranked by samples spent inside them, including callees"""
+        inclusive = {}
+        for stack, count in self.stacks.items():
+            for label in set(stack.split(";")):
+                inclusive[label] = inclusive.get(label, 0) + count
+        ranked = sorted(inclusive.items(), key=lambda item: -item[1])
+        return [{"function": label, "samples": count} for label, count in ranked]
+
+class RequestProfile:
+    """Extends a request's profile to the threadpool threads that run its sync work"""
+
+    def __init__(self, mode: str, sampler: StackSampler = None):
+        self.mode = mode
+        self.sampler = sampler
+        self.thread_profilers: List[cProfile.Profile] = []
+        self._lock = threading.Lock()
+
+    def run(self, func, *args, **kwargs):
+        """Run func on the current threadpool thread under the request's profiler"""
+        if self.mode == "sample":
+            thread_id = threading.get_ident()
+            self.sampler.track_thread(thread_id)
+            try:
+                return func(*args, **kwargs)
+            finally:
+                self.sampler.untrack_thread(thread_id)
+        
+        profiler = cProfile.Profile()
+        try:
+            profiler.enable()
+        except ValueError:
+            # Python 3.12+ allows one active cProfile at a time; run this call unprofiled
+            return func(*args, **kwargs)
+        try:
+            return func(*args, **kwargs)
+        finally:
+            profiler.disable()
+            with self._lock:
+                self.thread_profilers.append(profiler)
+
+async def run_in_threadpool(func, *args, **kwargs):
+    """FastAPI's run_in_threadpool; calls made by a profiled request are profiled in the worker thread"""
+    profile = _request_profile.get()
+    if profile is not None:
+        return await _run_in_threadpool(profile.run, func, *args, **kwargs)
+    return await _run_in_threadpool(func, *args, **kwargs)
+
+def _cprofile_hot_functions(stats: pstats.Stats) -> List[Dict[str, Any]]:
+    """Functions ranked by cumulative time from finished cProfile runs"""
+    ranked = sorted(stats.stats.items(), key=lambda item: -item[1][3])
+    return [
+        {
+            "function": f"{os.path.basename(filename)}:{name}:{line}",
+            "calls": call_count,
+            "total_time": round(total_time, 6),
+            "cumulative_time": round(cumulative_time, 6)
+        }
+        for (filename, line, name), (_, call_count, total_time, cumulative_time, _) in ranked
+    ]
+
+def _requested_profile_mode(scope) -> str:
+    """Return 'cprofile' or 'sample' if the request asked to be profiled by an admin"""
+    headers = {key.decode("latin-1").lower(): value.decode("latin-1") for key, value in scope.get("headers", [])}
+    mode = headers.get("x-profile", "")
+    if not mode:
+        query = parse_qs(scope.get("query_string", b"").decode("latin-1"))
+        mode = (query.get("profile") or [""])[0]
+    mode = mode.lower()
+    if not mode or mode in ("0", "false"):
+        return ""
+    if not is_admin_token_valid(headers.get("x-admin-token", "")):
+        return ""
+    return "cprofile" if mode == "cprofile" else "sample"
+
+class ProfilingMiddleware:
+    """ASGI middleware that profiles admin-flagged requests and stores the artifacts"""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        mode = _requested_profile_mode(scope) if scope["type"] == "http" else ""
+        if not mode:
+            await self.app(scope, receive, send)
+            return
+        
+        async with _profile_lock:
+            await self._profile(mode, scope, receive, send)
+
+    async def _profile(self, mode, scope, receive, send):
+        profile_id = uuid.uuid4().hex[:12]
+        
+        async def send_wrapper(message):
+            if message["type"] == "http.response.start":
+                message["headers"] = list(message.get("headers", [])) + [
+                    (b"x-profile-id", profile_id.encode()), (b"x-profile-mode", mode.encode())
+                ]
+            await send(message)
+        
+        started_at = datetime.now().isoformat()
+        start = time.perf_counter()
+        if mode == "cprofile":
+            request_profile = RequestProfile(mode)
+            token = _request_profile.set(request_profile)
+            profiler = cProfile.Profile()
+            profiler.enable()
+            try:
+                await self.app(scope, receive, send_wrapper)
+            finally:
+                profiler.disable()
+                _request_profile.reset(token)
+            # The event loop's profile plus one per threadpool call
+            stats = pstats.Stats(profiler)
+            for thread_profiler in request_profile.thread_profilers:
+                stats.add(thread_profiler)
+            # Same on-disk format as Profile.dump_stats, loadable with pstats.Stats(path)
+            artifact, artifact_type = marshal.dumps(stats.stats), "pstats"
+            hot_functions = _cprofile_hot_functions(stats)
+        else:
+            with StackSampler(loop=asyncio.get_running_loop(), task=asyncio.current_task()) as sampler:
+                token = _request_profile.set(RequestProfile(mode, sampler))
+                try:
+                    await self.app(scope, receive, send_wrapper)
+                finally:
+                    _request_profile.reset(token)
+            artifact, artifact_type = sampler.collapsed().encode("utf-8"), "collapsed"
+            hot_functions = sampler.hot_functions()
+        
+        profile_store.append({
+            "id": profile_id,
+            "method": scope["method"],
+            "path": scope["path"],
+            "mode": mode,
+            "artifact_type": artifact_type,
+            "started_at": started_at,
+            "duration_seconds": round(time.perf_counter() - start, 6),
+            "hot_functions": hot_functions[:PROFILE_TOP_FUNCTIONS],
+            "main_py_functions": [
+                entry for entry in hot_functions if entry["function"].startswith("main.py:")
+            ][:PROFILE_TOP_FUNCTIONS]
+        }, artifact)
+
+app.add_middleware(ProfilingMiddleware)
+
+# ==================== LLM PROVIDERS ====================
+# All LLM calls go through an LLMProvider chosen by LLM_PROVIDER: "groq" (default) or "mock",
+# a local stand-in with configurable latency, errors and 429s for offline load testing.
+
+LLM_MODEL = os.getenv("LLM_MODEL", "gemma2-9b-it")
+LLM_TIMEOUT_SECONDS = float(os.getenv("LLM_TIMEOUT_SECONDS", "20"))
+LLM_MAX_CONNECTIONS = int(os.getenv("LLM_MAX_CONNECTIONS", "20"))
+
+class LLMResponse:
+    """Text and token usage returned by a provider"""
+    __slots__ = ("text", "prompt_tokens", "completion_tokens")
+
+    def __init__(self, text: str, prompt_tokens: int = 0, completion_tokens: int = 0):
+        self.text = text
+        self.prompt_tokens = prompt_tokens
+        self.completion_tokens = completion_tokens
+
+class LLMError(Exception):
+    """Provider failure; status_code mirrors the HTTP status when there is one"""
+
+    def __init__(self, message: str, status_code: int = 500, retry_after: float = None):
+        super().__init__(message)
+        self.status_code = status_code
+        self.retry_after = retry_after
+
+class LLMRateLimitError(LLMError):
+    """Provider rejected the call with a 429"""
+
+    def __init__(self, message: str = "Rate limit exceeded", retry_after: float = None):
+        super().__init__(message, status_code=429, retry_after=retry_after)
+
+class LLMProvider(ABC):
+    """Interface for chat-completion backends"""
+    name = "base"
+
+    @abstractmethod
+    def complete(self, prompt: str, model: str, temperature: float, max_tokens: int) -> LLMResponse:
+        """Return the full completion for a single user prompt"""
+
+    def stream(self, prompt: str, model: str, temperature: float, max_tokens: int) -> Iterator[str]:
+        """Yield the completion text piece by piece; closing the iterator stops generation"""
+        yield self.complete(prompt, model, temperature, max_tokens).text
+
+class GroqProvider(LLMProvider):
+    """Groq chat completions API"""
+    name = "groq"
+
+    def __init__(self, api_key: str, base_url: str = None):
+        # One pooled HTTP client reused by every request; retries are owned by LLMGateway
+        self.client = groq.Groq(
+            api_key=api_key,
+            base_url=base_url,
+            max_retries=0,
+            timeout=LLM_TIMEOUT_SECONDS,
+            http_client=groq.DefaultHttpxClient(
+                limits=httpx.Limits(max_connections=LLM_MAX_CONNECTIONS, max_keepalive_connections=LLM_MAX_CONNECTIONS)
+            )
+        )
+
+    @staticmethod
+    def _provider_error(e: groq.APIError) -> LLMError:
+        if isinstance(e, groq.RateLimitError):
+            retry_after = e.response.headers.get("retry-after") if e.response is not None else None
+            return LLMRateLimitError(str(e), retry_after=float(retry_after) if retry_after else None)
+        if isinstance(e, groq.APIStatusError):
+            return LLMError(str(e), status_code=e.status_code)
+        # Timeouts, dropped connections and error events in the middle of a stream
+        return LLMError(str(e), status_code=503)
+
+    def complete(self, prompt: str, model: str, temperature: float, max_tokens: int) -> LLMResponse:
+        try:
+            response = self.client.chat.completions.create(
+                messages=[{"role": "user", "content": prompt}],
+                model=model,
+                temperature=temperature,
+                max_tokens=max_tokens
+            )
+        except groq.APIError as e:
+            raise self._provider_error(e) from e
+        
+        usage = getattr(response, "usage", None)
+        return LLMResponse(
+            response.choices[0].message.content or "",
+            getattr(usage, "prompt_tokens", 0) or 0,
+            getattr(usage, "completion_tokens", 0) or 0
+        )
+
+    def stream(self, prompt: str, model: str, temperature: float, max_tokens: int) -> Iterator[str]:
+        try:
+            chunks = self.client.chat.completions.create(
+                messages=[{"role": "user", "content": prompt}],
+                model=model,
+                temperature=temperature,
+                max_tokens=max_tokens,
+                stream=True
+            )
+        except groq.APIError as e:
+            raise self._provider_error(e) from e
+        
+        # Leaving the with block closes the HTTP response, which stops generation server-side
+        with chunks:
+            try:
+                for chunk in chunks:
+                    if chunk.choices and chunk.choices[0].delta.content:
+                        yield chunk.choices[0].delta.content
+            except groq.APIError as e:
+                raise self._provider_error(e) from e
+            except httpx.HTTPError as e:
+                raise LLMError(str(e), status_code=503) from e
+
+def _parse_latency_spec(spec: str):
+    """Parse a latency spec in milliseconds: fixed:MS, uniform:LO,HI, normal:MEAN,SD or lognormal:MEDIAN,SIGMA"""
+    kind, _, params = spec.partition(":")
+    values = [float(v) for v in params.split(",") if v.strip()]
+    kind = kind.strip().lower()
+    if kind == "fixed" and len(values) == 1:
+        return lambda rng: values[0]
+    if kind == "uniform" and len(values) == 2:
+        return lambda rng: rng.uniform(values[0], values[1])
+    if kind == "normal" and len(values) == 2:
+        return lambda rng: max(0.0, rng.gauss(values[0], values[1]))
+    if kind == "lognormal" and len(values) == 2:
+        return lambda rng: values[0] * math.exp(rng.gauss(0.0, values[1]))
+    raise ValueError(f"Invalid latency spec '{spec}'")
+
+MOCK_LLM_FIRST_TOKEN_FRACTION = float(os.getenv("MOCK_LLM_FIRST_TOKEN_FRACTION", "0.25"))
+
+class MockLLMProvider(LLMProvider):
+    """Local LLM stand-in with seeded latency, error and rate-limit behaviour"""
+    name = "mock"
+
+    def __init__(self, latency: str = "fixed:0", error_rate: float = 0.0, rate_limit_rpm: int = 0,
+                 responses: List[str] = None, seed: int = 0):
+        self._latency = _parse_latency_spec(latency)
+        self.error_rate = error_rate
+        self.rate_limit_rpm = rate_limit_rpm
+        self.responses = responses or []
+        self._rng = random.Random(seed)
+        self._calls = deque()
+        self._response_index = 0
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_env(cls) -> "MockLLMProvider":
+        responses = []
+        responses_file = os.getenv("MOCK_LLM_RESPONSES_FILE")
+        if responses_file:
+            with open(responses_file, "r") as f:
+                responses = json.load(f)
+        return cls(
+            latency=os.getenv("MOCK_LLM_LATENCY", "lognormal:400,0.4"),
+            error_rate=float(os.getenv("MOCK_LLM_ERROR_RATE", "0")),
+            rate_limit_rpm=int(os.getenv("MOCK_LLM_RATE_LIMIT_RPM", "0")),
+            responses=responses,
+            seed=int(os.getenv("MOCK_LLM_SEED", "0"))
+        )
+
+    def _canned_response(self, prompt: str) -> str:
+        if self.responses:
+            text = self.responses[self._response_index % len(self.responses)]
+            self._response_index += 1
+            return text
+        match = re.search(r"Original:\s*(.+)", prompt)
+        original = (match.group(1).strip().rstrip(".") if match else "") or "Delivered the project"
+        return f"{original[0].upper()}{original[1:]}, delivering a 25% improvement in team throughput"
+
+    def _admit(self, prompt: str) -> tuple:
+        """Apply the simulated rate limit and draw this call's latency, failure and text"""
+        with self._lock:
+            now = time.monotonic()
+            if self.rate_limit_rpm:
+                while self._calls and now - self._calls[0] >= 60:
+                    self._calls.popleft()
+                if len(self._calls) >= self.rate_limit_rpm:
+                    raise LLMRateLimitError("Mock rate limit exceeded", retry_after=60 - (now - self._calls[0]))
+                self._calls.append(now)
+            delay = self._latency(self._rng) / 1000
+            fail = self._rng.random() < self.error_rate
+            text = self._canned_response(prompt)
+        return delay, fail, text
+
+    def complete(self, prompt: str, model: str, temperature: float, max_tokens: int) -> LLMResponse:
+        delay, fail, text = self._admit(prompt)
+        time.sleep(delay)
+        if fail:
+            raise LLMError("Mock provider error", status_code=500)
+        completion_tokens = min(max_tokens, len(text.split()) * 4 // 3 + 1)
+        return LLMResponse(text, len(prompt.split()) * 4 // 3 + 1, completion_tokens)
+
+    def stream(self, prompt: str, model: str, temperature: float, max_tokens: int) -> Iterator[str]:
+        delay, fail, text = self._admit(prompt)
+        # The first token arrives after a fraction of the full latency and the rest is spread
+        # over the words, roughly how a hosted model streams
+        time.sleep(delay * MOCK_LLM_FIRST_TOKEN_FRACTION)
+        if fail:
+            raise LLMError("Mock provider error", status_code=500)
+        words = re.findall(r"\S+\s*", text)[:max_tokens]
+        for word in words:
+            yield word
+            time.sleep(delay * (1 - MOCK_LLM_FIRST_TOKEN_FRACTION) / len(words))
+
+def create_llm_provider():
+    """Build the provider selected by LLM_PROVIDER, or None when no backend is configured"""
+    provider_name = os.getenv("LLM_PROVIDER", "groq").lower()
+    if provider_name == "mock":
+        print("Using mock LLM provider (LLM_PROVIDER=mock)")
+        return MockLLMProvider.from_env()
+    
+    groq_api_key = os.getenv("GROQ_API_KEY")
+    if groq_api_key and groq_api_key != "your_groq_api_key_here":
+        return GroqProvider(groq_api_key, base_url=os.getenv("GROQ_BASE_URL") or None)
+    
+    print("WARNING: GROQ_API_KEY not set. AI-powered features will be disabled.")
+    print("Get your API key at https://console.groq.com/ and add it to .env file")
+    return None
+
+llm_provider = create_llm_provider()
+
+# ==================== LLM GATEWAY ====================
+# Every provider call passes through one gateway that keeps us under the provider's
+# requests/minute and tokens/minute budgets, retries transient failures with jittered
+# backoff and trips a circuit breaker so callers can degrade instantly.
+
+LLM_RPM_LIMIT = int(os.getenv("LLM_RPM_LIMIT", "30"))
+LLM_TPM_LIMIT = int(os.getenv("LLM_TPM_LIMIT", "15000"))
+LLM_MAX_RETRIES = int(os.getenv("LLM_MAX_RETRIES", "3"))
+LLM_MAX_QUEUE_WAIT_SECONDS = float(os.getenv("LLM_MAX_QUEUE_WAIT_SECONDS", "10"))
+LLM_BACKOFF_BASE_SECONDS = float(os.getenv("LLM_BACKOFF_BASE_SECONDS", "0.5"))
+LLM_BACKOFF_MAX_SECONDS = float(os.getenv("LLM_BACKOFF_MAX_SECONDS", "8"))
+LLM_BREAKER_FAILURE_THRESHOLD = int(os.getenv("LLM_BREAKER_FAILURE_THRESHOLD", "5"))
+LLM_BREAKER_COOLDOWN_SECONDS = float(os.getenv("LLM_BREAKER_COOLDOWN_SECONDS", "30"))
+
+LLM_GATEWAY_DECISIONS = Counter("resuscan_llm_gateway_decisions_total", "LLM gateway decisions", ("decision",))
+LLM_QUEUE_WAIT = Histogram("resuscan_llm_queue_wait_seconds", "Time LLM calls waited for rate budget")
+LLM_CIRCUIT_STATE = Gauge("resuscan_llm_circuit_state", "LLM circuit breaker state (0 closed, 1 half-open, 2 open)")
+
+class LLMUnavailableError(LLMError):
+    """The gateway refused the call without contacting the provider"""
+
+    def __init__(self, message: str, retry_after: float = None):
+        super().__init__(message, status_code=503, retry_after=retry_after)
+
+def estimate_tokens(text: str) -> int:
+    """Cheap token estimate (~4 characters per token) used for budgeting"""
+    return len(text) // 4 + 1
+
+class RateBudget:
+    """Requests-per-minute and tokens-per-minute budget over a sliding 60 second window"""
+
+    WINDOW_SECONDS = 60.0
+
+    def __init__(self, rpm_limit: int, tpm_limit: int):
+        self.rpm_limit = rpm_limit
+        self.tpm_limit = tpm_limit
+        self._entries = deque()  # [timestamp, tokens]
+        self._tokens = 0
+        self._paused_until = 0.0
+        self._lock = threading.Lock()
+
+    def _purge(self, now: float) -> None:
+        while self._entries and now - self._entries[0][0] >= self.WINDOW_SECONDS:
+            self._tokens -= self._entries.popleft()[1]
+
+    def _wait_time(self, now: float, tokens: int) -> float:
+        wait = max(0.0, self._paused_until - now)
+        if self.rpm_limit and len(self._entries) >= self.rpm_limit:
+            wait = max(wait, self._entries[0][0] + self.WINDOW_SECONDS - now)
+        if self.tpm_limit and self._entries and self._tokens + tokens > self.tpm_limit:
+            # Wait until enough of the window has expired to fit this call
+            freed = self._tokens + tokens - self.tpm_limit
+            for timestamp, entry_tokens in self._entries:
+                freed -= entry_tokens
+                if freed <= 0:
+                    wait = max(wait, timestamp + self.WINDOW_SECONDS - now)
+                    break
+        return wait
+
+    def reserve(self, tokens: int, max_wait: float) -> list:
+        """Block until the call fits the budget, returning a reservation to settle afterwards"""
+        deadline = time.monotonic() + max_wait
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._purge(now)
+                wait = self._wait_time(now, tokens)
+                if wait <= 0:
+                    entry = [now, tokens]
+                    self._entries.append(entry)
+                    self._tokens += tokens
+                    return entry
+            if now + wait > deadline:
+                raise LLMUnavailableError("LLM rate budget exhausted", retry_after=wait)
+            time.sleep(min(wait, 1.0))
+
+    def settle(self, entry: list, actual_tokens: int) -> None:
+        """Replace a reservation's estimate with the tokens the provider actually reported"""
+        with self._lock:
+            self._tokens += actual_tokens - entry[1]
+            entry[1] = actual_tokens
+
+    def pause(self, seconds: float) -> None:
+        """Stop admitting calls for a while, e.g. after the provider answered 429"""
+        with self._lock:
+            self._paused_until = max(self._paused_until, time.monotonic() + seconds)
+
+class CircuitBreaker:
+    """Opens after consecutive failures, then lets a single probe through after a cooldown"""
+    CLOSED, HALF_OPEN, OPEN = 0, 1, 2
+
+    def __init__(self, failure_threshold: int, cooldown_seconds: float):
+        self.failure_threshold = failure_threshold
+        self.cooldown_seconds = cooldown_seconds
+        self.state = self.CLOSED
+        self._failures = 0
+        self._opened_at = 0.0
+        self._probe_in_flight = False
+        self._lock = threading.Lock()
+
+    def _set_state(self, state: int) -> None:
+        self.state = state
+        LLM_CIRCUIT_STATE.set(state)
+
+    def allow(self) -> bool:
+        with self._lock:
+            if self.state == self.OPEN:
+                if time.monotonic() - self._opened_at < self.cooldown_seconds:
+                    return False
+                self._set_state(self.HALF_OPEN)
+            if self.state == self.HALF_OPEN:
+                if self._probe_in_flight:
+                    return False
+                self._probe_in_flight = True
+            return True
+
+    def retry_after(self) -> float:
+        return max(0.0, self.cooldown_seconds - (time.monotonic() - self._opened_at))
+
+    def record_success(self) -> None:
+        with self._lock:
+            self._failures = 0
+            self._probe_in_flight = False
+            self._set_state(self.CLOSED)
+
+    def release_probe(self) -> None:
+        """End a half-open probe that never reached the provider; the next probe waits a new cooldown"""
+        with self._lock:
+            self._probe_in_flight = False
+            if self.state == self.HALF_OPEN:
+                self._opened_at = time.monotonic()
+                self._set_state(self.OPEN)
+
+    def record_failure(self) -> None:
+        with self._lock:
+            self._failures += 1
+            self._probe_in_flight = False
+            if self.state == self.HALF_OPEN or self._failures >= self.failure_threshold:
+                self._opened_at = time.monotonic()
+                self._set_state(self.OPEN)
+
+class LLMGateway:
+    """Budgeted, retrying, circuit-broken access to an LLMProvider"""
+
+    def __init__(self, rpm_limit: int = LLM_RPM_LIMIT, tpm_limit: int = LLM_TPM_LIMIT,
+                 max_retries: int = LLM_MAX_RETRIES, max_queue_wait: float = LLM_MAX_QUEUE_WAIT_SECONDS):
+        self.budget = RateBudget(rpm_limit, tpm_limit)
+        self.breaker = CircuitBreaker(LLM_BREAKER_FAILURE_THRESHOLD, LLM_BREAKER_COOLDOWN_SECONDS)
+        self.max_retries = max_retries
+        self.max_queue_wait = max_queue_wait
+
+    def _backoff(self, attempt: int) -> float:
+        # Full jitter keeps concurrent retries from synchronising
+        return random.uniform(0, min(LLM_BACKOFF_MAX_SECONDS, LLM_BACKOFF_BASE_SECONDS * (2 ** attempt)))
+
+    def _call(self, call, estimated_tokens: int) -> tuple:
+        """Run call() under the rate budget, retry policy and breaker; returns (result, reservation)"""
+        if not self.breaker.allow():
+            LLM_GATEWAY_DECISIONS.inc(decision="circuit_open")
+            raise LLMUnavailableError("LLM circuit breaker is open", retry_after=self.breaker.retry_after())
+        
+        attempt = 0
+        while True:
+            queued_at = time.perf_counter()
+            try:
+                reservation = self.budget.reserve(estimated_tokens, self.max_queue_wait)
+            except LLMUnavailableError:
+                LLM_GATEWAY_DECISIONS.inc(decision="budget_exhausted")
+                # Not the provider's fault, so free a half-open probe without counting a failure
+                self.breaker.release_probe()
+                raise
+            waited = time.perf_counter() - queued_at
+            LLM_QUEUE_WAIT.observe(waited)
+            LLM_GATEWAY_DECISIONS.inc(decision="queued" if waited > 0.001 else "admitted")
+            
+            try:
+                result = call()
+            except LLMError as e:
+                retriable = e.status_code == 429 or e.status_code >= 500
+                if e.status_code == 429:
+                    # Pausing the shared budget holds back every caller, not just this retry;
+                    # reserve() then fails fast if the pause outlasts the queue wait
+                    LLM_GATEWAY_DECISIONS.inc(decision="rate_limited")
+                    self.budget.pause(e.retry_after or self._backoff(attempt + 1))
+                if not retriable or attempt >= self.max_retries:
+                    LLM_GATEWAY_DECISIONS.inc(decision="failed")
+                    if retriable:
+                        self.breaker.record_failure()
+                    else:
+                        self.breaker.release_probe()
+                    raise
+                attempt += 1
+                LLM_GATEWAY_DECISIONS.inc(decision="retry")
+                if e.status_code != 429:
+                    time.sleep(self._backoff(attempt))
+                continue
+            except Exception:
+                self.breaker.release_probe()
+                raise
+            
+            self.breaker.record_success()
+            LLM_GATEWAY_DECISIONS.inc(decision="success")
+            return result, reservation
+
+    def complete(self, provider: LLMProvider, prompt: str, model: str, temperature: float, max_tokens: int) -> LLMResponse:
+        response, reservation = self._call(
+            lambda: provider.complete(prompt, model, temperature, max_tokens),
+            estimate_tokens(prompt) + max_tokens
+        )
+        self.budget.settle(reservation, response.prompt_tokens + response.completion_tokens)
+        return response
+
+    def stream(self, provider: LLMProvider, prompt: str, model: str, temperature: float, max_tokens: int) -> Iterator[str]:
+        """Yield completion text as it arrives; failures before the first piece are retried like complete()"""
+        def open_stream():
+            chunks = provider.stream(prompt, model, temperature, max_tokens)
+            try:
+                first = next(chunks, "")
+            except BaseException:
+                chunks.close()
+                raise
+            if not first:
+                # A stream that ends without content is a failed call, not a success
+                chunks.close()
+                raise LLMError("LLM stream ended without any content", status_code=502)
+            return first, chunks
+        
+        (first, chunks), reservation = self._call(open_stream, estimate_tokens(prompt) + max_tokens)
+        # Part of the answer is already with the caller, so a later failure is raised, not retried
+        received = [first]
+        try:
+            yield first
+            for piece in chunks:
+                received.append(piece)
+                yield piece
+        finally:
+            # Callers stop early once they have what they need; closing ends generation
+            chunks.close()
+            # Streams carry no usage report, so settle with an estimate of what was generated
+            self.budget.settle(reservation, estimate_tokens(prompt) + estimate_tokens("".join(received)))
+
+llm_gateway = LLMGateway()
+
+# Download required NLTK data
+try:
+    nltk.data.find('tokenizers/punkt')
+except LookupError:
+    nltk.download('punkt')
+
+try:
+    nltk.data.find('corpora/stopwords')
+except LookupError:
+    nltk.download('stopwords')
+
+# Load spaCy model
+try:
+    nlp = spacy.load("en_core_web_sm")
+except OSError:
+    # If model not found, download it
+    import subprocess
+    subprocess.run(["python", "-m", "spacy", "download", "en_core_web_sm"])
+    nlp = spacy.load("en_core_web_sm")
+
+# ATS Keywords database
+ATS_KEYWORDS = {
+    "software_engineer": [
+        "python", "javascript", "react", "node.js", "sql", "git", "docker", "kubernetes",
+        "aws", "azure", "machine learning", "api", "rest", "graphql", "microservices",
+        "agile", "scrum", "tdd", "ci/cd", "jenkins", "jira", "confluence"
+    ],
+    "data_scientist": [
+        "python", "r", "sql", "pandas", "numpy", "scikit-learn", "tensorflow", "pytorch",
+        "matplotlib", "seaborn", "plotly", "jupyter", "spark", "hadoop", "kafka",
+        "machine learning", "deep learning", "nlp", "computer vision", "statistics"
+    ],
+    "product_manager": [
+        "agile", "scrum", "kanban", "jira", "confluence", "figma", "sketch", "product strategy",
+        "user research", "a/b testing", "analytics", "sql", "excel", "powerpoint",
+        "roadmapping", "stakeholder management", "market analysis", "competitive analysis"
+    ],
+    "marketing": [
+        "google analytics", "facebook ads", "google ads", "seo", "sem", "content marketing",
+        "social media", "email marketing", "mailchimp", "hubspot", "salesforce", "crm",
+        "conversion optimization", "a/b testing", "branding", "market research"
+    ]
+}
+
+@app.get("/")
+async def root():
+    return {"message": "ResuScan API - Resume Analyzer + ATS Matcher"}
+
+@app.get("/health")
+async def health():
+    """Liveness check; exempt from admission control and rate limits"""
+    return {
+        "status": "ok",
+        "worker": WORKER_ID,
+        "pid": os.getpid(),
+        "admission": {
+            name: {"active": limiter.active, "queued": limiter.queued, "limit": limiter.limit}
+            for name, limiter in admission_limiters.items()
+        }
+    }
+
+PROCESS_MEMORY = Gauge("resuscan_process_memory_bytes", "Worker process memory from /proc/self/smaps_rollup", ("worker", "kind"))
+PROCESS_MEMORY_FIELDS = {
+    "Rss": "rss", "Pss": "pss", "Shared_Clean": "shared_clean", "Shared_Dirty": "shared_dirty",
+    "Private_Clean": "private_clean", "Private_Dirty": "private_dirty"
+}
+
+def process_memory(pid: int = None) -> Dict[str, int]:
+    """RSS, PSS and shared/private bytes of a process (Linux only; empty elsewhere)"""
+    path = f"/proc/{pid or 'self'}/smaps_rollup"
+    memory = {}
+    try:
+        with open(path) as f:
+            for line in f:
+                field, _, value = line.partition(":")
+                if field in PROCESS_MEMORY_FIELDS:
+                    memory[PROCESS_MEMORY_FIELDS[field]] = int(value.split()[0]) * 1024
+    except OSError:
+        pass
+    return memory
+
+@app.get("/metrics")
+async def metrics():
+    """Prometheus metrics for the API process"""
+    for kind, value in process_memory().items():
+        PROCESS_MEMORY.set(value, worker=WORKER_ID, kind=kind)
+    return PlainTextResponse(render_metrics(), media_type="text/plain; version=0.0.4; charset=utf-8")
+
+@app.get("/admin/profiles", dependencies=[Depends(require_admin_token)])
+async def list_profiles():
+    """List stored request profiles, newest first"""
+    return {"success": True, "profiles": profile_store.summaries()}
+
+@app.get("/admin/profiles/{profile_id}", dependencies=[Depends(require_admin_token)])
+async def download_profile(profile_id: str):
+    """Download a stored profile as a pstats file or collapsed stacks"""
+    stored = profile_store.get(profile_id)
+    if stored is None:
+        raise HTTPException(status_code=404, detail="Profile not found")
+    profile, artifact = stored
+    if profile["artifact_type"] == "pstats":
+        return Response(
+            content=artifact,
+            media_type="application/octet-stream",
+            headers={"Content-Disposition": f'attachment; filename="{profile_id}.prof"'}
+        )
+    return PlainTextResponse(
+        artifact.decode("utf-8"),
+        headers={"Content-Disposition": f'attachment; filename="{profile_id}.folded"'}
+    )
+
+# ==================== UPLOADS ====================
+# Upload bodies are capped before they are parsed: a Content-Length over the limit is rejected
+# up front, and streamed bodies are counted as they arrive. Multipart files are spooled by
+# Starlette (memory up to UPLOAD_SPOOL_MAX_BYTES, then disk), read back in fixed-size chunks and
+# hashed on the way so repeated uploads of the same file skip parsing.
+
+MAX_UPLOAD_BYTES = int(os.getenv("MAX_UPLOAD_BYTES", str(10 * 1024 * 1024)))
+# Allowance for multipart boundaries and the form fields sent alongside the file
+MAX_REQUEST_BYTES = int(os.getenv("MAX_REQUEST_BYTES", str(MAX_UPLOAD_BYTES + 64 * 1024)))
+UPLOAD_CHUNK_SIZE = int(os.getenv("UPLOAD_CHUNK_SIZE", str(64 * 1024)))
+UPLOAD_SPOOL_MAX_BYTES = int(os.getenv("UPLOAD_SPOOL_MAX_BYTES", str(1024 * 1024)))
+PARSED_TEXT_CACHE_SIZE = int(os.getenv("PARSED_TEXT_CACHE_SIZE", "128"))
+SUPPORTED_UPLOAD_EXTENSIONS = (".pdf", ".docx")
+
+MultiPartParser.spool_max_size = UPLOAD_SPOOL_MAX_BYTES
+
+def _upload_too_large() -> HTTPException:
+    return HTTPException(status_code=413, detail=f"Upload exceeds the {MAX_UPLOAD_BYTES} byte limit")
+
+class UploadSizeLimitMiddleware:
+    """ASGI middleware rejecting request bodies larger than max_bytes with 413"""
+
+    def __init__(self, app, max_bytes: int):
+        self.app = app
+        self.max_bytes = max_bytes
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or self.max_bytes <= 0:
+            await self.app(scope, receive, send)
+            return
+        
+        # Reject declared oversize bodies before reading a single byte
+        for name, value in scope["headers"]:
+            if name == b"content-length":
+                try:
+                    declared = int(value)
+                except ValueError:
+                    break
+                if declared > self.max_bytes:
+                    error = _upload_too_large()
+                    response = FastJSONResponse({"detail": error.detail}, status_code=error.status_code)
+                    await response(scope, receive, send)
+                    return
+                break
+        
+        received = 0
+        
+        async def limited_receive():
+            nonlocal received
+            message = await receive()
+            if message["type"] == "http.request":
+                received += len(message.get("body", b""))
+                if received > self.max_bytes:
+                    # FastAPI re-raises HTTPExceptions from body parsing, so this becomes a 413
+                    raise _upload_too_large()
+            return message
+        
+        await self.app(scope, limited_receive, send)
+
+app.add_middleware(UploadSizeLimitMiddleware, max_bytes=MAX_REQUEST_BYTES)
+
+# ==================== ADMISSION CONTROL ====================
+# Requests are admitted per priority class so heavy work cannot starve cheap reads: each class
+# (and optionally a single endpoint) has its own concurrency slots and a bounded FIFO queue.
+# A full queue or a wait past ADMISSION_QUEUE_TIMEOUT_SECONDS gets an immediate 503 with
+# Retry-After. Each client also has a token bucket; an empty bucket gets 429.
+# Concurrency slots bound the work of one process, so under the pre-fork server they apply per
+# worker; token buckets then move to the shared state database so a client's budget is global.
+
+def _parse_limit_spec(spec: str) -> Dict[str, int]:
+    """Parse "name:limit,name:limit" into a dict"""
+    limits = {}
+    for item in spec.split(","):
+        name, _, limit = item.partition(":")
+        if name.strip() and limit.strip():
+            limits[name.strip().lower()] = int(limit)
+    return limits
+
+ADMISSION_CLASS_LIMITS = _parse_limit_spec(os.getenv("ADMISSION_CLASS_LIMITS", "heavy:4,standard:16,light:64"))
+ADMISSION_QUEUE_LIMITS = _parse_limit_spec(os.getenv("ADMISSION_QUEUE_LIMITS", "heavy:8,standard:32,light:64"))
+ADMISSION_ENDPOINT_LIMITS = _parse_limit_spec(os.getenv("ADMISSION_ENDPOINT_LIMITS", "/generate-resume-pdf-batch:1"))
+ADMISSION_QUEUE_TIMEOUT_SECONDS = float(os.getenv("ADMISSION_QUEUE_TIMEOUT_SECONDS", "5"))
+RATE_LIMIT_PER_MINUTE = float(os.getenv("RATE_LIMIT_PER_MINUTE", "120"))
+RATE_LIMIT_BURST = int(os.getenv("RATE_LIMIT_BURST", "30"))
+RATE_LIMIT_MAX_CLIENTS = int(os.getenv("RATE_LIMIT_MAX_CLIENTS", "10000"))
+RATE_LIMIT_TRUST_FORWARDED = os.getenv("RATE_LIMIT_TRUST_FORWARDED", "false").lower() in ("1", "true", "yes")
+
+# Never queued or rate limited: liveness probes and scrapes must answer while work saturates
+ADMISSION_EXEMPT_PATHS = {"/", "/health", "/metrics"}
+HEAVY_ENDPOINTS = {
+    "/comprehensive-analysis", "/improve-bullet-points", "/improve-bullet-points/stream",
+    "/generate-resume-pdf", "/export-resume", "/generate-resume-pdf-batch", "/save-and-generate-pdf"
+}
+STANDARD_ENDPOINTS = {
+    "/upload-resume", "/analyze-ats", "/skill-gap-analysis", "/improve-bullet-points/preview",
+    "/recommend-projects-courses", "/best-fit-roles", "/editor-session"
+}
+
+ADMISSION_DECISIONS = Counter("resuscan_admission_decisions_total", "Admission decisions by endpoint class", ("endpoint_class", "decision"))
+ADMISSION_ACTIVE = Gauge("resuscan_admission_active", "Requests holding an admission slot", ("limiter",))
+ADMISSION_QUEUED = Gauge("resuscan_admission_queued", "Requests waiting for an admission slot", ("limiter",))
+
+def endpoint_class(path: str) -> str:
+    """Priority class of a request path: heavy, standard or light"""
+    if path in HEAVY_ENDPOINTS:
+        return "heavy"
+    if path in STANDARD_ENDPOINTS or path.startswith("/editor-session/"):
+        return "standard"
+    return "light"
 
-# CORS middleware
+class AdmissionRejected(Exception):
+    def __init__(self, retry_after: float):
+        super().__init__("Server is at capacity")
+        self.retry_after = retry_after
+
+class ConcurrencyLimiter:
+    """Concurrency slots with a bounded FIFO wait queue, used from the event loop only"""
+
+    def __init__(self, name: str, limit: int, max_queue: int, timeout: float):
+        self.name = name
+        self.limit = limit
+        self.max_queue = max_queue
+        self.timeout = timeout
+        self.active = 0
+        self._waiters = deque()
+        self._average_seconds = 1.0
+
+    @property
+    def queued(self) -> int:
+        return len(self._waiters)
+
+    def _update_gauges(self) -> None:
+        ADMISSION_ACTIVE.set(self.active, limiter=self.name)
+        ADMISSION_QUEUED.set(self.queued, limiter=self.name)
+
+    def retry_after(self) -> float:
+        """Rough time until a newly queued request would be served"""
+        return max(1.0, self._average_seconds * (self.queued + 1) / self.limit)
+
+    async def acquire(self) -> None:
+        if self.active < self.limit and not self._waiters:
+            self.active += 1
+            self._update_gauges()
+            return
+        if len(self._waiters) >= self.max_queue:
+            raise AdmissionRejected(self.retry_after())
+        
+        waiter = asyncio.get_running_loop().create_future()
+        self._waiters.append(waiter)
+        self._update_gauges()
+        try:
+            await asyncio.wait_for(waiter, self.timeout)
+        except (asyncio.TimeoutError, asyncio.CancelledError) as e:
+            if waiter.done() and not waiter.cancelled():
+                # The slot was handed over just as we gave up; pass it on
+                self.release()
+            else:
+                try:
+                    self._waiters.remove(waiter)
+                except ValueError:
+                    pass
+                self._update_gauges()
+            if isinstance(e, asyncio.CancelledError):
+                raise
+            raise AdmissionRejected(self.retry_after())
+
+    def release(self, held_seconds: float = None) -> None:
+        if held_seconds is not None:
+            self._average_seconds = 0.8 * self._average_seconds + 0.2 * held_seconds
+        while self._waiters:
+            waiter = self._waiters.popleft()
+            if not waiter.done():
+                # Hand the slot straight to the next waiter; active stays the same
+                waiter.set_result(None)
+                self._update_gauges()
+                return
+        self.active -= 1
+        self._update_gauges()
+
+class ClientRateLimiter:
+    """Per-client token buckets refilled at rate_per_minute and capped at burst tokens"""
+
+    def __init__(self, rate_per_minute: float, burst: int, max_clients: int):
+        self.rate = rate_per_minute / 60.0
+        self.burst = burst
+        self.max_clients = max_clients
+        self._buckets: "OrderedDict[str, list]" = OrderedDict()  # client -> [tokens, updated_at]
+
+    def take(self, client: str) -> float:
+        """Spend one token; returns 0 when allowed, otherwise seconds until a token is available"""
+        if self.rate <= 0:
+            return 0.0
+        now = time.monotonic()
+        bucket = self._buckets.get(client)
+        if bucket is None:
+            bucket = self._buckets[client] = [float(self.burst), now]
+            if len(self._buckets) > self.max_clients:
+                self._buckets.popitem(last=False)
+        else:
+            self._buckets.move_to_end(client)
+            bucket[0] = min(self.burst, bucket[0] + (now - bucket[1]) * self.rate)
+            bucket[1] = now
+        if bucket[0] >= 1:
+            bucket[0] -= 1
+            return 0.0
+        return (1 - bucket[0]) / self.rate
+
+    async def check(self, client: str) -> float:
+        """take() for the event loop; in-memory buckets never block"""
+        return self.take(client)
+
+class SharedClientRateLimiter(ClientRateLimiter):
+    """ClientRateLimiter whose buckets live in the shared state database, for pre-forked workers"""
+
+    def __init__(self, rate_per_minute: float, burst: int, db: SQLiteConnections):
+        super().__init__(rate_per_minute, burst, 0)
+        self.db = db
+        self._executor = None
+        self._executor_pid = None
+
+    async def check(self, client: str) -> float:
+        """take() on this worker's rate limit thread, so waiting on the database lock never blocks the loop"""
+        if self.rate <= 0:
+            return 0.0
+        if self._executor_pid != os.getpid():
+            # Threads do not survive fork; each worker starts its own
+            self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="resuscan-rate-limit")
+            self._executor_pid = os.getpid()
+        try:
+            return await asyncio.get_running_loop().run_in_executor(self._executor, self.take, client)
+        except sqlite3.Error as e:
+            # Rate limiting is a safeguard; a busy or broken database must not take the API down
+            print(f"Error checking rate limit: {str(e)}")
+            return 0.0
+
+    def take(self, client: str) -> float:
+        if self.rate <= 0:
+            return 0.0
+        now = time.time()
+        with self.db.transaction() as connection:
+            row = connection.execute(
+                "SELECT tokens, updated_at FROM rate_limit_buckets WHERE client = ?", (client,)
+            ).fetchone()
+            if row is None:
+                tokens = float(self.burst)
+                # A bucket idle long enough to refill completely is the same as no bucket
+                connection.execute(
+                    "DELETE FROM rate_limit_buckets WHERE updated_at < ?", (now - self.burst / self.rate,)
+                )
+            else:
+                tokens = min(self.burst, row[0] + max(0.0, now - row[1]) * self.rate)
+            wait = 0.0 if tokens >= 1 else (1 - tokens) / self.rate
+            if not wait:
+                tokens -= 1
+            connection.execute(
+                "INSERT OR REPLACE INTO rate_limit_buckets (client, tokens, updated_at) VALUES (?, ?, ?)",
+                (client, tokens, now)
+            )
+        return wait
+
+def client_id(scope) -> str:
+    """Rate limit key: the first X-Forwarded-For hop behind a trusted proxy, else the peer address"""
+    if RATE_LIMIT_TRUST_FORWARDED:
+        for name, value in scope["headers"]:
+            if name == b"x-forwarded-for":
+                return value.decode("latin-1").split(",")[0].strip()
+    client = scope.get("client")
+    return client[0] if client else "unknown"
+
+admission_limiters = {
+    name: ConcurrencyLimiter(name, limit, ADMISSION_QUEUE_LIMITS.get(name, 0), ADMISSION_QUEUE_TIMEOUT_SECONDS)
+    for name, limit in ADMISSION_CLASS_LIMITS.items()
+}
+endpoint_limiters = {
+    path: ConcurrencyLimiter(path, limit, ADMISSION_QUEUE_LIMITS.get(endpoint_class(path), 0), ADMISSION_QUEUE_TIMEOUT_SECONDS)
+    for path, limit in ADMISSION_ENDPOINT_LIMITS.items()
+}
+client_rate_limiter = ClientRateLimiter(RATE_LIMIT_PER_MINUTE, RATE_LIMIT_BURST, RATE_LIMIT_MAX_CLIENTS)
+
+def _rejection(status_code: int, detail: str, retry_after: float) -> Response:
+    return FastJSONResponse(
+        {"detail": detail}, status_code=status_code, headers={"Retry-After": str(math.ceil(retry_after))}
+    )
+
+class AdmissionControlMiddleware:
+    """ASGI middleware applying per-client rate limits and per-class concurrency limits"""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or scope["path"] in ADMISSION_EXEMPT_PATHS or scope["method"] == "OPTIONS":
+            await self.app(scope, receive, send)
+            return
+        
+        request_class = endpoint_class(scope["path"])
+        wait = await client_rate_limiter.check(client_id(scope))
+        if wait:
+            ADMISSION_DECISIONS.inc(endpoint_class=request_class, decision="rate_limited")
+            await _rejection(429, "Too many requests", wait)(scope, receive, send)
+            return
+        
+        limiters = [
+            limiter for limiter in (endpoint_limiters.get(scope["path"]), admission_limiters.get(request_class))
+            if limiter is not None
+        ]
+        acquired = []
+        try:
+            for limiter in limiters:
+                await limiter.acquire()
+                acquired.append(limiter)
+        except AdmissionRejected as e:
+            for limiter in acquired:
+                limiter.release()
+            ADMISSION_DECISIONS.inc(endpoint_class=request_class, decision="rejected")
+            await _rejection(503, "Server is busy, please retry", e.retry_after)(scope, receive, send)
+            return
+        except asyncio.CancelledError:
+            for limiter in acquired:
+                limiter.release()
+            raise
+        
+        ADMISSION_DECISIONS.inc(endpoint_class=request_class, decision="admitted")
+        start = time.perf_counter()
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            held = time.perf_counter() - start
+            for limiter in reversed(acquired):
+                limiter.release(held)
+
+app.add_middleware(AdmissionControlMiddleware)
+
+# CORS middleware, registered last so it wraps the other middleware and their 413/429/503
+# responses still carry CORS headers
 app.add_middleware(
     CORSMiddleware,
     allow_origins=[
@@ -48,294 +1519,571 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["Retry-After"],
 )
 
-# Initialize Groq client
-groq_api_key = os.getenv("GROQ_API_KEY")
-groq_client = None
-if groq_api_key and groq_api_key != "your_groq_api_key_here":
-    groq_client = groq.Groq(api_key=groq_api_key)
-else:
-    print("WARNING: GROQ_API_KEY not set. AI-powered features will be disabled.")
-    print("Get your API key at https://console.groq.com/ and add it to .env file")
 
-# Download required NLTK data
-try:
-    nltk.data.find('tokenizers/punkt')
-except LookupError:
-    nltk.download('punkt')
+_parsed_text_cache: "OrderedDict[str, str]" = OrderedDict()
+_parsed_text_lock = threading.Lock()
+
+def _cached_parsed_text(key: str):
+    with _parsed_text_lock:
+        text = _parsed_text_cache.get(key)
+        if text is not None:
+            _parsed_text_cache.move_to_end(key)
+    CACHE_REQUESTS.inc(cache="parsed_text", result="miss" if text is None else "hit")
+    return text
+
+def _store_parsed_text(key: str, text: str) -> None:
+    with _parsed_text_lock:
+        _parsed_text_cache[key] = text
+        _parsed_text_cache.move_to_end(key)
+        if len(_parsed_text_cache) > PARSED_TEXT_CACHE_SIZE:
+            _parsed_text_cache.popitem(last=False)
+
+async def read_upload(file: UploadFile) -> tuple:
+    """Read an upload in chunks, enforcing MAX_UPLOAD_BYTES; returns (sha256 hex, size) and rewinds it"""
+    digest = hashlib.sha256()
+    size = 0
+    while True:
+        chunk = await file.read(UPLOAD_CHUNK_SIZE)
+        if not chunk:
+            break
+        size += len(chunk)
+        if size > MAX_UPLOAD_BYTES:
+            raise _upload_too_large()
+        digest.update(chunk)
+    await file.seek(0)
+    return digest.hexdigest(), size
+
+def upload_extension(file: UploadFile) -> str:
+    """Lower-cased extension of a supported upload; 400 for anything else"""
+    ext = os.path.splitext(file.filename or "")[1].lower()
+    if ext not in SUPPORTED_UPLOAD_EXTENSIONS:
+        raise HTTPException(status_code=400, detail="Unsupported file type. Only PDF and DOCX are supported.")
+    return ext
+
+async def extract_upload_text(file: UploadFile, ext: str, file_hash: str) -> str:
+    """Text of an upload that has already been read and hashed"""
+    key = f"{ext}:{file_hash}"
+    resume_text = _cached_parsed_text(key)
+    if resume_text is None:
+        # Parse straight from the spooled upload; nothing is written under the client's filename
+        try:
+            resume_text = await run_in_threadpool(extract_text_from_stream, file.file, ext)
+        except ScannedDocumentError as e:
+            raise HTTPException(status_code=422, detail=str(e))
+        except OCRBusyError as e:
+            raise HTTPException(status_code=503, detail=str(e), headers={"Retry-After": str(math.ceil(e.retry_after))})
+        if not isinstance(resume_text, PartialText):
+            _store_parsed_text(key, resume_text)
+    return resume_text
+
+async def parse_upload(file: UploadFile) -> str:
+    """Extract text from an uploaded resume, reusing the parsed text of identical uploads"""
+    ext = upload_extension(file)
+    file_hash, size = await read_upload(file)
+    UPLOAD_SIZE.observe(size, extension=ext)
+    return await extract_upload_text(file, ext, file_hash)
+
+# ==================== REQUEST COALESCING ====================
+# Double-clicks and client retries send the same analysis several times at once. Identical
+# in-flight requests (same resume text hash, job title and endpoint options) share one
+# computation. Shared work only gets plain values, never request-owned objects such as uploads.
+
+COALESCED_REQUESTS = Counter("resuscan_coalesced_requests_total", "Analysis requests by whether they ran or joined an in-flight call", ("endpoint", "role"))
+
+class SingleFlight:
+    """Run one computation per key at a time; concurrent callers with that key await its result"""
+
+    def __init__(self):
+        # key -> [task, number of callers still waiting]
+        self._calls: Dict[tuple, list] = {}
+
+    async def run(self, key: tuple, func, *args):
+        call = self._calls.get(key)
+        if call is None:
+            task = asyncio.ensure_future(func(*args))
+            call = self._calls[key] = [task, 0]
+            task.add_done_callback(functools.partial(self._finished, key, call))
+            COALESCED_REQUESTS.inc(endpoint=key[0], role="leader")
+        else:
+            COALESCED_REQUESTS.inc(endpoint=key[0], role="follower")
+        
+        call[1] += 1
+        try:
+            # Shielded so one caller going away does not cancel the work the others wait on
+            return await asyncio.shield(call[0])
+        finally:
+            call[1] -= 1
+            if call[1] == 0 and not call[0].done():
+                # The last interested caller was cancelled; nobody needs the result any more
+                call[0].cancel()
+
+    def _finished(self, key: tuple, call: list, task: asyncio.Task) -> None:
+        if self._calls.get(key) is call:
+            del self._calls[key]
+        if not task.cancelled():
+            # Mark the exception retrieved even when every caller has already gone
+            task.exception()
+
+    def in_flight(self) -> int:
+        return len(self._calls)
+
+analysis_flights = SingleFlight()
+
+def text_fingerprint(text: str) -> str:
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+# DOCX text is read straight from the package XML with iterparse instead of building a
+# python-docx object model. Elements are cleared and detached from their parent as soon as
+# they end, so memory stays flat as documents grow. Headers, tables, text boxes and footers are
+# included, in reading order.
+
+WORD_NAMESPACE = "{http://schemas.openxmlformats.org/wordprocessingml/2006/main}"
+MARKUP_COMPATIBILITY_FALLBACK = "{http://schemas.openxmlformats.org/markup-compatibility/2006}Fallback"
+# Subtrees without document text: paragraph properties hold tab stop definitions (w:tabs/w:tab)
+_DOCX_SKIPPED_TAGS = {MARKUP_COMPATIBILITY_FALLBACK, f"{WORD_NAMESPACE}pPr"}
+_DOCX_PART_PATTERN = re.compile(r"word/(header|footer)(\d*)\.xml$")
+_DOCX_TEXT_TAGS = {
+    f"{WORD_NAMESPACE}t": None,
+    f"{WORD_NAMESPACE}tab": "\t",
+    f"{WORD_NAMESPACE}br": "\n",
+    f"{WORD_NAMESPACE}cr": "\n",
+    f"{WORD_NAMESPACE}noBreakHyphen": "-",
+}
+
+def _docx_parts(names: List[str]) -> List[str]:
+    """XML parts holding text, in reading order: headers, body, footers"""
+    headers, footers = [], []
+    for name in names:
+        match = _DOCX_PART_PATTERN.match(name)
+        if match:
+            (headers if match.group(1) == "header" else footers).append((int(match.group(2) or 0), name))
+    return [name for _, name in sorted(headers)] + ["word/document.xml"] + [name for _, name in sorted(footers)]
+
+def _iter_docx_paragraphs(xml_stream):
+    """Yield the text of each w:p in document order; text-box paragraphs come before their anchor"""
+    paragraph_tag = f"{WORD_NAMESPACE}p"
+    open_paragraphs = []
+    open_elements = []
+    skip_depth = 0
+    for event, element in ElementTree.iterparse(xml_stream, events=("start", "end")):
+        tag = element.tag
+        if event == "start":
+            open_elements.append(element)
+            if tag in _DOCX_SKIPPED_TAGS or skip_depth:
+                # Fallback markup repeats the text box content already read from mc:Choice
+                skip_depth += 1
+            elif tag == paragraph_tag:
+                open_paragraphs.append([])
+            continue
+        
+        if skip_depth:
+            skip_depth -= 1
+        elif tag == paragraph_tag:
+            yield "".join(open_paragraphs.pop())
+        elif tag in _DOCX_TEXT_TAGS and open_paragraphs:
+            text = _DOCX_TEXT_TAGS[tag]
+            open_paragraphs[-1].append((element.text or "") if text is None else text)
+        element.clear()
+        open_elements.pop()
+        if open_elements:
+            # Earlier siblings are already detached, so this is the parent's first child
+            open_elements[-1].remove(element)
+
+@timed_stage("docx_extract")
+def extract_docx_text(stream) -> str:
+    """Text of a DOCX file, one line per paragraph, including headers, footers, tables and text boxes"""
+    lines = []
+    # Header and footer lines already emitted
+    seen = set()
+    with zipfile.ZipFile(stream) as package:
+        names = set(package.namelist())
+        for part in _docx_parts(sorted(names)):
+            if part not in names:
+                continue
+            is_body = part == "word/document.xml"
+            with package.open(part) as xml_stream:
+                for paragraph in _iter_docx_paragraphs(xml_stream):
+                    if is_body:
+                        lines.append(paragraph)
+                    elif paragraph.strip() and paragraph not in seen:
+                        # First-page, even and default headers usually repeat the same lines
+                        seen.add(paragraph)
+                        lines.append(paragraph)
+    return "".join(line + "\n" for line in lines)
+
+# Scanned PDFs: pages with (almost) no text layer but a large embedded image are sent to
+# Tesseract in a separate, bounded process pool so slow OCR never occupies the request workers
+# that parse ordinary text PDFs. Results are cached per page, keyed on the page's image data.
+# At most OCR_MAX_DOCUMENTS uploads render and wait on OCR at once, so OCR can never hold more
+# than that many threads of the shared request threadpool. When OCR capacity is full the upload
+# gets 503 with Retry-After rather than a resume with pages missing.
+
+OCR_ENABLED = os.getenv("OCR_ENABLED", "true").lower() in ("1", "true", "yes")
+OCR_WORKERS = int(os.getenv("OCR_WORKERS", "2"))
+OCR_MAX_PENDING_PAGES = int(os.getenv("OCR_MAX_PENDING_PAGES", "16"))
+OCR_MAX_PAGES = int(os.getenv("OCR_MAX_PAGES", "10"))
+OCR_DPI = int(os.getenv("OCR_DPI", "300"))
+OCR_LANGUAGE = os.getenv("OCR_LANGUAGE", "eng")
+OCR_TIMEOUT_SECONDS = float(os.getenv("OCR_TIMEOUT_SECONDS", "60"))
+OCR_PAGE_CACHE_SIZE = int(os.getenv("OCR_PAGE_CACHE_SIZE", "256"))
+OCR_MAX_DOCUMENTS = int(os.getenv("OCR_MAX_DOCUMENTS", "4"))
+# A page with fewer extracted characters than this counts as having no text layer
+OCR_MIN_TEXT_CHARS = 20
+# Fraction of the page area embedded images must cover for a text-less page to count as scanned
+OCR_MIN_IMAGE_COVERAGE = 0.3
+
+OCR_PAGES = Counter("resuscan_ocr_pages_total", "Scanned PDF pages by OCR outcome", ("outcome",))
+
+class ScannedDocumentError(ValueError):
+    """Raised when a PDF has no text layer and OCR could not recover any text"""
+
+class OCRBusyError(RuntimeError):
+    """Raised when scanned pages cannot be OCR'd now because OCR capacity is full"""
+
+    def __init__(self, retry_after: float):
+        super().__init__("OCR capacity is full, please retry")
+        self.retry_after = retry_after
+
+class PartialText(str):
+    """Extracted text missing pages that OCR failed on; it is never cached"""
+
+def is_image_only_page(page, text: str) -> bool:
+    """Cheap check from the PDF objects alone: no usable text, mostly covered by images"""
+    if len(text.strip()) >= OCR_MIN_TEXT_CHARS or not page.images:
+        return False
+    page_area = float(page.width * page.height) or 1.0
+    image_area = sum(
+        max(0.0, float(image["x1"] - image["x0"])) * max(0.0, float(image["bottom"] - image["top"]))
+        for image in page.images
+    )
+    return image_area / page_area >= OCR_MIN_IMAGE_COVERAGE
+
+def _ocr_page_key(page) -> str:
+    """Cache key from the page's embedded image streams, so no rendering is needed on a hit"""
+    digest = hashlib.sha256(f"{page.width}x{page.height}@{OCR_DPI}:{OCR_LANGUAGE}".encode())
+    for image in page.images:
+        try:
+            digest.update(image["stream"].get_rawdata() or b"")
+        except Exception:
+            digest.update(repr((image["x0"], image["top"], image["x1"], image["bottom"])).encode())
+    return digest.hexdigest()
+
+def _render_page_png(page) -> bytes:
+    """Grayscale PNG of a page at OCR_DPI"""
+    image = page.to_image(resolution=OCR_DPI).original.convert("L")
+    buffer = io.BytesIO()
+    image.save(buffer, format="PNG")
+    return buffer.getvalue()
+
+def _ocr_image(png: bytes, language: str) -> str:
+    """Runs in the OCR process pool"""
+    return pytesseract.image_to_string(Image.open(io.BytesIO(png)), lang=language)
+
+_ocr_process_pool = None
+_ocr_pool_lock = threading.Lock()
+# Pages submitted to the pool and not finished, and uploads rendering or waiting on OCR
+_ocr_slots = threading.BoundedSemaphore(OCR_MAX_PENDING_PAGES)
+_ocr_documents = threading.BoundedSemaphore(OCR_MAX_DOCUMENTS)
+# Moving average of one page's time in the pool, for Retry-After
+_ocr_page_seconds = 5.0
+_ocr_page_cache: "OrderedDict[str, str]" = OrderedDict()
+_ocr_cache_lock = threading.Lock()
+
+def ocr_available() -> bool:
+    return OCR_ENABLED and pytesseract is not None and OCR_WORKERS > 0
+
+def get_ocr_process_pool() -> ProcessPoolExecutor:
+    """Lazily start the OCR process pool"""
+    global _ocr_process_pool
+    with _ocr_pool_lock:
+        if _ocr_process_pool is None:
+            _ocr_process_pool = ProcessPoolExecutor(max_workers=OCR_WORKERS, mp_context=worker_process_context())
+    return _ocr_process_pool
+
+@app.on_event("shutdown")
+def shutdown_ocr_process_pool():
+    global _ocr_process_pool
+    if _ocr_process_pool is not None:
+        _ocr_process_pool.shutdown(wait=False, cancel_futures=True)
+        _ocr_process_pool = None
+
+def _cached_ocr_text(key: str):
+    with _ocr_cache_lock:
+        text = _ocr_page_cache.get(key)
+        if text is not None:
+            _ocr_page_cache.move_to_end(key)
+    CACHE_REQUESTS.inc(cache="ocr_page", result="miss" if text is None else "hit")
+    return text
+
+def _store_ocr_text(key: str, text: str) -> None:
+    with _ocr_cache_lock:
+        _ocr_page_cache[key] = text
+        _ocr_page_cache.move_to_end(key)
+        if len(_ocr_page_cache) > OCR_PAGE_CACHE_SIZE:
+            _ocr_page_cache.popitem(last=False)
 
-try:
-    nltk.data.find('corpora/stopwords')
-except LookupError:
-    nltk.download('stopwords')
+def _finish_ocr_page(key: str, submitted_at: float, future) -> None:
+    """Free the page's slot and cache its text, even if the request waiting on it gave up"""
+    global _ocr_page_seconds
+    _ocr_slots.release()
+    EXECUTOR_QUEUE_DEPTH.dec(executor="ocr")
+    if not future.cancelled() and future.exception() is None:
+        _ocr_page_seconds = 0.8 * _ocr_page_seconds + 0.2 * (time.monotonic() - submitted_at)
+        _store_ocr_text(key, future.result())
 
-# Load spaCy model
-try:
-    nlp = spacy.load("en_core_web_sm")
-except OSError:
-    # If model not found, download it
-    import subprocess
-    subprocess.run(["python", "-m", "spacy", "download", "en_core_web_sm"])
-    nlp = spacy.load("en_core_web_sm")
+def _ocr_retry_after(pages: int) -> float:
+    """Rough seconds until the pool has worked through its queue and `pages` more"""
+    return min(OCR_TIMEOUT_SECONDS, (OCR_MAX_PENDING_PAGES + pages) * _ocr_page_seconds / OCR_WORKERS)
 
-# ATS Keywords database
-ATS_KEYWORDS = {
-    "software_engineer": [
-        "python", "javascript", "react", "node.js", "sql", "git", "docker", "kubernetes",
-        "aws", "azure", "machine learning", "api", "rest", "graphql", "microservices",
-        "agile", "scrum", "tdd", "ci/cd", "jenkins", "jira", "confluence"
-    ],
-    "data_scientist": [
-        "python", "r", "sql", "pandas", "numpy", "scikit-learn", "tensorflow", "pytorch",
-        "matplotlib", "seaborn", "plotly", "jupyter", "spark", "hadoop", "kafka",
-        "machine learning", "deep learning", "nlp", "computer vision", "statistics"
-    ],
-    "product_manager": [
-        "agile", "scrum", "kanban", "jira", "confluence", "figma", "sketch", "product strategy",
-        "user research", "a/b testing", "analytics", "sql", "excel", "powerpoint",
-        "roadmapping", "stakeholder management", "market analysis", "competitive analysis"
-    ],
-    "marketing": [
-        "google analytics", "facebook ads", "google ads", "seo", "sem", "content marketing",
-        "social media", "email marketing", "mailchimp", "hubspot", "salesforce", "crm",
-        "conversion optimization", "a/b testing", "branding", "market research"
-    ]
-}
+@timed_stage("ocr")
+def ocr_pages(pages: list) -> tuple:
+    """
+    OCR text for scanned pages as ({page index: text}, complete); complete is False when a page
+    failed. Raises OCRBusyError when pages could not be queued or did not finish in time.
+    """
+    if not ocr_available():
+        OCR_PAGES.inc(len(pages), outcome="unavailable")
+        return {}, True
+    if len(pages) > OCR_MAX_PAGES:
+        OCR_PAGES.inc(len(pages) - OCR_MAX_PAGES, outcome="skipped")
+    pages = pages[:OCR_MAX_PAGES]
+    if not _ocr_documents.acquire(blocking=False):
+        OCR_PAGES.inc(len(pages), outcome="busy")
+        raise OCRBusyError(_ocr_retry_after(len(pages)))
+    try:
+        return _ocr_document_pages(pages)
+    finally:
+        _ocr_documents.release()
 
-@app.get("/")
-async def root():
-    return {"message": "ResuScan API - Resume Analyzer + ATS Matcher"}
+def _ocr_document_pages(pages: list) -> tuple:
+    results, pending = {}, {}
+    complete = True
+    for position, (index, page) in enumerate(pages):
+        key = _ocr_page_key(page)
+        text = _cached_ocr_text(key)
+        if text is not None:
+            results[index] = text
+            OCR_PAGES.inc(outcome="cached")
+            continue
+        if not _ocr_slots.acquire(blocking=False):
+            # Pages already queued still finish and land in the page cache for the retry
+            OCR_PAGES.inc(len(pages) - position, outcome="busy")
+            raise OCRBusyError(_ocr_retry_after(len(pages) - position))
+        try:
+            future = get_ocr_process_pool().submit(_ocr_image, _render_page_png(page), OCR_LANGUAGE)
+        except Exception as e:
+            _ocr_slots.release()
+            print(f"Error submitting page {index} for OCR: {str(e)}")
+            OCR_PAGES.inc(outcome="error")
+            complete = False
+            continue
+        EXECUTOR_QUEUE_DEPTH.inc(executor="ocr")
+        future.add_done_callback(functools.partial(_finish_ocr_page, key, time.monotonic()))
+        pending[index] = future
+    
+    deadline = time.monotonic() + OCR_TIMEOUT_SECONDS
+    for index, future in pending.items():
+        try:
+            results[index] = future.result(timeout=max(0.0, deadline - time.monotonic()))
+        except FutureTimeoutError:
+            # The page keeps running in the pool and is cached when done, so a retry finds it
+            OCR_PAGES.inc(outcome="timeout")
+            raise OCRBusyError(_ocr_retry_after(0))
+        except Exception as e:
+            print(f"Error running OCR on page {index}: {str(e)}")
+            OCR_PAGES.inc(outcome="error")
+            complete = False
+            continue
+        OCR_PAGES.inc(outcome="ocr")
+    return results, complete
 
-def extract_text_from_file(file_path: str) -> str:
+@timed_stage("extract_text")
+def extract_text_from_stream(stream, ext: str) -> str:
     """
-    Extract text from PDF or DOCX file
+    Extract text from an open PDF or DOCX file object
     """
-    ext = os.path.splitext(file_path)[1].lower()
     text = ""
     if ext == ".pdf":
-        with pdfplumber.open(file_path) as pdf:
-            for page in pdf.pages:
-                text += page.extract_text() or ""
+        styled_lines = set()
+        page_texts, scanned_pages = [], []
+        with pdfplumber.open(stream) as pdf:
+            for index, page in enumerate(pdf.pages):
+                page_text = page.extract_text() or ""
+                page_texts.append(page_text)
+                if is_image_only_page(page, page_text):
+                    scanned_pages.append((index, page))
+                elif RESUME_LAYOUT_SEGMENTATION:
+                    styled_lines.update(_pdf_styled_lines(page))
+            ocr_complete = True
+            if scanned_pages:
+                ocr_texts, ocr_complete = ocr_pages(scanned_pages)
+                for index, page_text in ocr_texts.items():
+                    page_texts[index] = page_text
+        # Keep page breaks as line breaks so the last and first lines of pages stay separate
+        text = "".join(page_text + "\n" for page_text in page_texts)
+        if scanned_pages and len(text.strip()) < OCR_MIN_TEXT_CHARS:
+            raise ScannedDocumentError(
+                "This PDF is a scanned image and no text could be recognized. "
+                "Please upload a PDF with selectable text or a DOCX file."
+            )
+        if RESUME_LAYOUT_SEGMENTATION:
+            seed_resume_model(text, frozenset(styled_lines))
+        if not ocr_complete:
+            text = PartialText(text)
     elif ext == ".docx":
-        doc = Document(file_path)
-        for para in doc.paragraphs:
-            text += para.text + "\n"
+        text = extract_docx_text(stream)
     else:
         raise ValueError("Unsupported file type. Only PDF and DOCX are supported.")
     return text
 
+def extract_text_from_file(file_path: str) -> str:
+    """
+    Extract text from PDF or DOCX file
+    """
+    ext = os.path.splitext(file_path)[1].lower()
+    UPLOAD_SIZE.observe(os.path.getsize(file_path), extension=ext or "none")
+    with open(file_path, "rb") as stream:
+        return extract_text_from_stream(stream, ext)
+
 @app.post("/upload-resume")
 async def upload_resume(file: UploadFile = File(...)):
     """
     Upload and parse resume (PDF/DOCX)
     """
     try:
-        # Save uploaded file temporarily
-        file_path = f"temp_{file.filename}"
-        with open(file_path, "wb") as buffer:
-            content = await file.read()
-            buffer.write(content)
-        
-        # Extract text
-        resume_text = extract_text_from_file(file_path)
-        
-        # Clean up temp file
-        os.remove(file_path)
+        resume_text = await parse_upload(file)
         
         return {
             "success": True,
             "resume_text": resume_text,
             "message": "Resume parsed successfully"
         }
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error parsing resume: {str(e)}")
 
 # ==================== INTERNAL HELPER FUNCTIONS ====================
 # These functions contain the core logic and are called by both API endpoints and internal functions
 
+def _llm_chat_completion(prompt: str, temperature: float = 0.7, max_tokens: int = 1024) -> str:
+    """Send a single-prompt chat completion to the LLM provider, recording latency and token usage"""
+    start = time.perf_counter()
+    try:
+        response = llm_gateway.complete(llm_provider, prompt, LLM_MODEL, temperature, max_tokens)
+    except LLMUnavailableError:
+        LLM_REQUESTS.inc(model=LLM_MODEL, outcome="unavailable")
+        raise
+    except LLMRateLimitError:
+        LLM_REQUESTS.inc(model=LLM_MODEL, outcome="rate_limited")
+        raise
+    except Exception:
+        LLM_REQUESTS.inc(model=LLM_MODEL, outcome="error")
+        raise
+    finally:
+        LLM_DURATION.observe(time.perf_counter() - start, model=LLM_MODEL)
+    
+    LLM_REQUESTS.inc(model=LLM_MODEL, outcome="success")
+    LLM_TOKENS.inc(response.prompt_tokens, model=LLM_MODEL, kind="prompt")
+    LLM_TOKENS.inc(response.completion_tokens, model=LLM_MODEL, kind="completion")
+    return response.text
+
+def _llm_stream_completion(prompt: str, temperature: float = 0.7, max_tokens: int = 1024) -> Iterator[str]:
+    """Streamed _llm_chat_completion: yields text as the provider generates it; close() stops generation"""
+    start = time.perf_counter()
+    outcome = "success"
+    received = []
+    try:
+        for piece in llm_gateway.stream(llm_provider, prompt, LLM_MODEL, temperature, max_tokens):
+            if not received:
+                LLM_FIRST_TOKEN.observe(time.perf_counter() - start, model=LLM_MODEL)
+            received.append(piece)
+            yield piece
+    except LLMUnavailableError:
+        outcome = "unavailable"
+        raise
+    except LLMRateLimitError:
+        outcome = "rate_limited"
+        raise
+    except Exception:
+        outcome = "error"
+        raise
+    finally:
+        # Also reached when the caller stops early, which counts as a success
+        LLM_DURATION.observe(time.perf_counter() - start, model=LLM_MODEL)
+        LLM_REQUESTS.inc(model=LLM_MODEL, outcome=outcome)
+        if outcome == "success":
+            # Streams report no usage, so these are estimates
+            LLM_TOKENS.inc(estimate_tokens(prompt), model=LLM_MODEL, kind="prompt")
+            LLM_TOKENS.inc(estimate_tokens("".join(received)), model=LLM_MODEL, kind="completion")
+
+@timed_stage("ats_analysis")
 def _analyze_ats_internal(resume_text: str, job_title: str) -> dict:
     """Internal ATS analysis logic"""
     # Get relevant keywords for the job title
-    job_keywords = ATS_KEYWORDS.get(job_title.lower().replace(" ", "_"), [])
-    
-    # Analyze resume text
-    resume_lower = resume_text.lower()
-    matched_keywords = [keyword for keyword in job_keywords if keyword.lower() in resume_lower]
-    
-    # Calculate keyword score (40% of total)
-    keyword_score = min(100, (len(matched_keywords) / len(job_keywords)) * 100) if job_keywords else 0
-    
-    # Analyze format and structure
-    format_score = analyze_resume_format(resume_text)
-    
-    # Analyze readability
-    readability_score = analyze_readability(resume_text)
-    
-    # Analyze content structure
-    structure_score = analyze_content_structure(resume_text)
-    
-    # Calculate overall ATS score (weighted average)
-    ats_score = (
-        keyword_score * 0.4 +      # 40% - Keywords
-        format_score * 0.3 +       # 30% - Format
-        readability_score * 0.2 +  # 20% - Readability
-        structure_score * 0.1      # 10% - Structure
-    )
-    
-    # Generate improvement suggestions
-    missing_keywords = [keyword for keyword in job_keywords if keyword.lower() not in resume_lower]
-    improvement_tips = generate_improvement_tips(resume_text, keyword_score, format_score, readability_score, structure_score)
-    
-    return {
-        "ats_score": round(ats_score, 2),
-        "keyword_score": round(keyword_score, 2),
-        "format_score": round(format_score, 2),
-        "readability_score": round(readability_score, 2),
-        "structure_score": round(structure_score, 2),
-        "matched_keywords": matched_keywords,
-        "missing_keywords": missing_keywords[:10],
-        "total_keywords_checked": len(job_keywords),
-        "keywords_matched": len(matched_keywords),
-        "improvement_tips": improvement_tips,
-        "score_breakdown": {
-            "keywords": f"{keyword_score:.1f}/100",
-            "format": f"{format_score:.1f}/100",
-            "readability": f"{readability_score:.1f}/100",
-            "structure": f"{structure_score:.1f}/100"
-        }
-    }
+    job_keywords = get_ats_keywords_for_job(job_title)
+    return _score_ats_from_features(_text_features(resume_text, job_keywords), job_keywords)
 
+@timed_stage("skill_gap")
 def _skill_gap_internal(resume_text: str, target_job: str) -> dict:
     """Internal skill gap analysis logic"""
-    doc = nlp(resume_text)
+    with stage_timer("spacy_parse"):
+        doc = nlp(resume_text)
     resume_skills = extract_skills_from_text(resume_text)
     
     # Get required skills for target job
     required_skills = get_required_skills_for_job(target_job)
-    
-    # Find skill gaps
-    missing_skills = [skill for skill in required_skills if skill.lower() not in [s.lower() for s in resume_skills]]
-    existing_skills = [skill for skill in required_skills if skill.lower() in [s.lower() for s in resume_skills]]
-    
-    # Calculate skill match percentage
-    skill_match_percentage = (len(existing_skills) / len(required_skills)) * 100 if required_skills else 0
-    
-    return {
-        "resume_skills": resume_skills,
-        "required_skills": required_skills,
-        "missing_skills": missing_skills,
-        "existing_skills": existing_skills,
-        "skill_match_percentage": round(skill_match_percentage, 2),
-        "total_skills_required": len(required_skills),
-        "skills_you_have": len(existing_skills),
-        "skills_to_learn": len(missing_skills)
-    }
+    return _skill_gap_from_skills(resume_skills, required_skills, match_resume_skills(resume_text))
 
+AI_UNAVAILABLE_MESSAGE = "AI service unavailable; showing quick local suggestions"
+AI_DEGRADED_MESSAGE = "AI service is busy; some bullet points show quick local suggestions"
+AI_BULLET_ERROR_MESSAGE = "Could not improve this bullet point with AI right now"
+
+def _fallback_bullet(bullet: str, job_title: str, error: str = None) -> dict:
+    """Result entry for a bullet the LLM did not rewrite, using the local heuristic rewrite"""
+    entry = {"original": bullet, "improved": improve_bullet_heuristically(bullet, job_title), "source": "heuristic"}
+    if error:
+        entry["error"] = error
+    return entry
+
+def _heuristic_improvements(bullet_points: List[str], job_title: str, message: str = None) -> dict:
+    """Improve every bullet locally (no LLM)"""
+    result = {"improved_bullet_points": [_fallback_bullet(bullet, job_title) for bullet in bullet_points]}
+    if message:
+        result["message"] = message
+    return result
+
+@timed_stage("bullet_improvement")
 def _improve_bullets_internal(bullet_points: List[str], job_title: str) -> dict:
     """Internal bullet point improvement logic"""
-    if not groq_client:
-        return {"improved_bullet_points": bullet_points, "message": "AI service unavailable"}
+    if not llm_provider:
+        return _heuristic_improvements(bullet_points, job_title, AI_UNAVAILABLE_MESSAGE)
     
     improved_points = []
-    for bullet in bullet_points:
-        prompt = f"""
-        Improve this bullet point for a {job_title} resume.
-        
-        Original: {bullet}
-        
-        Write ONLY the improved bullet point. Do not include:
-        - Any introduction or explanation
-        - Any numbering or bullet points
-        - Multiple bullet points
-        
-        The improved bullet point should:
-        - Start with a strong action verb
-        - Include quantifiable metrics if possible
-        - Show impact and results
-        - Use relevant keywords for {job_title}
-        - Be 1-2 sentences maximum
-        
-        Return only the single improved bullet point text.
-        """
-        
+    for index, bullet in enumerate(bullet_points):
         try:
-            response = groq_client.chat.completions.create(
-                messages=[{"role": "user", "content": prompt}],
-                model="gemma2-9b-it",
-                temperature=0.7,
-                max_tokens=1024
-            )
-            
-            improved_bullet = response.choices[0].message.content.strip()
-            improved_bullet = improved_bullet.replace('**', '').replace('*', '')
-            improved_bullet = improved_bullet.replace('•', '').replace('-', '')
-            
-            if ':' in improved_bullet:
-                improved_bullet = improved_bullet.split(':')[-1].strip()
-            if improved_bullet.startswith('Improved'):
-                improved_bullet = improved_bullet.replace('Improved Version:', '').replace('Improved version:', '').strip()
-            
             improved_points.append({
                 "original": bullet,
-                "improved": improved_bullet
+                "improved": improve_bullet_with_llm(bullet, job_title),
+                "source": "llm"
             })
+        except LLMUnavailableError:
+            # Circuit open or budget exhausted: rewrite the rest locally instead of waiting
+            improved_points.extend(_fallback_bullet(b, job_title) for b in bullet_points[index:])
+            return {"improved_bullet_points": improved_points, "message": AI_DEGRADED_MESSAGE}
         except Exception as e:
-            improved_points.append({
-                "original": bullet,
-                "improved": bullet,
-                "error": str(e)
-            })
+            print(f"Error improving bullet point: {str(e)}")
+            improved_points.append(_fallback_bullet(bullet, job_title, error=AI_BULLET_ERROR_MESSAGE))
     
     return {"improved_bullet_points": improved_points}
 
+@timed_stage("recommendations")
 def _recommend_internal(missing_skills: List[str], job_title: str) -> dict:
     """Internal recommendations logic"""
-    project_database = {
-        "python": [
-            {"name": "Build a REST API with FastAPI", "difficulty": "Intermediate", "skills": ["python", "fastapi", "sql"]},
-            {"name": "Data Analysis Dashboard", "difficulty": "Beginner", "skills": ["python", "pandas", "plotly"]},
-        ],
-        "javascript": [
-            {"name": "React Portfolio Website", "difficulty": "Beginner", "skills": ["javascript", "react", "css"]},
-            {"name": "Full-Stack E-commerce App", "difficulty": "Advanced", "skills": ["javascript", "node.js", "mongodb"]},
-        ],
-        "default": [
-            {"name": "Personal Portfolio Website", "difficulty": "Beginner", "skills": ["html", "css", "javascript"]},
-            {"name": "To-Do List Application", "difficulty": "Beginner", "skills": ["javascript", "html", "css"]},
-        ]
-    }
-    
-    course_database = {
-        "python": [
-            {"name": "Python for Everybody", "platform": "Coursera", "duration": "8 weeks"},
-            {"name": "Complete Python Developer", "platform": "Udemy", "duration": "22 hours"},
-        ],
-        "javascript": [
-            {"name": "The Complete JavaScript Course", "platform": "Udemy", "duration": "69 hours"},
-            {"name": "JavaScript Algorithms", "platform": "freeCodeCamp", "duration": "300 hours"},
-        ],
-        "default": [
-            {"name": "Web Development Bootcamp", "platform": "Udemy", "duration": "63 hours"},
-            {"name": "CS50", "platform": "edX", "duration": "12 weeks"},
-        ]
-    }
-    
-    recommendations = {"projects": [], "courses": []}
-    
-    for skill in missing_skills[:5]:
-        skill_lower = skill.lower()
-        if skill_lower in project_database:
-            recommendations["projects"].extend(project_database[skill_lower])
-        if skill_lower in course_database:
-            recommendations["courses"].extend(course_database[skill_lower])
-    
-    if not recommendations["projects"]:
-        recommendations["projects"] = project_database.get("default", [])
-    if not recommendations["courses"]:
-        recommendations["courses"] = course_database.get("default", [])
-    
-    return recommendations
+    return recommendation_catalog.recommend(missing_skills)
 
 # ==================== API ENDPOINTS ====================
 
@@ -348,134 +2096,446 @@ async def analyze_ats_compatibility(
     Analyze ATS compatibility with comprehensive scoring
     """
     try:
-        return _analyze_ats_internal(resume_text, job_title)
+        key = ("analyze-ats", text_fingerprint(resume_text), job_title)
+        return await analysis_flights.run(key, run_in_threadpool, _analyze_ats_internal, resume_text, job_title)
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error analyzing ATS compatibility: {str(e)}")
 
-def analyze_resume_format(resume_text: str) -> float:
-    """Analyze resume format for ATS compatibility"""
-    score = 100.0
-    issues = []
-    
-    # Check for common ATS-unfriendly elements
-    lines = resume_text.split('\n')
+# ==================== RESUME SEGMENTATION ====================
+# Uploaded text is segmented once into sections, entries, dates and bullets; downstream
+# scorers and the LLM step read the slices they need from the cached model.
+
+RESUME_LAYOUT_SEGMENTATION = os.getenv("RESUME_LAYOUT_SEGMENTATION", "false").lower() == "true"
+RESUME_MODEL_CACHE_SIZE = 256
+
+SECTION_ALIASES = {
+    "summary": ["summary", "professional summary", "career summary", "profile", "professional profile", "about", "about me"],
+    "objective": ["objective", "career objective"],
+    "experience": ["experience", "work experience", "professional experience", "relevant experience", "employment", "employment history", "work history"],
+    "education": ["education", "academic background", "education and training"],
+    "skills": ["skills", "technical skills", "key skills", "core competencies", "skills and tools"],
+    "projects": ["projects", "personal projects", "key projects", "academic projects"],
+    "certifications": ["certifications", "certificates", "licenses and certifications"],
+    "awards": ["awards", "honors", "achievements", "awards and honors"],
+    "publications": ["publications"],
+    "volunteer": ["volunteer", "volunteering", "volunteer experience"],
+    "languages": ["languages"],
+    "interests": ["interests", "hobbies"],
+    "contact": ["contact", "contact information", "contact details"],
+}
+_SECTION_HEADINGS = {alias: name for name, aliases in SECTION_ALIASES.items() for alias in aliases}
+# Single words that name a section inside a longer all-caps or styled heading
+_SECTION_KEYWORDS = {
+    "summary": "summary", "profile": "summary", "objective": "objective",
+    "experience": "experience", "employment": "experience", "education": "education",
+    "skills": "skills", "competencies": "skills", "projects": "projects",
+    "certifications": "certifications", "awards": "awards", "publications": "publications",
+    "volunteer": "volunteer", "languages": "languages", "interests": "interests", "contact": "contact",
+}
+
+# pdfplumber reports bullet glyphs without a unicode mapping as "(cid:NNN)"
+# Numbered items need a space and a word after the marker, so "3.5 GPA" is not a bullet
+BULLET_PATTERN = re.compile(r"^(?:[•\-*○▪●◦]\s*|\(cid:\d+\)\s*|\d+[.)]\s+(?=[A-Za-z]))")
+_MONTH = r"(?:jan|feb|mar|apr|may|jun|jul|aug|sep|sept|oct|nov|dec)[a-z]*\.?"
+_DATE = rf"(?:{_MONTH}\s+)?(?:19|20)\d{{2}}|\d{{1,2}}/(?:19|20)\d{{2}}"
+DATE_RANGE_PATTERN = re.compile(rf"(?:{_DATE})(?:\s*(?:-|–|—|to)\s*(?:{_DATE}|present|current|now))?", re.IGNORECASE)
+
+class ResumeEntry:
+    """One role, project or degree: heading lines, their date range and bullets"""
+    __slots__ = ("heading", "dates", "lines", "bullets")
+
+    def __init__(self, heading: str = "", dates: str = ""):
+        self.heading = heading
+        self.dates = dates
+        self.lines: List[str] = []
+        self.bullets: List[str] = []
+
+class ResumeSection:
+    """A resume section; name is the canonical section (e.g. "experience") and title the original heading"""
+    __slots__ = ("name", "title", "lines", "entries")
+
+    def __init__(self, name: str, title: str):
+        self.name = name
+        self.title = title
+        self.lines: List[str] = []
+        self.entries: List[ResumeEntry] = []
+
+class ResumeModel:
+    """Structured resume: header lines (name, contact) followed by sections"""
+    __slots__ = ("header", "sections")
+
+    def __init__(self, header: List[str], sections: List[ResumeSection]):
+        self.header = header
+        self.sections = sections
+
+    def section_names(self) -> set:
+        """Canonical names of the sections present"""
+        return {section.name for section in self.sections}
+
+    def sections_named(self, *names: str) -> List[ResumeSection]:
+        """Sections with any of the given canonical names, in resume order"""
+        return [section for section in self.sections if section.name in names]
+
+    def bullets(self, *names: str) -> List[str]:
+        """Bullets of the named sections (all sections when no names are given)"""
+        sections = self.sections_named(*names) if names else self.sections
+        return [bullet for section in sections for entry in section.entries for bullet in entry.bullets]
+
+    def section_text(self, *names: str) -> str:
+        """Raw text of the named sections"""
+        return "\n".join(line for section in self.sections_named(*names) for line in section.lines)
+
+def _normalize_heading(line: str) -> str:
+    """Lowercase a heading and reduce it to space-separated words"""
+    return " ".join(re.sub(r"[^a-z]+", " ", line.lower().replace("&", " and ")).split())
+
+def section_heading_name(line: str, styled: bool = False) -> str:
+    """Canonical section name if the line is a section heading, else an empty string.
+
+    Known headings match exactly; short all-caps or styled (larger/bold in the PDF)
+    lines match when one of their words names a section.
+    """
+    stripped = line.strip()
+    if not stripped or len(stripped) > 50 or BULLET_PATTERN.match(stripped):
+        return ""
+    key = _normalize_heading(stripped)
+    if key in _SECTION_HEADINGS:
+        return _SECTION_HEADINGS[key]
+    words = key.split()
+    if words and len(words) <= 4 and (styled or stripped.isupper()):
+        for word in words:
+            if word in _SECTION_KEYWORDS:
+                return _SECTION_KEYWORDS[word]
+    return ""
+
+def build_resume_model(text: str, styled_lines: frozenset = frozenset()) -> ResumeModel:
+    """Segment resume text into sections, entries, dates and bullets"""
+    header = []
+    sections = []
+    section = None
+    entry = None
     
-    # Check for tables (indicated by multiple spaces or tabs)
-    table_indicators = 0
-    for line in lines:
-        if '\t' in line or line.count('  ') > 3:
-            table_indicators += 1
+    for raw_line in text.split("\n"):
+        line = raw_line.strip()
+        if not line:
+            continue
+        
+        name = section_heading_name(line, styled=line in styled_lines)
+        if name:
+            section = ResumeSection(name, line)
+            sections.append(section)
+            entry = None
+            continue
+        if section is None:
+            header.append(line)
+            continue
+        
+        section.lines.append(line)
+        bullet = BULLET_PATTERN.match(line)
+        if bullet:
+            if entry is None:
+                entry = ResumeEntry()
+                section.entries.append(entry)
+            entry.bullets.append(line[bullet.end():].strip())
+        else:
+            # A plain line after bullets (or first in the section) starts a new entry
+            if entry is None or entry.bullets:
+                entry = ResumeEntry(heading=line)
+                section.entries.append(entry)
+            if not entry.dates:
+                dates = DATE_RANGE_PATTERN.search(line)
+                if dates:
+                    entry.dates = dates.group(0)
+        if entry is not None:
+            entry.lines.append(line)
     
-    if table_indicators > len(lines) * 0.1:  # More than 10% of lines have table formatting
-        score -= 20
-        issues.append("Avoid tables - use simple text formatting")
+    return ResumeModel(header, sections)
+
+_resume_model_cache: "OrderedDict[str, ResumeModel]" = OrderedDict()
+_resume_model_lock = threading.Lock()
+
+def _resume_model_key(text: str) -> str:
+    return hashlib.sha1(text.encode("utf-8")).hexdigest()
+
+def _store_resume_model(key: str, model: ResumeModel) -> None:
+    with _resume_model_lock:
+        _resume_model_cache[key] = model
+        _resume_model_cache.move_to_end(key)
+        if len(_resume_model_cache) > RESUME_MODEL_CACHE_SIZE:
+            _resume_model_cache.popitem(last=False)
+
+def seed_resume_model(text: str, styled_lines: frozenset) -> ResumeModel:
+    """Segment with layout hints from the source PDF and cache the result for this text"""
+    model = build_resume_model(text, styled_lines)
+    _store_resume_model(_resume_model_key(text), model)
+    return model
+
+def parse_resume_model(text: str) -> ResumeModel:
+    """Cached structured model of resume text; segmentation runs once per upload"""
+    key = _resume_model_key(text)
+    with _resume_model_lock:
+        model = _resume_model_cache.get(key)
+        if model is not None:
+            _resume_model_cache.move_to_end(key)
+    if model is not None:
+        CACHE_REQUESTS.inc(cache="resume_model", result="hit")
+        return model
     
-    # Check for graphics indicators (ASCII art, excessive symbols)
-    graphic_indicators = 0
-    for line in lines:
-        if any(char in line for char in ['█', '▓', '▒', '░', '═', '║', '╔', '╗', '╚', '╝']):
-            graphic_indicators += 1
+    CACHE_REQUESTS.inc(cache="resume_model", result="miss")
+    with stage_timer("segmentation"):
+        model = build_resume_model(text)
+    _store_resume_model(key, model)
+    return model
+
+def _pdf_styled_lines(page) -> set:
+    """Lines set larger than the body text or in bold, used as heading hints"""
+    sizes = sorted(char["size"] for char in page.chars if char["text"].strip())
+    if not sizes:
+        return set()
+    body_size = sizes[len(sizes) // 2]
     
-    if graphic_indicators > 0:
-        score -= 15
-        issues.append("Remove graphics and ASCII art - use plain text")
+    styled = set()
+    for line in page.extract_text_lines(return_chars=True):
+        chars = [char for char in line["chars"] if char["text"].strip()]
+        if not chars:
+            continue
+        average_size = sum(char["size"] for char in chars) / len(chars)
+        bold_chars = sum(1 for char in chars if "bold" in char.get("fontname", "").lower())
+        if average_size >= body_size * 1.15 or bold_chars >= len(chars) * 0.8:
+            styled.add(line["text"].strip())
+    return styled
+
+# ==================== ANALYSIS FEATURES ====================
+# Every ATS sub-score is computed from counts and sets that add up across sections
+# (joined with newlines), so editor sessions can re-extract only the sections that changed.
+
+ACTION_VERBS = ['developed', 'implemented', 'created', 'managed', 'led', 'designed', 'built', 'optimized', 'improved', 'increased', 'reduced', 'achieved', 'delivered', 'coordinated', 'facilitated', 'established', 'maintained', 'performed', 'conducted', 'analyzed', 'researched', 'collaborated', 'mentored', 'trained', 'supervised']
+ESSENTIAL_SECTIONS = ['experience', 'education', 'skills', 'contact', 'summary', 'objective']
+CONTACT_INDICATORS = ['@', '.com', 'phone', 'email', 'linkedin']
+DATE_PATTERNS = ['202', '201', '200', 'present', 'current']
+COMPANY_INDICATORS = ['inc', 'corp', 'ltd', 'company', 'llc']
+GRAPHIC_CHARS = ['█', '▓', '▒', '░', '═', '║', '╔', '╗', '╚', '╝']
+
+_SUMMED_FEATURES = (
+    "line_count", "char_count", "table_lines", "graphic_lines", "formatting_chars",
+    "period_count", "word_count", "bullet_lines", "action_verb_count"
+)
+_UNION_FEATURES = ("font_sizes", "section_names", "heading_sections", "keywords", "skills")
+_ANY_FEATURES = ("has_contact", "has_dates", "has_companies")
+
+def _text_features(text: str, job_keywords: List[str] = ()) -> Dict[str, Any]:
+    """Extract the additive scoring features of a resume or a single resume section"""
+    lines = text.split('\n')
+    text_lower = text.lower()
+    words = text.split()
     
-    # Check for inconsistent formatting
-    font_sizes = []
+    font_sizes = set()
     for line in lines:
         if line.strip():
             # Simple heuristic for font size detection
             if line.isupper():
-                font_sizes.append('large')
-            elif line.strip() and not line.strip()[0].isupper():
-                font_sizes.append('small')
+                font_sizes.add('large')
+            elif not line.strip()[0].isupper():
+                font_sizes.add('small')
             else:
-                font_sizes.append('normal')
+                font_sizes.add('normal')
+    
+    return {
+        "line_count": len(lines),
+        "char_count": len(text),
+        "table_lines": sum(1 for line in lines if '\t' in line or line.count('  ') > 3),
+        "graphic_lines": sum(1 for line in lines if any(char in line for char in GRAPHIC_CHARS)),
+        "formatting_chars": text.count('*'),
+        "period_count": text.count('.'),
+        "word_count": len(words),
+        "bullet_lines": sum(1 for line in lines if line.strip().startswith(('•', '-', '*', '○'))),
+        "action_verb_count": sum(1 for word in words if word.lower() in ACTION_VERBS),
+        "font_sizes": font_sizes,
+        "section_names": {section for section in ESSENTIAL_SECTIONS if section in text_lower},
+        "heading_sections": {name for name in map(section_heading_name, lines) if name},
+        "keywords": {keyword for keyword in job_keywords if keyword.lower() in text_lower},
+        "skills": {skill for skill in TECHNICAL_SKILLS if skill in text_lower},
+        "has_contact": any(indicator in text_lower for indicator in CONTACT_INDICATORS),
+        "has_dates": any(pattern in text_lower for pattern in DATE_PATTERNS),
+        "has_companies": any(indicator in text_lower for indicator in COMPANY_INDICATORS),
+    }
+
+def _merge_features(parts: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """Combine section features into the features of the newline-joined text"""
+    if not parts:
+        return _text_features("")
+    
+    merged = {key: sum(part[key] for part in parts) for key in _SUMMED_FEATURES}
+    merged.update({key: set().union(*(part[key] for part in parts)) for key in _UNION_FEATURES})
+    merged.update({key: any(part[key] for part in parts) for key in _ANY_FEATURES})
+    # Joining sections adds one newline character between each pair
+    merged["char_count"] += len(parts) - 1
+    return merged
+
+def _format_score(features: Dict[str, Any]) -> float:
+    """Format score from extracted features"""
+    score = 100.0
+    
+    # Tables (indicated by multiple spaces or tabs) on more than 10% of lines
+    if features["table_lines"] > features["line_count"] * 0.1:
+        score -= 20
+    
+    # Graphics indicators (ASCII art, excessive symbols)
+    if features["graphic_lines"] > 0:
+        score -= 15
     
-    if len(set(font_sizes)) > 2:  # Too many different font sizes
+    # Too many different font sizes
+    if len(features["font_sizes"]) > 2:
         score -= 10
-        issues.append("Use consistent font sizes throughout")
     
-    # Check for excessive formatting
-    formatting_chars = sum(1 for char in resume_text if char in ['*', '**', '___', '###'])
-    if formatting_chars > len(resume_text) * 0.01:  # More than 1% formatting characters
+    # More than 1% formatting characters
+    if features["formatting_chars"] > features["char_count"] * 0.01:
         score -= 10
-        issues.append("Minimize special formatting - use plain text")
     
     return max(0, score)
 
-def analyze_readability(resume_text: str) -> float:
-    """Analyze resume readability"""
+def _readability_score(features: Dict[str, Any]) -> float:
+    """Readability score from extracted features"""
     score = 100.0
+    word_count = features["word_count"]
     
-    # Calculate basic readability metrics
-    sentences = resume_text.split('.')
-    words = resume_text.split()
-    
-    if len(words) == 0:
+    if word_count == 0:
         return 0
     
-    # Average sentence length
-    avg_sentence_length = len(words) / len(sentences) if sentences else 0
+    # Average sentence length (sentences are split on periods)
+    avg_sentence_length = word_count / (features["period_count"] + 1)
     if avg_sentence_length > 25:  # Too long sentences
         score -= 20
     elif avg_sentence_length < 5:  # Too short sentences
         score -= 10
     
     # Check for bullet points
-    bullet_points = sum(1 for line in resume_text.split('\n') if line.strip().startswith(('•', '-', '*', '○')))
-    if bullet_points < 3:  # Not enough bullet points
+    if features["bullet_lines"] < 3:  # Not enough bullet points
         score -= 15
-    elif bullet_points > 20:  # Too many bullet points
+    elif features["bullet_lines"] > 20:  # Too many bullet points
         score -= 10
     
     # Check for action verbs
-    action_verbs = ['developed', 'implemented', 'created', 'managed', 'led', 'designed', 'built', 'optimized', 'improved', 'increased', 'reduced', 'achieved', 'delivered', 'coordinated', 'facilitated', 'established', 'maintained', 'performed', 'conducted', 'analyzed', 'researched', 'collaborated', 'mentored', 'trained', 'supervised']
+    action_verb_ratio = features["action_verb_count"] / word_count
+    if action_verb_ratio < 0.02:  # Less than 2% action verbs
+        score -= 20
+    elif action_verb_ratio > 0.1:  # More than 10% action verbs (might be repetitive)
+        score -= 5
+    
+    return max(0, score)
+
+def _structure_score(features: Dict[str, Any]) -> float:
+    """Content structure score from extracted features"""
+    score = 100.0
+    
+    # Count section headings; fall back to mentions anywhere when no heading was recognized
+    if features["heading_sections"]:
+        found_sections = len(features["heading_sections"] & set(ESSENTIAL_SECTIONS))
+    else:
+        found_sections = len(features["section_names"])
+    if found_sections < 3:  # Missing essential sections
+        score -= 30
+    elif found_sections < 4:
+        score -= 15
+    
+    if not features["has_contact"]:
+        score -= 20
+    if not features["has_dates"]:
+        score -= 15
+    if not features["has_companies"]:
+        score -= 10
+    
+    return max(0, score)
+
+def _score_ats_from_features(features: Dict[str, Any], job_keywords: List[str]) -> dict:
+    """Build the ATS analysis result from (possibly merged) features"""
+    matched_keywords = [keyword for keyword in job_keywords if keyword in features["keywords"]]
+    
+    # Calculate keyword score (40% of total)
+    keyword_score = min(100, (len(matched_keywords) / len(job_keywords)) * 100) if job_keywords else 0
+    format_score = _format_score(features)
+    readability_score = _readability_score(features)
+    structure_score = _structure_score(features)
+    
+    # Calculate overall ATS score (weighted average)
+    ats_score = (
+        keyword_score * 0.4 +      # 40% - Keywords
+        format_score * 0.3 +       # 30% - Format
+        readability_score * 0.2 +  # 20% - Readability
+        structure_score * 0.1      # 10% - Structure
+    )
+    
+    # Generate improvement suggestions
+    missing_keywords = [keyword for keyword in job_keywords if keyword not in features["keywords"]]
+    improvement_tips = generate_improvement_tips(keyword_score, format_score, readability_score, structure_score)
+    
+    return {
+        "ats_score": round(ats_score, 2),
+        "keyword_score": round(keyword_score, 2),
+        "format_score": round(format_score, 2),
+        "readability_score": round(readability_score, 2),
+        "structure_score": round(structure_score, 2),
+        "matched_keywords": matched_keywords,
+        "missing_keywords": missing_keywords[:10],
+        "total_keywords_checked": len(job_keywords),
+        "keywords_matched": len(matched_keywords),
+        "improvement_tips": improvement_tips,
+        "score_breakdown": {
+            "keywords": f"{keyword_score:.1f}/100",
+            "format": f"{format_score:.1f}/100",
+            "readability": f"{readability_score:.1f}/100",
+            "structure": f"{structure_score:.1f}/100"
+        }
+    }
+
+def _skill_gap_from_skills(resume_skills: List[str], required_skills: List[str], matched_skills: Dict[str, str] = None) -> dict:
+    """Build the skill gap result from resume skills and semantically matched skills"""
+    resume_skills_lower = {s.lower() for s in resume_skills}
+    matched_skills = expand_skill_implications(matched_skills or {})
     
-    action_verb_count = sum(1 for word in words if word.lower() in action_verbs)
-    action_verb_ratio = action_verb_count / len(words) if words else 0
+    # Find skill gaps; a required skill is covered by an exact mention, a variant or an implying skill
+    existing_skills = []
+    missing_skills = []
+    semantic_matches = {}
+    for skill in required_skills:
+        if skill.lower() in resume_skills_lower:
+            existing_skills.append(skill)
+        elif canonical_skill(skill) in matched_skills:
+            existing_skills.append(skill)
+            evidence = matched_skills[canonical_skill(skill)]
+            if evidence != skill.lower():
+                semantic_matches[skill] = evidence
+        else:
+            missing_skills.append(skill)
     
-    if action_verb_ratio < 0.02:  # Less than 2% action verbs
-        score -= 20
-    elif action_verb_ratio > 0.1:  # More than 10% action verbs (might be repetitive)
-        score -= 5
+    # Calculate skill match percentage
+    skill_match_percentage = (len(existing_skills) / len(required_skills)) * 100 if required_skills else 0
     
-    return max(0, score)
+    return {
+        "resume_skills": resume_skills,
+        "required_skills": required_skills,
+        "missing_skills": missing_skills,
+        "existing_skills": existing_skills,
+        "skill_match_percentage": round(skill_match_percentage, 2),
+        "total_skills_required": len(required_skills),
+        "skills_you_have": len(existing_skills),
+        "skills_to_learn": len(missing_skills),
+        "semantic_matches": semantic_matches
+    }
+
+def analyze_resume_format(resume_text: str) -> float:
+    """Analyze resume format for ATS compatibility"""
+    return _format_score(_text_features(resume_text))
+
+def analyze_readability(resume_text: str) -> float:
+    """Analyze resume readability"""
+    return _readability_score(_text_features(resume_text))
 
 def analyze_content_structure(resume_text: str) -> float:
     """Analyze resume content structure"""
-    score = 100.0
-    
-    # Check for essential sections
-    sections = ['experience', 'education', 'skills', 'contact', 'summary', 'objective']
-    found_sections = sum(1 for section in sections if section.lower() in resume_text.lower())
-    
-    if found_sections < 3:  # Missing essential sections
-        score -= 30
-    elif found_sections < 4:
-        score -= 15
-    
-    # Check for contact information
-    contact_indicators = ['@', '.com', 'phone', 'email', 'linkedin']
-    has_contact = any(indicator in resume_text.lower() for indicator in contact_indicators)
-    if not has_contact:
-        score -= 20
-    
-    # Check for dates (experience timeline)
-    date_patterns = ['202', '201', '200', 'present', 'current']
-    has_dates = any(pattern in resume_text.lower() for pattern in date_patterns)
-    if not has_dates:
-        score -= 15
-    
-    # Check for company names
-    company_indicators = ['inc', 'corp', 'ltd', 'company', 'llc']
-    has_companies = any(indicator in resume_text.lower() for indicator in company_indicators)
-    if not has_companies:
-        score -= 10
-    
-    return max(0, score)
+    return _structure_score(_text_features(resume_text))
 
-def generate_improvement_tips(resume_text: str, keyword_score: float, format_score: float, readability_score: float, structure_score: float) -> List[str]:
+def generate_improvement_tips(keyword_score: float, format_score: float, readability_score: float, structure_score: float) -> List[str]:
     """Generate specific improvement tips based on scores"""
     tips = []
     
@@ -526,496 +2586,1020 @@ async def skill_gap_analysis(
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error analyzing skill gaps: {str(e)}")
 
+# ==================== BULLET STREAMING ====================
+# Bullet rewrites stream token by token: each piece is cleaned as it arrives (markdown, list
+# markers, "Improved version:" preambles, commentary lines) and the provider stream is closed
+# as soon as one complete bullet has been seen, so replies stay short and the UI shows the
+# first words after the time-to-first-token rather than after the whole completion.
+
+# One 1-2 sentence bullet is ~60 tokens; the cap leaves room for a short preamble
+LLM_BULLET_MAX_TOKENS = int(os.getenv("LLM_BULLET_MAX_TOKENS", "120"))
+# A colon this early in a preamble-like line ends the preamble ("Improved version: ...")
+BULLET_PREAMBLE_MAX_CHARS = 60
+BULLET_MIN_CHARS = 10
+BULLET_MAX_CHARS = 400
+
+_BULLET_MARKER_PATTERN = re.compile(r"^(?:[>•]\s*|[-–]\s+|\d+[.)]\s+)")
+_BULLET_FIRST_WORD_PATTERN = re.compile(r"[a-z]*")
+# Only lines whose first word is one of these can have a preamble; they are held back until a
+# colon arrives or BULLET_PREAMBLE_MAX_CHARS pass without one
+_BULLET_PREAMBLE_STARTS = ("improved", "here", "revised", "rewritten", "updated", "enhanced", "new", "bullet", "version")
+# Commentary lines models add around the bullet, matched as whole words
+_BULLET_SKIP_PREFIXES = (
+    "this improved", "here's", "here is", "starts with", "includes", "shows", "uses",
+    "be concise", "return only", "programming languages", "note",
+)
+
+def _strip_bullet_marker(text: str) -> str:
+    return _BULLET_MARKER_PATTERN.sub("", text.strip(), count=1).lstrip('" ')
+
+def _starts_with_words(text: str, prefix: str) -> bool:
+    """Whether text starts with prefix as whole words: "note: ..." does, "note-taking ..." does not"""
+    if not text.startswith(prefix):
+        return False
+    following = text[len(prefix):len(prefix) + 1]
+    return not following or not (following.isalnum() or following in "-'")
+
+def _bullet_preamble_end(cleaned: str, complete: bool):
+    """Where the bullet starts after any preamble, or None while that depends on text still to come"""
+    head = cleaned.lower()
+    word = _BULLET_FIRST_WORD_PATTERN.match(head).group()
+    if len(word) == len(head) and not complete:
+        # The first word may still grow ("New" -> "Newly")
+        return None if any(start.startswith(word) for start in _BULLET_PREAMBLE_STARTS) else 0
+    if word not in _BULLET_PREAMBLE_STARTS:
+        return 0
+    colon = cleaned.find(":", 0, BULLET_PREAMBLE_MAX_CHARS)
+    if colon >= 0:
+        return colon + 1
+    return 0 if complete or len(cleaned) >= BULLET_PREAMBLE_MAX_CHARS else None
+
+class BulletStreamCleaner:
+    """Cleans a streamed bullet rewrite incrementally; done once one complete bullet has arrived"""
+
+    def __init__(self):
+        self.text = ""
+        self.done = False
+        self._line = ""
+        # Where the current line's content starts once any of it is released, and how much was
+        self._line_start = None
+        self._line_released = 0
+
+    def _line_content(self, line: str, complete: bool):
+        """(start, cleaned text) of a line, or None while it cannot be judged yet or is not the bullet"""
+        # Every decision depends only on the text so far, never on how it was split into pieces
+        cleaned = _strip_bullet_marker(line.replace("*", "").replace("•", ""))
+        start = self._line_start
+        if start is None:
+            start = _bullet_preamble_end(cleaned, complete)
+            if start is None:
+                return None
+        # Trailing quotes and spaces are held back, so released text is always a prefix
+        content = _strip_bullet_marker(cleaned[start:]).rstrip('" \t')
+        lowered = content.lower()
+        if len(content) <= BULLET_MIN_CHARS or any(_starts_with_words(lowered, prefix) for prefix in _BULLET_SKIP_PREFIXES):
+            return None
+        if not complete and any(prefix.startswith(lowered) for prefix in _BULLET_SKIP_PREFIXES):
+            return None
+        return start, content
+
+    def _release(self, line: str, complete: bool) -> str:
+        judged = self._line_content(line, complete)
+        released = ""
+        if judged is not None:
+            self._line_start, content = judged
+            released = content[self._line_released:]
+            self._line_released = len(content)
+            self.text += released
+            # The first substantial line is the bullet; anything after it is commentary
+            self.done = complete or len(self.text) >= BULLET_MAX_CHARS
+        if complete:
+            self._line_start = None
+            self._line_released = 0
+        return released
+
+    def feed(self, piece: str) -> str:
+        """Add streamed text, returning the cleaned text it makes visible"""
+        if self.done:
+            return ""
+        self._line += piece
+        released = ""
+        while "\n" in self._line and not self.done:
+            line, self._line = self._line.split("\n", 1)
+            released += self._release(line, complete=True)
+        if not self.done:
+            released += self._release(self._line, complete=False)
+        return released
+
+    def finish(self) -> str:
+        """End of stream: judge the last line and return the cleaned bullet ("" if there was none)"""
+        if not self.done:
+            self._release(self._line, complete=True)
+            self.done = True
+        return self.text.strip()
+
+def _bullet_prompt(bullet: str, job_title: str) -> str:
+    return f"""
+        Improve this bullet point for a {job_title} resume.
+        
+        Original: {bullet}
+        
+        Write ONLY the improved bullet point. Do not include:
+        - Explanations
+        - Numbered lists
+        - Markdown formatting
+        - "Improved version" text
+        - Multiple bullet points
+        
+        The improved bullet point should:
+        - Start with a strong action verb
+        - Include quantifiable metrics if possible
+        - Show impact and results
+        - Use relevant keywords for {job_title}
+        - Be 1-2 sentences maximum
+        
+        Return only the single improved bullet point text.
+        """
+
+def stream_bullet_improvement(bullet: str, job_title: str, cleaner: BulletStreamCleaner) -> Iterator[str]:
+    """Yield the cleaned rewrite of one bullet as it streams; the LLM is stopped once it is complete"""
+    pieces = _llm_stream_completion(_bullet_prompt(bullet, job_title), max_tokens=LLM_BULLET_MAX_TOKENS)
+    try:
+        for piece in pieces:
+            released = cleaner.feed(piece)
+            if released:
+                yield released
+            if cleaner.done:
+                break
+    finally:
+        pieces.close()
+
+def _finished_bullet(cleaner: BulletStreamCleaner) -> str:
+    improved = cleaner.finish()
+    if not improved:
+        raise LLMError("LLM reply contained no bullet point", status_code=502)
+    return improved
+
+def improve_bullet_with_llm(bullet: str, job_title: str) -> str:
+    """Cleaned LLM rewrite of one bullet; raises LLMError when there is none"""
+    cleaner = BulletStreamCleaner()
+    for _ in stream_bullet_improvement(bullet, job_title, cleaner):
+        pass
+    return _finished_bullet(cleaner)
+
+def _sse_event(event: str, data: dict) -> bytes:
+    return b"event: " + event.encode() + b"\ndata: " + encode_json(data) + b"\n\n"
+
+def stream_bullet_improvements(bullet_points: List[str], job_title: str) -> Iterator[bytes]:
+    """Server-sent events for /improve-bullet-points/stream"""
+    if not llm_provider:
+        for index, entry in enumerate(_heuristic_improvements(bullet_points, job_title)["improved_bullet_points"]):
+            yield _sse_event("bullet", {"index": index, **entry})
+        yield _sse_event("done", {"message": AI_UNAVAILABLE_MESSAGE})
+        return
+    
+    message = None
+    for index, bullet in enumerate(bullet_points):
+        if message:
+            # Circuit open or budget exhausted: rewrite the rest locally instead of waiting
+            yield _sse_event("bullet", {"index": index, **_fallback_bullet(bullet, job_title)})
+            continue
+        
+        yield _sse_event("start", {"index": index, "original": bullet})
+        cleaner = BulletStreamCleaner()
+        try:
+            for delta in stream_bullet_improvement(bullet, job_title, cleaner):
+                yield _sse_event("delta", {"index": index, "text": delta})
+            entry = {"original": bullet, "improved": _finished_bullet(cleaner), "source": "llm"}
+        except LLMUnavailableError:
+            message = AI_DEGRADED_MESSAGE
+            entry = _fallback_bullet(bullet, job_title)
+        except Exception as e:
+            print(f"Error improving bullet point: {str(e)}")
+            entry = _fallback_bullet(bullet, job_title, error=AI_BULLET_ERROR_MESSAGE)
+        # The final entry replaces whatever deltas were shown for this bullet
+        yield _sse_event("bullet", {"index": index, **entry})
+    
+    yield _sse_event("done", {"message": message} if message else {})
+
 @app.post("/improve-bullet-points")
 async def improve_bullet_points(
     bullet_points: List[str] = Form(...),
     job_title: str = Form(...)
 ):
     """
-    Improve bullet points using AI
+    Improve bullet points using AI (local rewrites when no AI provider is configured)
     """
-    if not groq_client:
-        raise HTTPException(
-            status_code=503, 
-            detail="AI service unavailable. Please configure GROQ_API_KEY in .env file."
-        )
+    if not llm_provider:
+        return _heuristic_improvements(bullet_points, job_title, AI_UNAVAILABLE_MESSAGE)
     try:
-        improved_points = []
-        
-        for bullet in bullet_points:
-            prompt = f"""
-            Improve this bullet point for a {job_title} resume.
-            
-            Original: {bullet}
-            
-            Write ONLY the improved bullet point. Do not include:
-            - Explanations
-            - Numbered lists
-            - Markdown formatting
-            - "Improved version" text
-            - Multiple bullet points
-            
-            The improved bullet point should:
-            - Start with a strong action verb
-            - Include quantifiable metrics if possible
-            - Show impact and results
-            - Use relevant keywords for {job_title}
-            - Be 1-2 sentences maximum
-            
-            Return only the single improved bullet point text.
-            """
-            
-            response = groq_client.chat.completions.create(
-                messages=[{"role": "user", "content": prompt}],
-                model="gemma2-9b-it",
-                temperature=0.7,
-                max_tokens=1024
-            )
-            
-            improved_bullet = response.choices[0].message.content.strip()
-            
-            # Clean up the response - remove any markdown formatting and extra text
-            improved_bullet = improved_bullet.replace('**', '').replace('*', '')
-            improved_bullet = improved_bullet.replace('•', '').replace('-', '')
-            
-            # Remove any explanatory text and keep only the bullet point
-            if ':' in improved_bullet:
-                improved_bullet = improved_bullet.split(':')[-1].strip()
-            if improved_bullet.startswith('Improved'):
-                improved_bullet = improved_bullet.replace('Improved Version:', '').replace('Improved version:', '').strip()
-            
-            # Remove numbered lists and incomplete sentences
-            lines = improved_bullet.split('\n')
-            cleaned_lines = []
-            for line in lines:
-                line = line.strip()
-                # Skip empty lines, numbered items, and incomplete sentences
-                if (line and 
-                    not line.startswith('•') and 
-                    not line.startswith('-') and
-                    not line.startswith('1.') and
-                    not line.startswith('2.') and
-                    not line.startswith('3.') and
-                    not line.startswith('4.') and
-                    not line.startswith('5.') and
-                    not line.startswith('This improved') and
-                    not line.startswith('Here\'s an improved') and
-                    not line.startswith('Starts with') and
-                    not line.startswith('Includes') and
-                    not line.startswith('Shows') and
-                    not line.startswith('Uses') and
-                    not line.startswith('Be concise') and
-                    not line.startswith('Return only') and
-                    not line.startswith('Programming Languages') and
-                    not line.startswith('**') and
-                    not line.startswith('*') and
-                    len(line) > 10):  # Only keep substantial content
-                    cleaned_lines.append(line)
-            
-            improved_bullet = '\n'.join(cleaned_lines)
-            
-            improved_points.append({
-                "original": bullet,
-                "improved": improved_bullet
-            })
-        
-        return {
-            "improved_bullet_points": improved_points
-        }
+        # LLM calls block on rate budgets and backoff, so keep them off the event loop
+        return await run_in_threadpool(_improve_bullets_internal, bullet_points, job_title)
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error improving bullet points: {str(e)}")
 
+@app.post("/improve-bullet-points/stream")
+async def stream_bullet_point_improvements(
+    bullet_points: List[str] = Form(...),
+    job_title: str = Form(...)
+):
+    """
+    Improve bullet points with each AI rewrite streamed as server-sent events
+    """
+    # A sync iterator is advanced in the threadpool, so blocking LLM reads stay off the event loop
+    return StreamingResponse(
+        stream_bullet_improvements(bullet_points, job_title),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+@app.post("/improve-bullet-points/preview")
+async def preview_bullet_improvements(
+    bullet_points: List[str] = Form(...),
+    job_title: str = Form(...)
+):
+    """
+    Instant local rewrites to show while the AI result is on its way
+    """
+    try:
+        return _heuristic_improvements(bullet_points, job_title)
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error previewing bullet points: {str(e)}")
+
 @app.post("/recommend-projects-courses")
 async def recommend_projects_courses(
     missing_skills: List[str] = Form(...),
-    job_title: str = Form(...)
+    job_title: str = Form(...),
+    difficulty: str = Form(None)
 ):
     """
     Recommend projects and courses to fill skill gaps
     """
+    if difficulty and difficulty.lower() not in DIFFICULTY_LEVELS:
+        raise HTTPException(status_code=400, detail=f"difficulty must be one of: {', '.join(DIFFICULTY_LEVELS)}")
     try:
-        recommendations = {
-            "projects": [],
-            "courses": []
-        }
-        
-        # Pre-defined course and project recommendations
-        course_database = {
-            "python": [
-                {
-                    "name": "Python for Everybody",
-                    "platform": "Coursera (University of Michigan)",
-                    "description": "Free comprehensive Python course covering basics to advanced concepts",
-                    "url": "https://www.coursera.org/specializations/python",
-                    "duration": "4 months",
-                    "level": "Beginner to Intermediate"
-                },
-                {
-                    "name": "CS50's Introduction to Programming with Python",
-                    "platform": "edX (Harvard)",
-                    "description": "Free Harvard course on Python programming fundamentals",
-                    "url": "https://www.edx.org/course/cs50s-introduction-to-programming-with-python",
-                    "duration": "9 weeks",
-                    "level": "Beginner"
-                },
-                {
-                    "name": "Python Tutorial for Beginners",
-                    "platform": "YouTube (Programming with Mosh)",
-                    "description": "Free 6-hour comprehensive Python tutorial",
-                    "url": "https://www.youtube.com/watch?v=_uQrJ0TkZlc",
-                    "duration": "6 hours",
-                    "level": "Beginner"
-                }
-            ],
-            "javascript": [
-                {
-                    "name": "JavaScript Algorithms and Data Structures",
-                    "platform": "freeCodeCamp",
-                    "description": "Free comprehensive JavaScript course with certifications",
-                    "url": "https://www.freecodecamp.org/learn/javascript-algorithms-and-data-structures/",
-                    "duration": "300 hours",
-                    "level": "Beginner to Advanced"
-                },
-                {
-                    "name": "The Complete JavaScript Course 2024",
-                    "platform": "YouTube (Jonas Schmedtmann)",
-                    "description": "Free modern JavaScript course with real-world projects",
-                    "url": "https://www.youtube.com/watch?v=W6NZfCO5SIk",
-                    "duration": "12 hours",
-                    "level": "Beginner to Intermediate"
-                }
-            ],
-            "react": [
-                {
-                    "name": "React Tutorial for Beginners",
-                    "platform": "YouTube (Programming with Mosh)",
-                    "description": "Free React.js tutorial with hands-on projects",
-                    "url": "https://www.youtube.com/watch?v=Ke90Tje7VS0",
-                    "duration": "3 hours",
-                    "level": "Beginner"
-                },
-                {
-                    "name": "React Full Course for Beginners",
-                    "platform": "YouTube (freeCodeCamp)",
-                    "description": "Complete React course with 8 projects",
-                    "url": "https://www.youtube.com/watch?v=bMknfKXIFA8",
-                    "duration": "8 hours",
-                    "level": "Beginner to Intermediate"
-                }
-            ],
-            "sql": [
-                {
-                    "name": "SQL for Data Science",
-                    "platform": "Coursera (UC Davis)",
-                    "description": "Free SQL course focused on data science applications",
-                    "url": "https://www.coursera.org/learn/sql-for-data-science",
-                    "duration": "4 weeks",
-                    "level": "Beginner"
-                },
-                {
-                    "name": "Learn SQL In 60 Minutes",
-                    "platform": "YouTube (Web Dev Simplified)",
-                    "description": "Quick SQL tutorial covering all basics",
-                    "url": "https://www.youtube.com/watch?v=p3qvj9hO_Bo",
-                    "duration": "1 hour",
-                    "level": "Beginner"
-                }
-            ],
-            "machine learning": [
-                {
-                    "name": "Machine Learning Course",
-                    "platform": "Coursera (Stanford)",
-                    "description": "Free machine learning course by Andrew Ng",
-                    "url": "https://www.coursera.org/learn/machine-learning",
-                    "duration": "11 weeks",
-                    "level": "Intermediate"
-                },
-                {
-                    "name": "Machine Learning for Beginners",
-                    "platform": "YouTube (freeCodeCamp)",
-                    "description": "Complete ML course with Python",
-                    "url": "https://www.youtube.com/watch?v=KNAWp2S3w94",
-                    "duration": "3 hours",
-                    "level": "Beginner"
-                }
-            ],
-            "aws": [
-                {
-                    "name": "AWS Cloud Practitioner",
-                    "platform": "AWS Training",
-                    "description": "Free AWS fundamentals course",
-                    "url": "https://aws.amazon.com/training/",
-                    "duration": "6 hours",
-                    "level": "Beginner"
-                },
-                {
-                    "name": "AWS Tutorial for Beginners",
-                    "platform": "YouTube (Simplilearn)",
-                    "description": "Free AWS tutorial covering core services",
-                    "url": "https://www.youtube.com/watch?v=ulprqHHW9ng",
-                    "duration": "4 hours",
-                    "level": "Beginner"
-                }
-            ]
-        }
-        
-        project_database = {
-            "python": [
-                {
-                    "name": "Personal Finance Tracker",
-                    "description": "Build a web app to track income, expenses, and savings with data visualization",
-                    "skills_developed": ["Python", "Web Development", "Data Analysis", "SQL"],
-                    "difficulty": "Beginner",
-                    "duration": "2-3 weeks",
-                    "tech_stack": ["Flask/Django", "SQLite", "Chart.js"]
-                },
-                {
-                    "name": "Weather App with API",
-                    "description": "Create a weather application that fetches data from weather APIs",
-                    "skills_developed": ["Python", "API Integration", "HTTP Requests", "JSON"],
-                    "difficulty": "Beginner",
-                    "duration": "1-2 weeks",
-                    "tech_stack": ["Requests", "Tkinter", "OpenWeather API"]
-                },
-                {
-                    "name": "Data Analysis Dashboard",
-                    "description": "Analyze a dataset and create interactive visualizations",
-                    "skills_developed": ["Python", "Pandas", "Matplotlib", "Data Analysis"],
-                    "difficulty": "Intermediate",
-                    "duration": "2-3 weeks",
-                    "tech_stack": ["Pandas", "Matplotlib", "Jupyter"]
-                }
-            ],
-            "javascript": [
-                {
-                    "name": "Todo List App",
-                    "description": "Build a todo application with local storage and CRUD operations",
-                    "skills_developed": ["JavaScript", "DOM Manipulation", "Local Storage", "CSS"],
-                    "difficulty": "Beginner",
-                    "duration": "1 week",
-                    "tech_stack": ["HTML", "CSS", "JavaScript"]
-                },
-                {
-                    "name": "Weather Dashboard",
-                    "description": "Create a weather dashboard with multiple city support",
-                    "skills_developed": ["JavaScript", "API Integration", "Async/Await", "Fetch API"],
-                    "difficulty": "Beginner",
-                    "duration": "2 weeks",
-                    "tech_stack": ["HTML", "CSS", "JavaScript", "Weather API"]
-                },
-                {
-                    "name": "E-commerce Product Page",
-                    "description": "Build a product page with cart functionality and filters",
-                    "skills_developed": ["JavaScript", "State Management", "Event Handling", "CSS Grid"],
-                    "difficulty": "Intermediate",
-                    "duration": "2-3 weeks",
-                    "tech_stack": ["HTML", "CSS", "JavaScript"]
-                }
-            ],
-            "react": [
-                {
-                    "name": "Personal Portfolio",
-                    "description": "Create a responsive portfolio website with React components",
-                    "skills_developed": ["React", "Component Architecture", "Responsive Design", "CSS"],
-                    "difficulty": "Beginner",
-                    "duration": "2 weeks",
-                    "tech_stack": ["React", "CSS", "React Router"]
-                },
-                {
-                    "name": "Task Management App",
-                    "description": "Build a Trello-like task management application",
-                    "skills_developed": ["React", "State Management", "Drag & Drop", "Local Storage"],
-                    "difficulty": "Intermediate",
-                    "duration": "3-4 weeks",
-                    "tech_stack": ["React", "react-beautiful-dnd", "CSS"]
-                },
-                {
-                    "name": "E-commerce Store",
-                    "description": "Create a full e-commerce site with product catalog and cart",
-                    "skills_developed": ["React", "Context API", "Routing", "API Integration"],
-                    "difficulty": "Intermediate",
-                    "duration": "4-5 weeks",
-                    "tech_stack": ["React", "React Router", "Context API", "CSS"]
-                }
-            ],
-            "sql": [
-                {
-                    "name": "Library Management System",
-                    "description": "Design and implement a database for a library system",
-                    "skills_developed": ["SQL", "Database Design", "ERD", "Normalization"],
-                    "difficulty": "Beginner",
-                    "duration": "2 weeks",
-                    "tech_stack": ["MySQL/PostgreSQL", "ERD Tool"]
-                },
-                {
-                    "name": "E-commerce Database",
-                    "description": "Create a comprehensive database for an online store",
-                    "skills_developed": ["SQL", "Complex Queries", "Joins", "Indexing"],
-                    "difficulty": "Intermediate",
-                    "duration": "3 weeks",
-                    "tech_stack": ["MySQL/PostgreSQL", "Database Design"]
-                }
-            ],
-            "machine learning": [
-                {
-                    "name": "House Price Predictor",
-                    "description": "Build a ML model to predict house prices using regression",
-                    "skills_developed": ["Python", "Scikit-learn", "Data Preprocessing", "Model Evaluation"],
-                    "difficulty": "Intermediate",
-                    "duration": "3-4 weeks",
-                    "tech_stack": ["Python", "Scikit-learn", "Pandas", "Matplotlib"]
-                },
-                {
-                    "name": "Sentiment Analysis Tool",
-                    "description": "Create a tool that analyzes sentiment of text data",
-                    "skills_developed": ["NLP", "Text Processing", "Classification", "Model Training"],
-                    "difficulty": "Intermediate",
-                    "duration": "4 weeks",
-                    "tech_stack": ["Python", "NLTK", "Scikit-learn", "Flask"]
-                }
-            ],
-            "aws": [
-                {
-                    "name": "Static Website Hosting",
-                    "description": "Deploy a static website using AWS S3 and CloudFront",
-                    "skills_developed": ["AWS S3", "CloudFront", "Static Hosting", "DNS"],
-                    "difficulty": "Beginner",
-                    "duration": "1 week",
-                    "tech_stack": ["AWS S3", "CloudFront", "Route 53"]
-                },
-                {
-                    "name": "Serverless API",
-                    "description": "Build a serverless API using AWS Lambda and API Gateway",
-                    "skills_developed": ["AWS Lambda", "API Gateway", "Serverless", "JSON"],
-                    "difficulty": "Intermediate",
-                    "duration": "2-3 weeks",
-                    "tech_stack": ["AWS Lambda", "API Gateway", "DynamoDB"]
-                }
-            ]
-        }
-        
-        # Generate recommendations based on missing skills
-        for skill in missing_skills[:5]:  # Top 5 missing skills
-            skill_lower = skill.lower()
-            
-            # Find matching courses
-            for skill_key, courses in course_database.items():
-                if skill_key in skill_lower or skill_lower in skill_key:
-                    recommendations["courses"].extend(courses[:2])  # Add 2 courses per skill
-                    break
-            
-            # Find matching projects
-            for skill_key, projects in project_database.items():
-                if skill_key in skill_lower or skill_lower in skill_key:
-                    recommendations["projects"].extend(projects[:2])  # Add 2 projects per skill
-                    break
-        
-        # If no specific matches, provide general recommendations
-        if not recommendations["courses"]:
-            recommendations["courses"] = course_database.get("python", [])[:2]
-        if not recommendations["projects"]:
-            recommendations["projects"] = project_database.get("python", [])[:2]
-        
-        return recommendations
+        return recommendation_catalog.recommend(missing_skills, difficulty=difficulty)
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error generating recommendations: {str(e)}")
 
+@app.post("/best-fit-roles")
+async def best_fit_roles(
+    resume_text: str = Form(...),
+    top_n: int = Form(3)
+):
+    """
+    Rank every known role for a resume in one pass, with ATS and skill gap breakdowns
+    """
+    if not 1 <= top_n <= BEST_FIT_MAX_ROLES:
+        raise HTTPException(status_code=400, detail=f"top_n must be between 1 and {BEST_FIT_MAX_ROLES}")
+    try:
+        return _best_fit_roles_internal(resume_text, top_n)
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error ranking roles: {str(e)}")
+
+COMPREHENSIVE_ANALYSIS_FIELDS = {
+    "resume_text": "resume_text",
+    "ats": "ats_analysis",
+    "skills": "skill_gap_analysis",
+    "bullets": "bullet_point_improvements",
+    "recommendations": "recommendations",
+}
+
+def parse_analysis_fields(fields: str = None) -> List[str]:
+    """Resolve a comma-separated field selection to response keys"""
+    if not fields:
+        return list(COMPREHENSIVE_ANALYSIS_FIELDS.values())
+    
+    response_keys = set(COMPREHENSIVE_ANALYSIS_FIELDS.values())
+    selected = []
+    for field in fields.split(","):
+        field = field.strip().lower()
+        if not field:
+            continue
+        key = COMPREHENSIVE_ANALYSIS_FIELDS.get(field, field if field in response_keys else None)
+        if key is None:
+            allowed = ", ".join(COMPREHENSIVE_ANALYSIS_FIELDS)
+            raise HTTPException(status_code=400, detail=f"Unknown field '{field}'. Allowed fields: {allowed}")
+        if key not in selected:
+            selected.append(key)
+    return selected
+
+async def _comprehensive_analysis_internal(resume_text: str, job_title: str, selected: List[str], bullet_limit: int) -> dict:
+    """Compute the selected analysis parts for parsed resume text"""
+    result = {}
+    
+    if "resume_text" in selected:
+        result["resume_text"] = resume_text
+    
+    # ATS Analysis - using internal function
+    if "ats_analysis" in selected:
+        result["ats_analysis"] = await run_in_threadpool(_analyze_ats_internal, resume_text, job_title)
+    
+    # Skill Gap Analysis - recommendations are built from its missing skills
+    if "skill_gap_analysis" in selected or "recommendations" in selected:
+        skill_gap_result = await run_in_threadpool(_skill_gap_internal, resume_text, job_title)
+        if "skill_gap_analysis" in selected:
+            result["skill_gap_analysis"] = skill_gap_result
+    
+    # Improve bullet points - using internal function
+    if "bullet_point_improvements" in selected:
+        bullet_candidates = extract_bullet_points(resume_text)
+        if bullet_limit is None:
+            bullet_points = bullet_candidates[:UNPLANNED_BULLET_LIMIT]
+        else:
+            # Only the weakest bullets (per plan tier) are worth an LLM call
+            bullet_points = select_bullets_for_improvement(bullet_candidates, bullet_limit)
+        bullet_improvements = await run_in_threadpool(_improve_bullets_internal, bullet_points, job_title)
+        bullet_improvements["bullets_found"] = len(bullet_candidates)
+        bullet_improvements["bullets_selected"] = len(bullet_points)
+        result["bullet_point_improvements"] = bullet_improvements
+    
+    # Get recommendations - using internal function
+    if "recommendations" in selected:
+        result["recommendations"] = _recommend_internal(skill_gap_result['missing_skills'], job_title)
+    
+    # Keep the historical key order
+    return {key: result[key] for key in COMPREHENSIVE_ANALYSIS_FIELDS.values() if key in result}
+
 @app.post("/comprehensive-analysis")
 async def comprehensive_analysis(
     file: UploadFile = File(...),
-    job_title: str = Form(...)
+    job_title: str = Form(...),
+    fields: str = Form(None),
+    include_resume_text: bool = Form(True),
+    plan: str = Form(None)
 ):
     """
-    Comprehensive resume analysis including all features
+    Comprehensive resume analysis including all features.
+    Use fields (e.g. "ats,skills") to return only some sections and
+    include_resume_text=false to skip echoing the uploaded text back.
     """
+    selected = parse_analysis_fields(fields)
+    bullet_limit = bullet_limit_for_plan(plan)
+    if not include_resume_text and "resume_text" in selected:
+        selected.remove("resume_text")
+    
     try:
-        # Parse resume
-        file_path = f"temp_{file.filename}"
-        with open(file_path, "wb") as buffer:
-            content = await file.read()
-            buffer.write(content)
+        # Each request parses its own upload (repeats hit the parsed-text cache), so the shared
+        # computation never reads a file that its owning request may close
+        resume_text = await parse_upload(file)
+        # Identical resumes in flight share one analysis and LLM pass
+        key = ("comprehensive-analysis", text_fingerprint(resume_text), job_title, tuple(sorted(selected)), bullet_limit)
+        result = await analysis_flights.run(
+            key, _comprehensive_analysis_internal, resume_text, job_title, selected, bullet_limit
+        )
+        # Skip FastAPI's jsonable_encoder pass
+        return FastJSONResponse(result)
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error in comprehensive analysis: {str(e)}")
+
+# Common technical skills
+TECHNICAL_SKILLS = [
+    "python", "javascript", "java", "c++", "react", "angular", "vue", "node.js",
+    "sql", "mongodb", "postgresql", "mysql", "aws", "azure", "docker", "kubernetes",
+    "git", "jenkins", "jira", "agile", "scrum", "machine learning", "ai", "nlp",
+    "data analysis", "excel", "powerpoint", "photoshop", "figma", "sketch"
+]
+
+def extract_skills_from_text(text: str) -> List[str]:
+    """Extract skills from resume text"""
+    text_lower = text.lower()
+    found_skills = [skill for skill in TECHNICAL_SKILLS if skill in text_lower]
+    
+    return found_skills
+
+def get_ats_keywords_for_job(job_title: str) -> List[str]:
+    """Get ATS keywords for a specific job title"""
+    return ATS_KEYWORDS.get(job_title.lower().replace(" ", "_"), [])
+
+JOB_SKILLS_MAP = {
+    "software engineer": [
+        "python", "javascript", "java", "react", "node.js", "sql", "git", "docker",
+        "aws", "agile", "scrum", "api", "rest", "microservices"
+    ],
+    "data scientist": [
+        "python", "r", "sql", "pandas", "numpy", "scikit-learn", "tensorflow",
+        "machine learning", "statistics", "data analysis", "jupyter"
+    ],
+    "product manager": [
+        "agile", "scrum", "jira", "confluence", "figma", "product strategy",
+        "user research", "analytics", "sql", "excel", "roadmapping"
+    ],
+    "marketing": [
+        "google analytics", "facebook ads", "google ads", "seo", "sem",
+        "content marketing", "social media", "email marketing", "crm"
+    ]
+}
+
+def get_required_skills_for_job(job_title: str) -> List[str]:
+    """Get required skills for a specific job title"""
+    return JOB_SKILLS_MAP.get(job_title.lower(), [])
+
+# ==================== SKILL MATCHING ====================
+# Skill phrases are embedded as hashed character trigram vectors (no model download, CPU only),
+# stored once as a float32 .npy matrix that workers memory-map, and resume phrases are matched
+# against it with one batched dot product.
+
+SKILL_INDEX_DIR = os.getenv("SKILL_INDEX_DIR") or os.path.join(os.path.dirname(os.path.abspath(__file__)), "data")
+SKILL_EMBEDDING_DIM = int(os.getenv("SKILL_EMBEDDING_DIM", "512"))
+SKILL_MATCH_THRESHOLD = float(os.getenv("SKILL_MATCH_THRESHOLD", "0.75"))
+SKILL_PHRASE_CACHE_SIZE = 50_000
+# Shorter phrases only match exactly; trigram overlap is too noisy for them
+SKILL_FUZZY_MIN_LENGTH = 5
+
+# Spelling variants that mean the same skill
+SKILL_ALIASES = {
+    "postgres": "postgresql", "psql": "postgresql",
+    "react.js": "react", "reactjs": "react",
+    "vue.js": "vue", "vuejs": "vue", "angularjs": "angular", "angular.js": "angular",
+    "nodejs": "node.js",
+    "js": "javascript", "ecmascript": "javascript",
+    "mongo": "mongodb",
+    "k8s": "kubernetes",
+    "amazon web services": "aws", "microsoft azure": "azure",
+    "ml": "machine learning", "artificial intelligence": "ai",
+    "natural language processing": "nlp",
+    "sklearn": "scikit-learn", "scikit learn": "scikit-learn",
+    "restful": "rest", "rest api": "rest", "restful api": "rest", "apis": "api",
+    "microservice": "microservices", "micro services": "microservices",
+    "ci cd": "ci/cd", "cicd": "ci/cd",
+    "jupyter notebook": "jupyter", "jupyter notebooks": "jupyter",
+    "data analytics": "data analysis",
+    "ms excel": "excel", "microsoft excel": "excel",
+    "search engine optimization": "seo", "search engine marketing": "sem",
+    "customer relationship management": "crm",
+    "ga4": "google analytics", "adwords": "google ads", "meta ads": "facebook ads",
+}
+
+# Skills that demonstrate another skill (knowing PostgreSQL covers SQL)
+SKILL_IMPLICATIONS = {
+    "postgresql": ["sql"], "mysql": ["sql"], "sqlite": ["sql"], "sql server": ["sql"],
+    "react": ["javascript"], "angular": ["javascript"], "vue": ["javascript"],
+    "node.js": ["javascript"], "typescript": ["javascript"],
+    "pandas": ["python"], "numpy": ["python"], "django": ["python"], "flask": ["python"],
+    "scikit-learn": ["machine learning"], "tensorflow": ["machine learning"],
+    "pytorch": ["machine learning"], "keras": ["machine learning"],
+    "scrum": ["agile"], "kanban": ["agile"],
+    "kubernetes": ["docker"],
+    "graphql": ["api"], "rest": ["api"],
+}
+
+def _normalize_skill_phrase(phrase: str) -> str:
+    """Lowercase and drop separators so "Node.js", "node js" and "nodejs" compare equal"""
+    return re.sub(r"[^a-z0-9+#]", "", phrase.lower())
+
+@functools.lru_cache(maxsize=SKILL_PHRASE_CACHE_SIZE)
+def _skill_phrase_buckets(normalized: str) -> tuple:
+    """Hashed character trigram buckets of a normalized phrase"""
+    padded = f"<{normalized}>"
+    return tuple(zlib.crc32(padded[i:i + 3].encode("utf-8")) % SKILL_EMBEDDING_DIM for i in range(len(padded) - 2))
+
+def embed_skill_phrases(normalized_phrases: List[str]) -> np.ndarray:
+    """Embed normalized phrases as L2-normalized hashed trigram count vectors"""
+    matrix = np.zeros((len(normalized_phrases), SKILL_EMBEDDING_DIM), dtype=np.float32)
+    rows, cols = [], []
+    for row, phrase in enumerate(normalized_phrases):
+        buckets = _skill_phrase_buckets(phrase)
+        rows.extend([row] * len(buckets))
+        cols.extend(buckets)
+    np.add.at(matrix, (rows, cols), 1.0)
+    norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+    np.divide(matrix, norms, out=matrix, where=norms > 0)
+    return matrix
+
+def _skill_taxonomy() -> List[tuple]:
+    """(normalized variant, canonical skill) rows of the skill index"""
+    canonical = set(TECHNICAL_SKILLS)
+    for skills in JOB_SKILLS_MAP.values():
+        canonical.update(skills)
+    canonical.update(SKILL_IMPLICATIONS)
+    for implied in SKILL_IMPLICATIONS.values():
+        canonical.update(implied)
+    canonical.update(SKILL_ALIASES.values())
+    
+    rows = {_normalize_skill_phrase(skill): skill for skill in canonical}
+    for alias, skill in SKILL_ALIASES.items():
+        rows.setdefault(_normalize_skill_phrase(alias), skill)
+    return sorted(rows.items())
+
+class SkillIndex:
+    """Embedded skill taxonomy matched against resume phrases"""
+
+    def __init__(self, variants: List[str], labels: List[str], matrix: np.ndarray):
+        self.variants = variants
+        self.labels = labels
+        self.matrix = matrix
+        self.exact = dict(zip(variants, labels))
+        # normalized phrase -> canonical skill or None; phrases repeat heavily across resumes
+        self._phrase_cache: Dict[str, Any] = {}
+        self._phrase_cache_lock = threading.Lock()
+
+    @classmethod
+    def load_or_build(cls, directory: str = SKILL_INDEX_DIR) -> "SkillIndex":
+        """Memory-map the index for the current taxonomy, building it on first use"""
+        taxonomy = _skill_taxonomy()
+        variants = [variant for variant, _ in taxonomy]
+        labels = [label for _, label in taxonomy]
+        digest = hashlib.sha1(json.dumps([taxonomy, SKILL_EMBEDDING_DIM]).encode("utf-8")).hexdigest()[:12]
+        path = os.path.join(directory, f"skill_index_{digest}.npy")
         
-        # Extract text
-        resume_text = extract_text_from_file(file_path)
+        if not os.path.exists(path):
+            os.makedirs(directory, exist_ok=True)
+            # Write then rename so concurrent workers never map a half-written file
+            tmp_path = f"{path}.{os.getpid()}.tmp"
+            with open(tmp_path, "wb") as f:
+                np.save(f, embed_skill_phrases(variants))
+            os.replace(tmp_path, path)
         
-        # ATS Analysis - using internal function
-        ats_result = _analyze_ats_internal(resume_text, job_title)
+        return cls(variants, labels, np.load(path, mmap_mode="r"))
+
+    def match_phrases(self, normalized_phrases: List[str]) -> Dict[str, str]:
+        """Map each phrase that names a known skill to its canonical skill"""
+        matches = {}
+        pending = []
+        with self._phrase_cache_lock:
+            for phrase in normalized_phrases:
+                if phrase in self.exact:
+                    matches[phrase] = self.exact[phrase]
+                elif phrase in self._phrase_cache:
+                    if self._phrase_cache[phrase] is not None:
+                        matches[phrase] = self._phrase_cache[phrase]
+                elif len(phrase) >= SKILL_FUZZY_MIN_LENGTH:
+                    pending.append(phrase)
         
-        # Skill Gap Analysis - using internal function
-        skill_gap_result = _skill_gap_internal(resume_text, job_title)
+        CACHE_REQUESTS.inc(len(normalized_phrases) - len(pending), cache="skill_phrase", result="hit")
+        if not pending:
+            return matches
+        CACHE_REQUESTS.inc(len(pending), cache="skill_phrase", result="miss")
         
-        # Improve bullet points - using internal function
-        bullet_points = extract_bullet_points(resume_text)
-        bullet_improvements = _improve_bullets_internal(bullet_points, job_title)
+        scores = embed_skill_phrases(pending) @ self.matrix.T
+        best_rows = scores.argmax(axis=1)
+        best_scores = scores[np.arange(len(pending)), best_rows]
+        # Threadpool requests share the cache; lookups and the clear are guarded together
+        with self._phrase_cache_lock:
+            if len(self._phrase_cache) + len(pending) > SKILL_PHRASE_CACHE_SIZE:
+                self._phrase_cache.clear()
+            for phrase, row, score in zip(pending, best_rows, best_scores):
+                label = self.labels[row] if score >= SKILL_MATCH_THRESHOLD else None
+                self._phrase_cache[phrase] = label
+                if label is not None:
+                    matches[phrase] = label
+        return matches
+
+_skill_index = None
+_skill_index_lock = threading.Lock()
+
+def get_skill_index() -> SkillIndex:
+    """Lazily load the shared skill index"""
+    global _skill_index
+    if _skill_index is None:
+        with _skill_index_lock:
+            if _skill_index is None:
+                _skill_index = SkillIndex.load_or_build()
+    return _skill_index
+
+_SKILL_TOKEN_PATTERN = re.compile(r"[a-z0-9][a-z0-9+#./-]*[a-z0-9+#]|[a-z0-9]")
+_SKILL_TOKEN_SEPARATORS = str.maketrans("", "", "./-")
+# A one-letter token (the R language) only counts as a skill when it stands alone as a word,
+# not when it is part of "R&D", an initial ("R.") or similar fragments
+_SKILL_LETTER_BOUNDARIES = frozenset(" \t,;:()[]|")
+
+def _is_standalone_letter(line: str, index: int) -> bool:
+    before = line[index - 1] if index > 0 else " "
+    after = line[index + 1] if index + 1 < len(line) else " "
+    return before in _SKILL_LETTER_BOUNDARIES and after in _SKILL_LETTER_BOUNDARIES
+
+def extract_skill_phrases(text: str) -> Dict[str, str]:
+    """Candidate 1-3 word phrases per line, keyed by normalized form"""
+    exact = get_skill_index().exact
+    phrases = {}
+    for line in text.lower().split("\n"):
+        token_matches = list(_SKILL_TOKEN_PATTERN.finditer(line))
+        tokens = [match.group() for match in token_matches]
+        # Same result as _normalize_skill_phrase, applied once per token
+        normalized_tokens = [token.translate(_SKILL_TOKEN_SEPARATORS) for token in tokens]
+        # Shorter phrases first, so evidence for a skill is its most specific mention
+        for match, normalized in zip(token_matches, normalized_tokens):
+            token = match.group()
+            if normalized in phrases or token.isdigit():
+                continue
+            if len(token) == 1 and not _is_standalone_letter(line, match.start()):
+                continue
+            phrases[normalized] = token
+        for size in (2, 3):
+            for start in range(len(tokens) - size + 1):
+                # Numbers (years, percentages) never start or end a skill phrase
+                if tokens[start].isdigit() or tokens[start + size - 1].isdigit():
+                    continue
+                normalized = "".join(normalized_tokens[start:start + size])
+                if normalized not in phrases and (size < 3 or normalized in exact):
+                    phrases[normalized] = " ".join(tokens[start:start + size])
+    return phrases
+
+@timed_stage("skill_matching")
+def match_resume_skills(text: str) -> Dict[str, str]:
+    """Canonical skills named in the text, each with the first phrase that names it"""
+    phrases = extract_skill_phrases(text)
+    matches = get_skill_index().match_phrases(list(phrases))
+    matched = {}
+    for normalized, phrase in phrases.items():
+        if normalized in matches:
+            matched.setdefault(matches[normalized], phrase)
+    return matched
+
+def expand_skill_implications(matched: Dict[str, str]) -> Dict[str, str]:
+    """Add the skills implied by matched skills (PostgreSQL -> SQL), keeping direct evidence first"""
+    expanded = dict(matched)
+    for skill, evidence in matched.items():
+        for implied in SKILL_IMPLICATIONS.get(skill, []):
+            expanded.setdefault(implied, evidence)
+    return expanded
+
+def canonical_skill(skill: str) -> str:
+    """Canonical taxonomy name of a skill"""
+    return get_skill_index().exact.get(_normalize_skill_phrase(skill), skill.lower())
+
+# ==================== RECOMMENDATION CATALOG ====================
+# Courses and projects are loaded once from catalog/*.json and indexed by canonical skill
+# and difficulty, so a recommendation is a few dict lookups per missing skill.
+
+CATALOG_DIR = os.getenv("CATALOG_DIR") or os.path.join(os.path.dirname(os.path.abspath(__file__)), "catalog")
+CATALOG_KINDS = ("projects", "courses")
+DIFFICULTY_LEVELS = ("beginner", "intermediate", "advanced")
+
+class RecommendationCatalog:
+    """Projects and courses indexed by canonical skill and difficulty, pre-ranked per skill"""
+
+    def __init__(self):
+        self.entries: Dict[str, List[dict]] = {kind: [] for kind in CATALOG_KINDS}
+        self.aliases = {_normalize_skill_phrase(alias): skill for alias, skill in SKILL_ALIASES.items()}
+        # (kind, skill) and (kind, skill, difficulty) -> entry ids, best first
+        self.by_skill: Dict[tuple, List[int]] = {}
+        self.defaults: Dict[str, List[int]] = {kind: [] for kind in CATALOG_KINDS}
+
+    def canonical_name(self, skill: str) -> str:
+        """Canonical skill name, resolving aliases ("Postgres" -> "postgresql")"""
+        return self.aliases.get(_normalize_skill_phrase(skill), skill.strip().lower())
+
+    def canonical(self, skill: str) -> str:
+        """Index key for a skill name"""
+        return _normalize_skill_phrase(self.canonical_name(skill))
+
+    @staticmethod
+    def difficulties(entry: dict) -> List[str]:
+        """Difficulty levels covered by an entry ("Beginner to Intermediate" covers two)"""
+        label = str(entry.get("difficulty") or entry.get("level") or "").lower()
+        return [level for level in DIFFICULTY_LEVELS if level in label]
+
+    def load_directory(self, directory: str) -> int:
+        """Add every *.json file ({"projects": [...], "courses": [...], "aliases": {...}}) and rebuild the index"""
+        if not os.path.isdir(directory):
+            return 0
         
-        # Get recommendations - using internal function
-        recommendations = _recommend_internal(skill_gap_result['missing_skills'], job_title)
+        loaded = 0
+        for filename in sorted(os.listdir(directory)):
+            if not filename.lower().endswith(".json"):
+                continue
+            try:
+                with open(os.path.join(directory, filename), "r", encoding="utf-8") as f:
+                    data = json.load(f)
+                for alias, skill in data.get("aliases", {}).items():
+                    self.aliases[_normalize_skill_phrase(alias)] = skill
+                for kind in CATALOG_KINDS:
+                    self.entries[kind].extend(data.get(kind, []))
+                    loaded += len(data.get(kind, []))
+            except Exception as e:
+                print(f"Error loading catalog file {filename}: {str(e)}")
+        self.build_index()
+        return loaded
+
+    def build_index(self) -> None:
+        """Index entries by skill and difficulty, dropping duplicate names"""
+        self.by_skill = {}
+        self.defaults = {kind: [] for kind in CATALOG_KINDS}
+        for kind, entries in self.entries.items():
+            seen_names = set()
+            # Higher rating first, then easier entries, then file order
+            order = sorted(
+                range(len(entries)),
+                key=lambda i: (-float(entries[i].get("rating", 0)), [DIFFICULTY_LEVELS.index(level) for level in self.difficulties(entries[i])] or [len(DIFFICULTY_LEVELS)], i)
+            )
+            for entry_id in order:
+                entry = entries[entry_id]
+                name_key = entry.get("name", "").strip().lower()
+                if name_key in seen_names:
+                    continue
+                seen_names.add(name_key)
+                if entry.get("default"):
+                    self.defaults[kind].append(entry_id)
+                levels = self.difficulties(entry)
+                for skill in {self.canonical(skill) for skill in entry.get("skills", [])}:
+                    self.by_skill.setdefault((kind, skill), []).append(entry_id)
+                    for level in levels:
+                        self.by_skill.setdefault((kind, skill, level), []).append(entry_id)
+
+    def lookup(self, kind: str, skill: str, difficulty: str = None) -> List[int]:
+        """Ranked entry ids for a skill, falling back to the skills it implies (PostgreSQL -> SQL)"""
+        name = self.canonical_name(skill)
+        for candidate in [name] + SKILL_IMPLICATIONS.get(name, []):
+            key = _normalize_skill_phrase(candidate)
+            index_key = (kind, key, difficulty.lower()) if difficulty else (kind, key)
+            if index_key in self.by_skill:
+                return self.by_skill[index_key]
+        return []
+
+    def recommend(self, missing_skills: List[str], max_skills: int = 5, per_skill: int = 2, difficulty: str = None) -> dict:
+        """Projects and courses for the top missing skills, deduplicated and ranked by how many gaps they cover"""
+        skills, seen = [], set()
+        for skill in missing_skills:
+            if len(skills) >= max_skills:
+                break
+            name = self.canonical(skill)
+            if name not in seen:
+                seen.add(name)
+                skills.append(skill)
         
-        # Clean up temp file
-        os.remove(file_path)
+        recommendations = {}
+        for kind in CATALOG_KINDS:
+            # entry id -> [missing skills covered, position of the first skill it was picked for]
+            picked: Dict[int, List[int]] = {}
+            for position, skill in enumerate(skills):
+                added = 0
+                for entry_id in self.lookup(kind, skill, difficulty):
+                    if added >= per_skill:
+                        break
+                    if entry_id in picked:
+                        picked[entry_id][0] += 1
+                        continue
+                    picked[entry_id] = [1, position]
+                    added += 1
+            ranked = sorted(picked, key=lambda entry_id: (-picked[entry_id][0], picked[entry_id][1]))
+            if not ranked:
+                ranked = self.defaults[kind][:per_skill]
+            recommendations[kind] = [self.entries[kind][entry_id] for entry_id in ranked]
+        return recommendations
+
+def load_recommendation_catalog(directory: str = CATALOG_DIR) -> RecommendationCatalog:
+    """Build the shared catalog from the catalog directory"""
+    catalog = RecommendationCatalog()
+    catalog.load_directory(directory)
+    return catalog
+
+recommendation_catalog = load_recommendation_catalog()
+
+# ==================== ROLE FIT ====================
+# Every role is scored from one pass over the resume: the resume's term presence vector is
+# multiplied by precomputed role x term indicator matrices.
+
+BEST_FIT_MAX_ROLES = 10
+
+class RoleMatrix:
+    """Role x term indicator matrices for ATS keywords and required skills"""
+
+    def __init__(self, ats_keywords: Dict[str, List[str]], job_skills: Dict[str, List[str]]):
+        roles: Dict[str, Dict[str, List[str]]] = {}
+        for key, keywords in ats_keywords.items():
+            roles.setdefault(key.replace("_", " "), {"keywords": [], "skills": []})["keywords"] = keywords
+        for title, skills in job_skills.items():
+            roles.setdefault(title.lower(), {"keywords": [], "skills": []})["skills"] = skills
         
-        return {
-            "resume_text": resume_text,
-            "ats_analysis": ats_result,
-            "skill_gap_analysis": skill_gap_result,
-            "bullet_point_improvements": bullet_improvements,
-            "recommendations": recommendations
-        }
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=f"Error in comprehensive analysis: {str(e)}")
+        self.roles = sorted(roles)
+        self.role_terms = roles
+        self.keyword_terms = sorted({keyword for role in roles.values() for keyword in role["keywords"]})
+        self.skill_terms = sorted({skill for role in roles.values() for skill in role["skills"]})
+        self.keyword_matrix = self._indicator_matrix("keywords", self.keyword_terms)
+        self.skill_matrix = self._indicator_matrix("skills", self.skill_terms)
+        self.keyword_totals = self.keyword_matrix.sum(axis=1)
+        self.skill_totals = self.skill_matrix.sum(axis=1)
 
-def extract_skills_from_text(text: str) -> List[str]:
-    """Extract skills from resume text"""
-    # Common technical skills
-    technical_skills = [
-        "python", "javascript", "java", "c++", "react", "angular", "vue", "node.js",
-        "sql", "mongodb", "postgresql", "mysql", "aws", "azure", "docker", "kubernetes",
-        "git", "jenkins", "jira", "agile", "scrum", "machine learning", "ai", "nlp",
-        "data analysis", "excel", "powerpoint", "photoshop", "figma", "sketch"
-    ]
+    def _indicator_matrix(self, kind: str, terms: List[str]) -> np.ndarray:
+        column = {term: index for index, term in enumerate(terms)}
+        matrix = np.zeros((len(self.roles), len(terms)), dtype=np.float32)
+        for row, role in enumerate(self.roles):
+            for term in self.role_terms[role][kind]:
+                matrix[row, column[term]] = 1.0
+        return matrix
+
+    def keyword_vector(self, resume_lower: str) -> np.ndarray:
+        """Presence of each ATS keyword (same substring rule as the ATS score)"""
+        return np.fromiter((term.lower() in resume_lower for term in self.keyword_terms), dtype=np.float32, count=len(self.keyword_terms))
+
+    def skill_vector(self, resume_skills: List[str], matched_skills: Dict[str, str]) -> np.ndarray:
+        """Presence of each required skill (same rule as the skill gap analysis)"""
+        resume_skills_lower = {skill.lower() for skill in resume_skills}
+        matched = expand_skill_implications(matched_skills)
+        return np.fromiter(
+            (term.lower() in resume_skills_lower or canonical_skill(term) in matched for term in self.skill_terms),
+            dtype=np.float32, count=len(self.skill_terms)
+        )
+
+role_matrix = RoleMatrix(ATS_KEYWORDS, JOB_SKILLS_MAP)
+
+@timed_stage("best_fit_roles")
+def _best_fit_roles_internal(resume_text: str, top_n: int) -> dict:
+    """Score the resume against every role at once and return the best fits with full breakdowns"""
+    resume_lower = resume_text.lower()
+    features = _text_features(resume_text)
+    resume_skills = extract_skills_from_text(resume_text)
+    matched_skills = match_resume_skills(resume_text)
     
-    text_lower = text.lower()
-    found_skills = [skill for skill in technical_skills if skill in text_lower]
+    keyword_vector = role_matrix.keyword_vector(resume_lower)
+    skill_vector = role_matrix.skill_vector(resume_skills, matched_skills)
+    keyword_hits = role_matrix.keyword_matrix @ keyword_vector
+    skill_hits = role_matrix.skill_matrix @ skill_vector
+    
+    with np.errstate(divide="ignore", invalid="ignore"):
+        keyword_scores = np.where(role_matrix.keyword_totals > 0, np.minimum(100, keyword_hits / role_matrix.keyword_totals * 100), np.nan)
+        skill_scores = np.where(role_matrix.skill_totals > 0, skill_hits / role_matrix.skill_totals * 100, np.nan)
+    # Fit is the mean of the keyword and skill coverage the role defines
+    fit_scores = np.nan_to_num(np.nanmean(np.vstack([keyword_scores, skill_scores]), axis=0))
+    
+    # Role-independent parts are computed once; only the top roles get full result dicts
+    features["keywords"] = {term for term, present in zip(role_matrix.keyword_terms, keyword_vector) if present}
+    roles = []
+    for row in np.argsort(-fit_scores, kind="stable")[:top_n]:
+        role = role_matrix.roles[row]
+        terms = role_matrix.role_terms[role]
+        roles.append({
+            "job_title": role,
+            "fit_score": round(float(fit_scores[row]), 2),
+            "ats_analysis": _score_ats_from_features(features, terms["keywords"]),
+            "skill_gap_analysis": _skill_gap_from_skills(resume_skills, terms["skills"], matched_skills)
+        })
+    
+    return {"roles": roles, "roles_evaluated": len(role_matrix.roles)}
+
+def extract_bullet_points(text: str) -> List[str]:
+    """Extract bullet point candidates from resume text"""
+    # Prefer achievement bullets from the experience and project sections
+    bullet_points = parse_resume_model(text).bullets("experience", "projects")
+    if not bullet_points:
+        # No recognizable sections: simple bullet point extraction over the whole text
+        for line in text.split('\n'):
+            line = line.strip()
+            if line.startswith('•') or line.startswith('-') or line.startswith('*'):
+                bullet_points.append(line[1:].strip())
+            elif re.match(r'^\d+\.', line):
+                bullet_points.append(line)
+    
+    # Drop lines that only look like bullets (dates such as "2021.", stray fragments)
+    return [bullet for bullet in bullet_points if not _is_bullet_noise(bullet)]
+
+# ==================== BULLET SELECTION ====================
+# Bullets are ranked locally by how much they would gain from a rewrite, and only the
+# weakest K (per plan tier) are sent to the LLM. Requests without a plan keep the original
+# behaviour: the first bullets of the resume, unranked.
+
+WEAK_PHRASES = [
+    "responsible for", "helped with", "helped", "worked on", "assisted with", "assisted",
+    "involved in", "participated in", "tasked with", "duties included", "in charge of",
+    "various", "etc"
+]
+METRIC_PATTERN = re.compile(r"\d|%|\$")
+
+BULLET_LIMITS_BY_PLAN = _parse_limit_spec(os.getenv("BULLET_LIMITS_BY_PLAN", "free:3,pro:8,enterprise:15"))
+DEFAULT_PLAN = os.getenv("DEFAULT_PLAN", "").lower()
+UNPLANNED_BULLET_LIMIT = 10
+
+def bullet_limit_for_plan(plan: str = None):
+    """How many bullets a plan tier may send to the LLM per analysis; None without a plan"""
+    plan = (plan or DEFAULT_PLAN).lower()
+    if not plan:
+        return None
+    if plan not in BULLET_LIMITS_BY_PLAN:
+        allowed = ", ".join(BULLET_LIMITS_BY_PLAN)
+        raise HTTPException(status_code=400, detail=f"Unknown plan '{plan}'. Allowed plans: {allowed}")
+    return BULLET_LIMITS_BY_PLAN[plan]
+
+def _is_bullet_noise(bullet: str) -> bool:
+    """Date-only or very short lines that were picked up as bullets"""
+    stripped = bullet.strip().rstrip(".")
+    if not stripped or DATE_RANGE_PATTERN.fullmatch(stripped) or re.fullmatch(r"[\d\s./,:-]+", stripped):
+        return True
+    return len(stripped.split()) < 3
+
+def score_bullet_weakness(bullet: str) -> tuple:
+    """Improvement potential of a bullet (0 = already strong) and the reasons for it"""
+    words = bullet.split()
+    bullet_lower = bullet.lower()
+    first_word = re.sub(r"[^a-z]", "", words[0].lower()) if words else ""
+    score = 0.0
+    reasons = []
+    
+    if any(re.search(rf"\b{re.escape(phrase)}\b", bullet_lower) for phrase in WEAK_PHRASES):
+        score += 2.5
+        reasons.append("weak_phrasing")
+    if first_word not in ACTION_VERBS:
+        # Other past-tense openers are still verbs, just not the strongest ones
+        score += 1.0 if first_word.endswith("ed") and "weak_phrasing" not in reasons else 2.0
+        reasons.append("missing_action_verb")
+    if not METRIC_PATTERN.search(bullet):
+        score += 2.0
+        reasons.append("no_metrics")
+    if len(words) < 8:
+        score += 1.0
+        reasons.append("too_short")
+    elif len(words) > 35:
+        score += 1.0
+        reasons.append("too_long")
     
-    return found_skills
+    return score, reasons
 
-def get_required_skills_for_job(job_title: str) -> List[str]:
-    """Get required skills for a specific job title"""
-    job_skills_map = {
-        "software engineer": [
-            "python", "javascript", "java", "react", "node.js", "sql", "git", "docker",
-            "aws", "agile", "scrum", "api", "rest", "microservices"
-        ],
-        "data scientist": [
-            "python", "r", "sql", "pandas", "numpy", "scikit-learn", "tensorflow",
-            "machine learning", "statistics", "data analysis", "jupyter"
-        ],
-        "product manager": [
-            "agile", "scrum", "jira", "confluence", "figma", "product strategy",
-            "user research", "analytics", "sql", "excel", "roadmapping"
-        ],
-        "marketing": [
-            "google analytics", "facebook ads", "google ads", "seo", "sem",
-            "content marketing", "social media", "email marketing", "crm"
-        ]
-    }
+def select_bullets_for_improvement(bullet_points: List[str], limit: int) -> List[str]:
+    """The weakest unique bullets, capped at limit, in their original resume order"""
+    seen = set()
+    candidates = []
+    for index, bullet in enumerate(bullet_points):
+        key = " ".join(re.sub(r"[^a-z0-9]+", " ", bullet.lower()).split())
+        if not key or key in seen or _is_bullet_noise(bullet):
+            continue
+        seen.add(key)
+        score, _ = score_bullet_weakness(bullet)
+        if score > 0:
+            candidates.append((-score, index, bullet))
     
-    return job_skills_map.get(job_title.lower(), [])
+    candidates.sort()
+    return [bullet for _, _, bullet in sorted(candidates[:limit], key=lambda candidate: candidate[1])]
 
-def extract_bullet_points(text: str) -> List[str]:
-    """Extract bullet points from resume text"""
-    # Simple bullet point extraction
-    lines = text.split('\n')
-    bullet_points = []
+# ==================== HEURISTIC BULLET IMPROVER ====================
+# Rule-based rewrite used when the LLM is unavailable and as an instant preview:
+# weak openers become action verbs, filler words go, and a metric placeholder is added.
+
+WEAK_PHRASE_REPLACEMENTS = {
+    "responsible for": "Managed",
+    "in charge of": "Led",
+    "helped with": "Contributed to",
+    "helped": "Contributed to",
+    "worked on": "Developed",
+    "assisted with": "Supported",
+    "assisted": "Supported",
+    "involved in": "Contributed to",
+    "participated in": "Contributed to",
+    "tasked with": "Delivered",
+    "duties included": "Handled",
+}
+FILLER_WORDS_PATTERN = re.compile(r",?\s*\b(?:various|etc)\b\.?", re.IGNORECASE)
+_WEAK_OPENER_PATTERN = re.compile(
+    r"^(?:" + "|".join(re.escape(phrase) for phrase in sorted(WEAK_PHRASE_REPLACEMENTS, key=len, reverse=True)) + r")\b\s*",
+    re.IGNORECASE
+)
+
+METRIC_PLACEHOLDERS = {
+    "software engineer": "reducing [latency/cost] by [X]%",
+    "data scientist": "improving [model accuracy] by [X]%",
+    "product manager": "increasing [adoption/retention] by [X]%",
+    "marketing": "growing [traffic/conversions] by [X]%",
+}
+DEFAULT_METRIC_PLACEHOLDER = "improving [metric] by [X]%"
+
+def _verb_forms() -> Dict[str, str]:
+    """Present, third-person and -ing forms of ACTION_VERBS mapped to the past tense"""
+    irregular = {"led": "lead", "built": "build"}
+    forms = {}
+    for past in ACTION_VERBS:
+        bases = [irregular[past]] if past in irregular else [past[:-2], past[:-1]]
+        # The base is either "past minus -ed" or "past minus -d"; generate forms for both
+        for base in bases:
+            stem = base[:-1] if base.endswith("e") else base
+            third_person = base + ("es" if base.endswith(("s", "sh", "ch", "x", "z")) else "s")
+            for form in (base, third_person, stem + "ing"):
+                forms.setdefault(form, past)
+    return {form: past for form, past in forms.items() if form not in ACTION_VERBS}
+
+ACTION_VERB_FORMS = _verb_forms()
+_OPENER_ARTICLES = {"a", "an", "the", "our", "new"}
+
+def improve_bullet_heuristically(bullet: str, job_title: str = "") -> str:
+    """Rewrite a bullet locally: strong opening verb, no filler, metric placeholder if none"""
+    text = BULLET_PATTERN.sub("", bullet.strip(), count=1).strip().rstrip(".;")
+    if not text:
+        return bullet
     
-    for line in lines:
-        line = line.strip()
-        if line.startswith('•') or line.startswith('-') or line.startswith('*'):
-            bullet_points.append(line[1:].strip())
-        elif re.match(r'^\d+\.', line):
-            bullet_points.append(line)
+    # Weak opener -> action verb ("Responsible for X" -> "Managed X")
+    weak = _WEAK_OPENER_PATTERN.match(text)
+    if weak:
+        text = f"{WEAK_PHRASE_REPLACEMENTS[weak.group(0).strip().lower()]} {text[weak.end():]}"
+    text = " ".join(FILLER_WORDS_PATTERN.sub("", text).split())
     
-    return bullet_points[:10]  # Return top 10 bullet points
+    words = text.split(" ", 1)
+    first = words[0].lower()
+    if first in ACTION_VERB_FORMS:
+        # "Develop"/"Developing" -> "Developed"
+        words[0] = ACTION_VERB_FORMS[first].capitalize()
+    elif not weak and first not in ACTION_VERBS and not first.endswith("ed"):
+        # Noun-phrase opener: lead with an action verb
+        if first in _OPENER_ARTICLES:
+            words[0] = first
+        words.insert(0, "Delivered")
+    text = " ".join(words)
+    
+    if not METRIC_PATTERN.search(text):
+        placeholder = METRIC_PLACEHOLDERS.get(job_title.lower().strip(), DEFAULT_METRIC_PLACEHOLDER)
+        text = f"{text}, {placeholder}"
+    
+    return text[0].upper() + text[1:]
 
 # Resume Templates Configuration
 RESUME_TEMPLATES = {
@@ -1045,30 +3629,172 @@ RESUME_TEMPLATES = {
     }
 }
 
-# In-memory storage for resume versions
-resume_versions = {}
+# Directory scanned at startup for extra templates (one JSON file per template)
+RESUME_TEMPLATES_DIR = os.getenv(
+    "RESUME_TEMPLATES_DIR",
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), "resume_templates")
+)
 
-def save_resume_versions():
-    """Save resume versions to a JSON file"""
-    try:
-        os.makedirs("data", exist_ok=True)
-        with open("data/resume_versions.json", "w") as f:
-            json.dump(resume_versions, f, indent=2)
-    except Exception as e:
-        print(f"Error saving resume versions: {str(e)}")
+PAGE_SIZES = {"letter": letter, "a4": A4}
 
-def load_resume_versions():
-    """Load resume versions from JSON file"""
-    try:
-        if os.path.exists("data/resume_versions.json"):
-            with open("data/resume_versions.json", "r") as f:
-                return json.load(f)
-    except Exception as e:
-        print(f"Error loading resume versions: {str(e)}")
-    return {}
+# Base ReportLab stylesheet, built once and shared by every compiled template
+_BASE_STYLES = getSampleStyleSheet()
+
+class CompiledTemplate:
+    """Reusable ReportLab styles and page layout for one resume template"""
+    __slots__ = ("template_id", "pagesize", "margins", "title_style", "section_style",
+                 "body_style", "section_space")
+
+    def __init__(self, template_id: str, template: Dict[str, Any]):
+        self.template_id = template_id
+        self.pagesize = PAGE_SIZES.get(str(template.get("page_size", "letter")).lower(), letter)
+        left, right, top, bottom = template["margins"]
+        self.margins = {
+            "leftMargin": left * inch,
+            "rightMargin": right * inch,
+            "topMargin": top * inch,
+            "bottomMargin": bottom * inch
+        }
+        self.title_style = ParagraphStyle(
+            f'{template_id}Title',
+            parent=_BASE_STYLES['Heading1'],
+            fontSize=16,
+            spaceAfter=12,
+            alignment=TA_CENTER,
+            fontName='Helvetica-Bold'
+        )
+        self.section_style = ParagraphStyle(
+            f'{template_id}Section',
+            parent=_BASE_STYLES['Heading2'],
+            fontSize=template["font_size"] + 2,
+            spaceAfter=6,
+            spaceBefore=12,
+            fontName='Helvetica-Bold'
+        )
+        self.body_style = ParagraphStyle(
+            f'{template_id}Body',
+            parent=_BASE_STYLES['Normal'],
+            fontSize=template["font_size"],
+            spaceAfter=6,
+            leading=template["font_size"] * template["line_spacing"],
+            fontName='Helvetica'
+        )
+        self.section_space = template["section_spacing"] * inch
+
+# Compiled templates keyed by template id
+COMPILED_TEMPLATES: Dict[str, CompiledTemplate] = {}
+
+def register_resume_template(template_id: str, template_data: Dict[str, Any]) -> CompiledTemplate:
+    """Register a template and compile its styles so PDF builds can reuse them"""
+    defaults = {key: value for key, value in RESUME_TEMPLATES.get("professional", {}).items()
+                if key not in ("name", "description")}
+    template = {**defaults, **template_data}
+    template.setdefault("name", template_id.replace("_", " ").title())
+    template.setdefault("description", "")
+    template["margins"] = tuple(float(m) for m in template["margins"])
+    if len(template["margins"]) != 4:
+        raise ValueError(f"Template '{template_id}' margins must be (left, right, top, bottom)")
+    
+    compiled = CompiledTemplate(template_id, template)
+    RESUME_TEMPLATES[template_id] = template
+    COMPILED_TEMPLATES[template_id] = compiled
+    return compiled
+
+def load_resume_templates_from_directory(directory: str = RESUME_TEMPLATES_DIR) -> int:
+    """Register every *.json template in a directory, using the file name as the template id"""
+    if not os.path.isdir(directory):
+        return 0
+    
+    loaded = 0
+    for filename in sorted(os.listdir(directory)):
+        template_id, ext = os.path.splitext(filename)
+        if ext.lower() != ".json":
+            continue
+        try:
+            with open(os.path.join(directory, filename), "r") as f:
+                register_resume_template(template_id, json.load(f))
+            loaded += 1
+        except Exception as e:
+            print(f"Error loading resume template {filename}: {str(e)}")
+    return loaded
+
+def get_compiled_template(template_id: str) -> CompiledTemplate:
+    """Look up a compiled template, falling back to the professional layout"""
+    return COMPILED_TEMPLATES.get(template_id) or COMPILED_TEMPLATES["professional"]
+
+# Compile the built-in templates, then pick up any from the templates directory
+for _template_id, _template_data in list(RESUME_TEMPLATES.items()):
+    register_resume_template(_template_id, _template_data)
+load_resume_templates_from_directory()
+
+# ==================== RESUME VERSIONS STORE ====================
+# Versions live in SQLite (WAL mode) so every worker process reads and writes the same data;
+# each write commits immediately. A legacy data/resume_versions.json is imported on first open.
+
+VERSIONS_DB_PATH = os.getenv("VERSIONS_DB_PATH") or os.path.join(DATA_DIR, "resume_versions.db")
+LEGACY_VERSIONS_PATH = os.path.join(DATA_DIR, "resume_versions.json")
+
+class ResumeVersionStore(MutableMapping):
+    """Dict-like view of the resume versions table, safe to share across threads and forked workers"""
+
+    def __init__(self, path: str, legacy_path: str = LEGACY_VERSIONS_PATH):
+        self.path = path
+        self._connection = SQLiteConnections(path, [
+            "CREATE TABLE IF NOT EXISTS resume_versions (id TEXT PRIMARY KEY, updated_at TEXT, data TEXT NOT NULL)"
+        ])
+        self._import_legacy_json(legacy_path)
+
+    def _import_legacy_json(self, legacy_path: str) -> None:
+        if not os.path.exists(legacy_path) or len(self):
+            return
+        try:
+            with open(legacy_path, "r") as f:
+                legacy = json.load(f)
+            self.update_many(legacy)
+            print(f"Imported {len(legacy)} resume versions from {legacy_path}")
+        except Exception as e:
+            print(f"Error importing resume versions: {str(e)}")
+
+    def __getitem__(self, version_id: str) -> dict:
+        row = self._connection().execute("SELECT data FROM resume_versions WHERE id = ?", (version_id,)).fetchone()
+        if row is None:
+            raise KeyError(version_id)
+        return json.loads(row[0])
+
+    def __setitem__(self, version_id: str, version: dict) -> None:
+        self.update_many({version_id: version})
+
+    def __delitem__(self, version_id: str) -> None:
+        cursor = self._connection().execute("DELETE FROM resume_versions WHERE id = ?", (version_id,))
+        if cursor.rowcount == 0:
+            raise KeyError(version_id)
+
+    def __contains__(self, version_id) -> bool:
+        return self._connection().execute("SELECT 1 FROM resume_versions WHERE id = ?", (version_id,)).fetchone() is not None
+
+    def __iter__(self):
+        return iter([row[0] for row in self._connection().execute("SELECT id FROM resume_versions")])
+
+    def __len__(self) -> int:
+        return self._connection().execute("SELECT COUNT(*) FROM resume_versions").fetchone()[0]
 
-# Load existing resume versions on startup
-resume_versions = load_resume_versions()
+    def items(self) -> list:
+        """All (id, version) pairs in one query"""
+        return [(row[0], json.loads(row[1])) for row in self._connection().execute("SELECT id, data FROM resume_versions")]
+
+    @timed_stage("versions_write")
+    def update_many(self, versions: Dict[str, dict]) -> None:
+        """Insert or replace several versions in one transaction"""
+        with self._connection.transaction() as connection:
+            connection.executemany(
+                "INSERT OR REPLACE INTO resume_versions (id, updated_at, data) VALUES (?, ?, ?)",
+                [
+                    (version_id, version.get("updated_at"), encode_json(version).decode("utf-8"))
+                    for version_id, version in versions.items()
+                ]
+            )
+
+resume_versions = ResumeVersionStore(VERSIONS_DB_PATH)
 
 # PDF Resume Builder Endpoints
 @app.get("/get-resume-templates")
@@ -1090,11 +3816,531 @@ async def get_resume_templates():
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error retrieving templates: {str(e)}")
 
+# ==================== EDITOR SESSIONS ====================
+# Incremental analysis for the real-time editor: the client sends only the sections that
+# changed, and the session keeps per-section features so only those are re-extracted.
+# Session contents live in the shared state database so any worker can serve any session; each
+# worker keeps its own copy with the extracted features and catches up when the revision moves.
+
+EDITOR_SESSION_TTL_SECONDS = float(os.getenv("EDITOR_SESSION_TTL_SECONDS", "1800"))
+EDITOR_SESSION_MAX = int(os.getenv("EDITOR_SESSION_MAX", "1000"))
+
+EDITOR_SESSIONS = Gauge("resuscan_editor_sessions", "Active incremental editor sessions")
+LIVE_ATS_CONNECTIONS = Gauge("resuscan_live_ats_connections", "Open /ws/live-ats WebSocket connections")
+
+class EditorSession:
+    """Resume sections being edited, with cached scoring features per section"""
+
+    def __init__(self, job_title: str):
+        self.lock = threading.Lock()
+        self.sections: "OrderedDict[str, str]" = OrderedDict()
+        self.section_features: Dict[str, Dict[str, Any]] = {}
+        self.section_skills: Dict[str, Dict[str, str]] = {}
+        self.revision = 0
+        self._analysis = None
+        self.set_job_title(job_title)
+
+    def set_job_title(self, job_title: str) -> None:
+        """Switch the target job; keyword matches depend on it, so every section is re-extracted"""
+        self.job_title = job_title
+        self.job_keywords = get_ats_keywords_for_job(job_title)
+        self.required_skills = get_required_skills_for_job(job_title)
+        for section_id, text in self.sections.items():
+            self.section_features[section_id] = _text_features(text, self.job_keywords)
+        self._analysis = None
+
+    def apply(self, changes: Dict[str, Any]) -> List[str]:
+        """Apply section edits (None removes a section) and return the ids that changed"""
+        changed = []
+        for section_id, text in changes.items():
+            if text is None:
+                if self.sections.pop(section_id, None) is not None:
+                    del self.section_features[section_id]
+                    del self.section_skills[section_id]
+                    changed.append(section_id)
+            elif self.sections.get(section_id) != text:
+                self.sections[section_id] = text
+                self.section_features[section_id] = _text_features(text, self.job_keywords)
+                self.section_skills[section_id] = match_resume_skills(text)
+                changed.append(section_id)
+        if changed:
+            self._analysis = None
+        return changed
+
+    def analyze(self) -> dict:
+        """ATS and skill gap results for the whole resume, from the cached section features"""
+        if self._analysis is None:
+            features = _merge_features([self.section_features[section_id] for section_id in self.sections])
+            resume_skills = [skill for skill in TECHNICAL_SKILLS if skill in features["skills"]]
+            matched_skills = {}
+            for section_id in self.sections:
+                for skill, evidence in self.section_skills[section_id].items():
+                    matched_skills.setdefault(skill, evidence)
+            self._analysis = {
+                "ats_analysis": _score_ats_from_features(features, self.job_keywords),
+                "skill_gap_analysis": _skill_gap_from_skills(resume_skills, self.required_skills, matched_skills)
+            }
+        return self._analysis
+
+    def resume_text(self) -> str:
+        """Full resume text in section order"""
+        return "\n".join(self.sections.values())
+
+    def sync(self, job_title: str, sections: List[list], revision: int) -> None:
+        """Catch up with a stored revision, re-extracting only the sections that differ"""
+        if job_title != self.job_title:
+            self.set_job_title(job_title)
+        stored = OrderedDict(sections)
+        self.apply({**{section_id: None for section_id in self.sections if section_id not in stored}, **stored})
+        if list(self.sections) != list(stored):
+            self.sections = OrderedDict((section_id, self.sections[section_id]) for section_id in stored)
+            self._analysis = None
+        self.revision = revision
+
+class EditorSessionStore:
+    """Editor session contents in the shared state database, with optimistic revisions"""
+
+    def __init__(self, db: SQLiteConnections):
+        self.db = db
+
+    def create(self, session_id: str, session: EditorSession) -> None:
+        """Store a new session, dropping idle ones and trimming to EDITOR_SESSION_MAX"""
+        now = time.time()
+        with self.db.transaction() as connection:
+            connection.execute(
+                "INSERT INTO editor_sessions (id, job_title, sections, revision, last_access) VALUES (?, ?, ?, ?, ?)",
+                (session_id, session.job_title, json.dumps(list(session.sections.items())), session.revision, now)
+            )
+            connection.execute("DELETE FROM editor_sessions WHERE last_access < ?", (now - EDITOR_SESSION_TTL_SECONDS,))
+            connection.execute(
+                "DELETE FROM editor_sessions WHERE id IN "
+                "(SELECT id FROM editor_sessions ORDER BY last_access DESC LIMIT -1 OFFSET ?)",
+                (EDITOR_SESSION_MAX,)
+            )
+            EDITOR_SESSIONS.set(connection.execute("SELECT COUNT(*) FROM editor_sessions").fetchone()[0])
+
+    def load(self, session_id: str) -> tuple:
+        """(job_title, sections, revision) of a live session, marking it as recently used; None if missing"""
+        now = time.time()
+        with self.db.transaction() as connection:
+            row = connection.execute(
+                "SELECT job_title, sections, revision FROM editor_sessions WHERE id = ? AND last_access >= ?",
+                (session_id, now - EDITOR_SESSION_TTL_SECONDS)
+            ).fetchone()
+            if row is None:
+                return None
+            connection.execute("UPDATE editor_sessions SET last_access = ? WHERE id = ?", (now, session_id))
+        return row[0], json.loads(row[1]), row[2]
+
+    def save(self, session_id: str, session: EditorSession) -> bool:
+        """Store the session as the next revision; False if another worker saved first"""
+        cursor = self.db().execute(
+            "UPDATE editor_sessions SET job_title = ?, sections = ?, revision = revision + 1, last_access = ? "
+            "WHERE id = ? AND revision = ?",
+            (session.job_title, json.dumps(list(session.sections.items())), time.time(), session_id, session.revision)
+        )
+        return cursor.rowcount == 1
+
+    def delete(self, session_id: str) -> bool:
+        with self.db.transaction() as connection:
+            deleted = connection.execute("DELETE FROM editor_sessions WHERE id = ?", (session_id,)).rowcount
+            EDITOR_SESSIONS.set(connection.execute("SELECT COUNT(*) FROM editor_sessions").fetchone()[0])
+        return deleted == 1
+
+editor_session_store = EditorSessionStore(shared_state_db)
+# This worker's copies of stored sessions, least recently used first
+editor_sessions: "OrderedDict[str, EditorSession]" = OrderedDict()
+_editor_sessions_lock = threading.Lock()
+
+def create_editor_session(job_title: str, changes: Dict[str, Any]) -> tuple:
+    """Register a new editor session holding the given sections"""
+    session_id = str(uuid.uuid4())
+    session = EditorSession(job_title)
+    result = _edit_session(session, changes)
+    editor_session_store.create(session_id, session)
+    with _editor_sessions_lock:
+        editor_sessions[session_id] = session
+        if len(editor_sessions) > EDITOR_SESSION_MAX:
+            editor_sessions.popitem(last=False)
+    return session_id, result
+
+def get_editor_session(session_id: str) -> EditorSession:
+    """This worker's copy of a live editor session, caught up with the stored revision"""
+    stored = editor_session_store.load(session_id)
+    with _editor_sessions_lock:
+        if stored is None:
+            editor_sessions.pop(session_id, None)
+            raise HTTPException(status_code=404, detail="Editor session not found or expired")
+        session = editor_sessions.get(session_id)
+        if session is None:
+            session = editor_sessions[session_id] = EditorSession(stored[0])
+            session.revision = -1  # Not loaded yet
+            if len(editor_sessions) > EDITOR_SESSION_MAX:
+                editor_sessions.popitem(last=False)
+        else:
+            editor_sessions.move_to_end(session_id)
+    with session.lock:
+        if session.revision != stored[2]:
+            session.sync(*stored)
+    return session
+
+def validate_section_changes(changes: Any) -> Dict[str, Any]:
+    """Check that section changes map section ids to text (or null to remove a section)"""
+    if not isinstance(changes, dict) or not all(text is None or isinstance(text, str) for text in changes.values()):
+        raise HTTPException(status_code=400, detail="sections must map section ids to text or null")
+    return changes
+
+def parse_section_changes(sections: str) -> Dict[str, Any]:
+    """Parse a JSON object of section id -> text (null removes the section)"""
+    try:
+        changes = json.loads(sections) if sections else {}
+    except json.JSONDecodeError:
+        raise HTTPException(status_code=400, detail="sections must be a JSON object")
+    return validate_section_changes(changes)
+
+def _edit_session(session: EditorSession, changes: Dict[str, Any], job_title: str = None) -> dict:
+    """Apply edits to a session (caller holds its lock or owns it) and return its refreshed analysis"""
+    if job_title and job_title != session.job_title:
+        session.set_job_title(job_title)
+    updated_sections = session.apply(changes)
+    return {"job_title": session.job_title, "updated_sections": updated_sections, **session.analyze()}
+
+@timed_stage("editor_update")
+def _apply_editor_changes(session: EditorSession, changes: Dict[str, Any], job_title: str = None) -> dict:
+    """Apply edits to a connection-scoped session and return its refreshed analysis"""
+    with session.lock:
+        return _edit_session(session, changes, job_title)
+
+@timed_stage("editor_update")
+def update_stored_editor_session(session_id: str, changes: Dict[str, Any], job_title: str = None) -> dict:
+    """Apply edits to a stored session; if another worker saved first, replay them on its revision"""
+    while True:
+        session = get_editor_session(session_id)
+        with session.lock:
+            previous_job_title = session.job_title
+            result = _edit_session(session, changes, job_title)
+            if not result["updated_sections"] and session.job_title == previous_job_title:
+                return result
+            if editor_session_store.save(session_id, session):
+                session.revision += 1
+                return result
+
+@app.post("/editor-session")
+async def start_editor_session(
+    job_title: str = Form(...),
+    sections: str = Form("{}")
+):
+    """
+    Start an incremental analysis session for the real-time editor.
+    sections is a JSON object of section id -> text, e.g. {"summary": "...", "experience-0": "..."}
+    """
+    changes = parse_section_changes(sections)
+    try:
+        session_id, result = await run_in_threadpool(create_editor_session, job_title, changes)
+        return {"session_id": session_id, "expires_in": EDITOR_SESSION_TTL_SECONDS, **result}
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error starting editor session: {str(e)}")
+
+@app.post("/editor-session/{session_id}")
+async def update_editor_session(
+    session_id: str,
+    sections: str = Form("{}"),
+    job_title: str = Form(None)
+):
+    """
+    Send only the sections that changed; unchanged sections reuse their cached features
+    """
+    changes = parse_section_changes(sections)
+    try:
+        result = await run_in_threadpool(update_stored_editor_session, session_id, changes, job_title)
+        return {"session_id": session_id, **result}
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error updating editor session: {str(e)}")
+
+@app.delete("/editor-session/{session_id}")
+async def end_editor_session(session_id: str):
+    """
+    End an editor session
+    """
+    with _editor_sessions_lock:
+        editor_sessions.pop(session_id, None)
+    if not await run_in_threadpool(editor_session_store.delete, session_id):
+        raise HTTPException(status_code=404, detail="Editor session not found or expired")
+    return {"message": "Editor session ended"}
+
+@app.websocket("/ws/live-ats")
+async def live_ats_websocket(websocket: WebSocket, job_title: str = "", session_id: str = None):
+    """
+    Push ATS and skill gap scores as the user types.
+    Each JSON message ({"sections": {...}, "job_title": "..."}) is answered with the refreshed
+    analysis; pass session_id to continue an /editor-session instead of starting empty.
+    """
+    if session_id:
+        try:
+            await run_in_threadpool(get_editor_session, session_id)
+        except HTTPException as e:
+            await websocket.close(code=4404, reason=e.detail)
+            return
+        session = None
+    else:
+        # Connection-scoped session: sections, resolved job keywords and features live with the socket
+        session = EditorSession(job_title)
+    
+    await websocket.accept()
+    LIVE_ATS_CONNECTIONS.inc()
+    try:
+        while True:
+            message = await websocket.receive_text()
+            try:
+                payload = json.loads(message)
+                if not isinstance(payload, dict):
+                    raise HTTPException(status_code=400, detail="Messages must be JSON objects")
+                changes = validate_section_changes(payload.get("sections") or {})
+                # Rescoring runs in the threadpool so one typing user never stalls other connections
+                if session is None:
+                    result = await run_in_threadpool(update_stored_editor_session, session_id, changes, payload.get("job_title"))
+                else:
+                    result = await run_in_threadpool(_apply_editor_changes, session, changes, payload.get("job_title"))
+                reply = {"type": "analysis", **result}
+            except json.JSONDecodeError:
+                reply = {"type": "error", "detail": "Messages must be JSON objects"}
+            except HTTPException as e:
+                reply = {"type": "error", "detail": e.detail}
+            except Exception as e:
+                print(f"Error in live ATS update: {str(e)}")
+                reply = {"type": "error", "detail": f"Error updating analysis: {str(e)}"}
+            await websocket.send_text(encode_json(reply).decode("utf-8"))
+    except WebSocketDisconnect:
+        pass
+    finally:
+        LIVE_ATS_CONNECTIONS.dec()
+
+# ==================== RESUME RENDERERS ====================
+# resume_data is assembled once into a ResumeLayout; every output format renders from it
+
+class LayoutEntry:
+    """One line of a resume section: an optional bold heading, trailing details and body text"""
+    __slots__ = ("heading", "details", "body")
+
+    def __init__(self, heading: str = "", details: str = "", body: str = ""):
+        self.heading = heading
+        self.details = details
+        self.body = body
+
+class LayoutSection:
+    """A titled resume section made of entries"""
+    __slots__ = ("title", "entries")
+
+    def __init__(self, title: str, entries: List[LayoutEntry]):
+        self.title = title
+        self.entries = entries
+
+class ResumeLayout:
+    """Format-independent resume layout shared by the PDF, DOCX and TXT renderers"""
+    __slots__ = ("name", "contact", "sections")
+
+    def __init__(self, name: str, contact: List[str], sections: List[LayoutSection]):
+        self.name = name
+        self.contact = contact
+        self.sections = sections
+
+LAYOUT_CACHE_SIZE = 256
+_layout_cache: "OrderedDict[str, ResumeLayout]" = OrderedDict()
+_layout_cache_lock = threading.Lock()
+
+def _join_details(*parts_with_separators) -> str:
+    """Join optional (separator, value) pairs, skipping empty values"""
+    return "".join(f"{separator}{value}" for separator, value in parts_with_separators if value)
+
+def _assemble_resume_layout(resume_data: Dict[str, Any]) -> ResumeLayout:
+    """Assemble resume sections in builder order"""
+    contact = [str(resume_data[key]) for key in ("email", "phone", "location", "linkedin") if resume_data.get(key)]
+    sections = []
+    
+    if resume_data.get("summary"):
+        sections.append(LayoutSection("SUMMARY", [LayoutEntry(body=str(resume_data["summary"]))]))
+    
+    if resume_data.get("experience"):
+        sections.append(LayoutSection("EXPERIENCE", [
+            LayoutEntry(
+                heading=str(exp.get('title', '')),
+                details=_join_details((" - ", exp.get('company')), (" | ", exp.get('dates'))),
+                body=str(exp.get('description') or "")
+            )
+            for exp in resume_data["experience"]
+        ]))
+    
+    if resume_data.get("education"):
+        sections.append(LayoutSection("EDUCATION", [
+            LayoutEntry(
+                heading=str(edu.get('degree', '')),
+                details=_join_details((" - ", edu.get('school')), (" | ", edu.get('dates')))
+            )
+            for edu in resume_data["education"]
+        ]))
+    
+    if resume_data.get("skills"):
+        sections.append(LayoutSection("SKILLS", [LayoutEntry(body=", ".join(str(s) for s in resume_data["skills"]))]))
+    
+    if resume_data.get("projects"):
+        sections.append(LayoutSection("PROJECTS", [
+            LayoutEntry(
+                heading=str(project.get('name', '')),
+                details=_join_details((" - ", project.get('description')),)
+            )
+            for project in resume_data["projects"]
+        ]))
+    
+    return ResumeLayout(str(resume_data.get("name") or ""), contact, sections)
+
+def build_resume_layout(resume_data: Dict[str, Any]) -> ResumeLayout:
+    """Build (or reuse) the layout for resume data so switching formats skips section assembly"""
+    key = hashlib.sha1(json.dumps(resume_data, sort_keys=True, default=str).encode("utf-8")).hexdigest()
+    with _layout_cache_lock:
+        layout = _layout_cache.get(key)
+        if layout is not None:
+            _layout_cache.move_to_end(key)
+    if layout is not None:
+        CACHE_REQUESTS.inc(cache="resume_layout", result="hit")
+        return layout
+    
+    CACHE_REQUESTS.inc(cache="resume_layout", result="miss")
+    layout = _assemble_resume_layout(resume_data)
+    with _layout_cache_lock:
+        _layout_cache[key] = layout
+        if len(_layout_cache) > LAYOUT_CACHE_SIZE:
+            _layout_cache.popitem(last=False)
+    return layout
+
+def _write_layout_pdf(layout: ResumeLayout, template_id: str, output) -> None:
+    """Render a layout as a PDF into a file path or binary file-like object"""
+    template = get_compiled_template(template_id)
+    body_style = template.body_style
+    doc = SimpleDocTemplate(output, pagesize=template.pagesize, **template.margins)
+    story = []
+    
+    # Name and contact info
+    if layout.name:
+        story.append(Paragraph(xml_escape(layout.name), template.title_style))
+        story.append(Spacer(1, 6))
+    
+    if layout.contact:
+        story.append(Paragraph(xml_escape(" | ".join(layout.contact)), body_style))
+        story.append(Spacer(1, 12))
+    
+    for index, section in enumerate(layout.sections):
+        story.append(Paragraph(section.title, template.section_style))
+        for entry in section.entries:
+            if entry.heading or entry.details:
+                story.append(Paragraph(f"<b>{xml_escape(entry.heading)}</b>{xml_escape(entry.details)}", body_style))
+            if entry.body:
+                story.append(Paragraph(xml_escape(entry.body), body_style))
+            if entry.heading or entry.details:
+                story.append(Spacer(1, 6))
+        # The last section runs to the end of the page without trailing space
+        if index < len(layout.sections) - 1:
+            story.append(Spacer(1, template.section_space))
+    
+    doc.build(story)
+
+def render_layout_pdf(layout: ResumeLayout, template_id: str) -> bytes:
+    """PDF backend: ReportLab with the template's compiled styles"""
+    buffer = io.BytesIO()
+    _write_layout_pdf(layout, template_id, buffer)
+    return buffer.getvalue()
+
+def render_layout_docx(layout: ResumeLayout, template_id: str) -> bytes:
+    """DOCX backend: python-docx with the template's font size, spacing and margins"""
+    template = RESUME_TEMPLATES.get(get_compiled_template(template_id).template_id)
+    document = Document()
+    
+    page = document.sections[0]
+    if str(template.get("page_size", "letter")).lower() == "a4":
+        page.page_width, page.page_height = Mm(210), Mm(297)
+    else:
+        page.page_width, page.page_height = Inches(8.5), Inches(11)
+    left, right, top, bottom = template["margins"]
+    page.left_margin, page.right_margin = Inches(left), Inches(right)
+    page.top_margin, page.bottom_margin = Inches(top), Inches(bottom)
+    
+    normal = document.styles["Normal"]
+    normal.font.name = "Arial"
+    normal.font.size = Pt(template["font_size"])
+    normal.paragraph_format.line_spacing = template["line_spacing"]
+    normal.paragraph_format.space_after = Pt(6)
+    
+    if layout.name:
+        paragraph = document.add_paragraph()
+        paragraph.alignment = WD_ALIGN_PARAGRAPH.CENTER
+        run = paragraph.add_run(layout.name)
+        run.bold = True
+        run.font.size = Pt(16)
+    
+    if layout.contact:
+        document.add_paragraph(" | ".join(layout.contact))
+    
+    for section in layout.sections:
+        paragraph = document.add_paragraph()
+        paragraph.paragraph_format.space_before = Pt(12)
+        run = paragraph.add_run(section.title)
+        run.bold = True
+        run.font.size = Pt(template["font_size"] + 2)
+        for entry in section.entries:
+            if entry.heading or entry.details:
+                paragraph = document.add_paragraph()
+                paragraph.add_run(entry.heading).bold = True
+                paragraph.add_run(entry.details)
+            if entry.body:
+                document.add_paragraph(entry.body)
+    
+    buffer = io.BytesIO()
+    document.save(buffer)
+    return buffer.getvalue()
+
+def render_layout_txt(layout: ResumeLayout, template_id: str) -> bytes:
+    """Plain-text backend for ATS portals that only accept pasted text"""
+    lines = []
+    if layout.name:
+        lines.append(layout.name)
+    if layout.contact:
+        lines.append(" | ".join(layout.contact))
+    
+    for section in layout.sections:
+        lines.extend(["", section.title])
+        for entry in section.entries:
+            if entry.heading or entry.details:
+                lines.append(f"{entry.heading}{entry.details}")
+            if entry.body:
+                lines.append(entry.body)
+    
+    return ("\n".join(lines).strip() + "\n").encode("utf-8")
+
+# Output formats supported by the resume builder
+RESUME_RENDERERS = {
+    "pdf": {"render": render_layout_pdf, "media_type": "application/pdf"},
+    "docx": {
+        "render": render_layout_docx,
+        "media_type": "application/vnd.openxmlformats-officedocument.wordprocessingml.document"
+    },
+    "txt": {"render": render_layout_txt, "media_type": "text/plain; charset=utf-8"}
+}
+
+def render_resume(resume_data: Dict[str, Any], template_id: str = "professional", output_format: str = "pdf") -> bytes:
+    """Render resume data in any supported output format, entirely in memory"""
+    renderer = RESUME_RENDERERS.get(output_format.lower())
+    if renderer is None:
+        raise ValueError(f"Unsupported format '{output_format}'. Use one of: {', '.join(RESUME_RENDERERS)}")
+    layout = build_resume_layout(resume_data)
+    with stage_timer(f"render_{output_format.lower()}"):
+        content = renderer["render"](layout, template_id)
+    DOCUMENT_SIZE.observe(len(content), format=output_format.lower())
+    return content
+
 def create_ats_friendly_pdf(resume_data: Dict[str, Any], template_id: str = "professional") -> str:
     """Create an ATS-friendly PDF resume"""
     try:
-        template = RESUME_TEMPLATES.get(template_id, RESUME_TEMPLATES["professional"])
-        
         # Create PDF filename
         timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
         pdf_filename = f"resume_{timestamp}.pdf"
@@ -1103,130 +4349,9 @@ def create_ats_friendly_pdf(resume_data: Dict[str, Any], template_id: str = "pro
         # Ensure temp directory exists
         os.makedirs("temp", exist_ok=True)
         
-        # Create PDF document
-        doc = SimpleDocTemplate(pdf_path, pagesize=letter, 
-                              leftMargin=template["margins"][0]*inch,
-                              rightMargin=template["margins"][1]*inch,
-                              topMargin=template["margins"][2]*inch,
-                              bottomMargin=template["margins"][3]*inch)
-        
-        # Get styles
-        styles = getSampleStyleSheet()
-        
-        # Create custom styles
-        title_style = ParagraphStyle(
-            'CustomTitle',
-            parent=styles['Heading1'],
-            fontSize=16,
-            spaceAfter=12,
-            alignment=TA_CENTER,
-            fontName='Helvetica-Bold'
-        )
-        
-        section_style = ParagraphStyle(
-            'CustomSection',
-            parent=styles['Heading2'],
-            fontSize=template["font_size"] + 2,
-            spaceAfter=6,
-            spaceBefore=12,
-            fontName='Helvetica-Bold'
-        )
-        
-        body_style = ParagraphStyle(
-            'CustomBody',
-            parent=styles['Normal'],
-            fontSize=template["font_size"],
-            spaceAfter=6,
-            leading=template["font_size"] * template["line_spacing"],
-            fontName='Helvetica'
-        )
-        
-        # Build PDF content
-        story = []
-        
-        # Name and contact info
-        if resume_data.get("name"):
-            story.append(Paragraph(resume_data["name"], title_style))
-            story.append(Spacer(1, 6))
-        
-        # Contact information
-        contact_info = []
-        if resume_data.get("email"):
-            contact_info.append(resume_data["email"])
-        if resume_data.get("phone"):
-            contact_info.append(resume_data["phone"])
-        if resume_data.get("location"):
-            contact_info.append(resume_data["location"])
-        if resume_data.get("linkedin"):
-            contact_info.append(resume_data["linkedin"])
-        
-        if contact_info:
-            contact_text = " | ".join(contact_info)
-            story.append(Paragraph(contact_text, body_style))
-            story.append(Spacer(1, 12))
-        
-        # Summary
-        if resume_data.get("summary"):
-            story.append(Paragraph("SUMMARY", section_style))
-            story.append(Paragraph(resume_data["summary"], body_style))
-            story.append(Spacer(1, template["section_spacing"] * inch))
-        
-        # Experience
-        if resume_data.get("experience"):
-            story.append(Paragraph("EXPERIENCE", section_style))
-            for exp in resume_data["experience"]:
-                # Job title and company
-                job_header = f"<b>{exp.get('title', '')}</b>"
-                if exp.get('company'):
-                    job_header += f" - {exp.get('company', '')}"
-                if exp.get('dates'):
-                    job_header += f" | {exp.get('dates', '')}"
-                
-                story.append(Paragraph(job_header, body_style))
-                
-                # Job description
-                if exp.get('description'):
-                    story.append(Paragraph(exp["description"], body_style))
-                
-                story.append(Spacer(1, 6))
-            
-            story.append(Spacer(1, template["section_spacing"] * inch))
-        
-        # Education
-        if resume_data.get("education"):
-            story.append(Paragraph("EDUCATION", section_style))
-            for edu in resume_data["education"]:
-                edu_text = f"<b>{edu.get('degree', '')}</b>"
-                if edu.get('school'):
-                    edu_text += f" - {edu.get('school', '')}"
-                if edu.get('dates'):
-                    edu_text += f" | {edu.get('dates', '')}"
-                
-                story.append(Paragraph(edu_text, body_style))
-                story.append(Spacer(1, 6))
-            
-            story.append(Spacer(1, template["section_spacing"] * inch))
-        
-        # Skills
-        if resume_data.get("skills"):
-            story.append(Paragraph("SKILLS", section_style))
-            skills_text = ", ".join(resume_data["skills"])
-            story.append(Paragraph(skills_text, body_style))
-            story.append(Spacer(1, template["section_spacing"] * inch))
-        
-        # Projects
-        if resume_data.get("projects"):
-            story.append(Paragraph("PROJECTS", section_style))
-            for project in resume_data["projects"]:
-                project_text = f"<b>{project.get('name', '')}</b>"
-                if project.get('description'):
-                    project_text += f" - {project.get('description', '')}"
-                
-                story.append(Paragraph(project_text, body_style))
-                story.append(Spacer(1, 6))
-        
-        # Build PDF
-        doc.build(story)
+        layout = build_resume_layout(resume_data)
+        with stage_timer("render_pdf"):
+            _write_layout_pdf(layout, template_id, pdf_path)
         
         return pdf_path
         
@@ -1242,7 +4367,8 @@ async def generate_resume_pdf(
     try:
         # Parse the JSON string back to dict
         resume_data_dict = json.loads(resume_data)
-        pdf_path = create_ats_friendly_pdf(resume_data_dict, template_id)
+        # Rendering is CPU-bound; keep it off the event loop
+        pdf_path = await run_in_threadpool(create_ats_friendly_pdf, resume_data_dict, template_id)
         
         return FileResponse(
             path=pdf_path,
@@ -1252,6 +4378,200 @@ async def generate_resume_pdf(
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error generating PDF: {str(e)}")
 
+@app.post("/export-resume")
+async def export_resume(
+    resume_data: str = Form(...),
+    template_id: str = Form("professional"),
+    output_format: str = Form("pdf")
+):
+    """Export a resume as PDF, DOCX or plain text, rendered in memory"""
+    output_format = output_format.lower()
+    if output_format not in RESUME_RENDERERS:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Unsupported format '{output_format}'. Use one of: {', '.join(RESUME_RENDERERS)}"
+        )
+    try:
+        resume_data_dict = json.loads(resume_data)
+        content = await run_in_threadpool(render_resume, resume_data_dict, template_id, output_format)
+        filename = f"resume_{datetime.now().strftime('%Y%m%d_%H%M%S')}.{output_format}"
+        
+        return Response(
+            content=content,
+            media_type=RESUME_RENDERERS[output_format]["media_type"],
+            headers={"Content-Disposition": f'attachment; filename="{filename}"'}
+        )
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error exporting resume: {str(e)}")
+
+# Batch PDF generation
+PDF_BATCH_WORKERS = int(os.getenv("PDF_BATCH_WORKERS", str(os.cpu_count() or 2)))
+PDF_BATCH_MAX_ITEMS = int(os.getenv("PDF_BATCH_MAX_ITEMS", "1000"))
+
+_pdf_process_pool = None
+
+def worker_process_context():
+    """Start method for worker process pools created while the server is running"""
+    # Forking the threaded server directly can deadlock children on locks other threads held
+    # at fork time. The fork server is a fresh single-threaded process that imports the app once;
+    # pool workers fork from it and so still inherit the loaded models and compiled templates.
+    if "forkserver" in multiprocessing.get_all_start_methods():
+        context = multiprocessing.get_context("forkserver")
+        context.set_forkserver_preload([__name__])
+        return context
+    return multiprocessing.get_context()
+
+def get_pdf_process_pool() -> ProcessPoolExecutor:
+    """Lazily start the process pool used for batch PDF rendering"""
+    global _pdf_process_pool
+    if _pdf_process_pool is None:
+        _pdf_process_pool = ProcessPoolExecutor(max_workers=PDF_BATCH_WORKERS, mp_context=worker_process_context())
+    return _pdf_process_pool
+
+@app.on_event("shutdown")
+def shutdown_pdf_process_pool():
+    global _pdf_process_pool
+    if _pdf_process_pool is not None:
+        _pdf_process_pool.shutdown(wait=False, cancel_futures=True)
+        _pdf_process_pool = None
+
+class _ZipStreamBuffer(io.RawIOBase):
+    """Non-seekable sink that lets zipfile emit an archive chunk by chunk"""
+
+    def __init__(self):
+        super().__init__()
+        self._chunks = []
+
+    def writable(self) -> bool:
+        return True
+
+    def write(self, data) -> int:
+        self._chunks.append(bytes(data))
+        return len(data)
+
+    def drain(self) -> bytes:
+        data = b"".join(self._chunks)
+        self._chunks = []
+        return data
+
+def _safe_archive_name(name: str) -> str:
+    """Turn a version name into a file name that is safe inside a zip archive"""
+    cleaned = re.sub(r'[^A-Za-z0-9._-]+', '_', name).strip('._')
+    return cleaned[:80] or "resume"
+
+def _resolve_batch_items(items: List[Dict[str, Any]], default_template_id: str,
+                         default_format: str = "pdf") -> List[Dict[str, Any]]:
+    """Resolve batch items into render jobs, looking up saved versions by id"""
+    jobs = []
+    for index, item in enumerate(items, start=1):
+        if not isinstance(item, dict):
+            raise ValueError(f"Item {index} must be an object with a version_id or resume_data")
+        
+        template_id = item.get("template_id") or default_template_id
+        output_format = str(item.get("output_format") or default_format).lower()
+        error = None
+        resume_data = item.get("resume_data")
+        name = item.get("filename") or f"resume_{index}"
+        
+        if item.get("version_id"):
+            version = resume_versions.get(item["version_id"])
+            if version is None:
+                error = f"Resume version '{item['version_id']}' not found"
+            else:
+                resume_data = version["resume_data"]
+                name = item.get("filename") or version.get("name") or name
+        elif not isinstance(resume_data, dict):
+            error = "Item needs a version_id or a resume_data object"
+        if output_format not in RESUME_RENDERERS:
+            error = f"Unsupported format '{output_format}'"
+        
+        jobs.append({
+            "name": f"{index:04d}_{_safe_archive_name(name)}",
+            "resume_data": resume_data,
+            "template_id": template_id,
+            "output_format": output_format,
+            "error": error
+        })
+    return jobs
+
+async def _stream_resume_zip(jobs: List[Dict[str, Any]]):
+    """Render jobs in the process pool and yield zip bytes as each document finishes"""
+    loop = asyncio.get_running_loop()
+    pool = get_pdf_process_pool()
+    # Only a bounded number of rendered PDFs are ever held in memory at once
+    max_in_flight = max(1, PDF_BATCH_WORKERS * 2)
+    job_iter = iter(jobs)
+    pending = {}
+    sink = _ZipStreamBuffer()
+    
+    try:
+        with zipfile.ZipFile(sink, "w", compression=zipfile.ZIP_STORED) as archive:
+            def fill_pending():
+                while len(pending) < max_in_flight:
+                    job = next(job_iter, None)
+                    if job is None:
+                        return
+                    if job["error"]:
+                        archive.writestr(f"{job['name']}.error.txt", job["error"])
+                        continue
+                    future = loop.run_in_executor(
+                        pool, render_resume, job["resume_data"], job["template_id"], job["output_format"]
+                    )
+                    EXECUTOR_QUEUE_DEPTH.inc(executor="pdf_batch")
+                    pending[future] = job
+            
+            fill_pending()
+            while pending:
+                done, _ = await asyncio.wait(pending.keys(), return_when=asyncio.FIRST_COMPLETED)
+                for future in done:
+                    job = pending.pop(future)
+                    EXECUTOR_QUEUE_DEPTH.dec(executor="pdf_batch")
+                    try:
+                        archive.writestr(f"{job['name']}.{job['output_format']}", future.result())
+                    except Exception as e:
+                        archive.writestr(f"{job['name']}.error.txt", f"Error rendering resume: {str(e)}")
+                fill_pending()
+                
+                chunk = sink.drain()
+                if chunk:
+                    yield chunk
+        
+        # Central directory is written when the archive closes
+        yield sink.drain()
+    finally:
+        for future in pending:
+            future.cancel()
+            EXECUTOR_QUEUE_DEPTH.dec(executor="pdf_batch")
+
+@app.post("/generate-resume-pdf-batch")
+async def generate_resume_pdf_batch(
+    items: str = Form(...),
+    template_id: str = Form("professional"),
+    output_format: str = Form("pdf")
+):
+    """Generate many resumes in parallel and stream them back as a zip archive
+    
+    `items` is a JSON list of objects, each with either a `version_id` or a
+    `resume_data` object, plus optional `template_id`, `output_format` and `filename`.
+    """
+    try:
+        parsed_items = json.loads(items)
+        if not isinstance(parsed_items, list) or not parsed_items:
+            raise ValueError("items must be a non-empty JSON list")
+        if len(parsed_items) > PDF_BATCH_MAX_ITEMS:
+            raise ValueError(f"A batch can contain at most {PDF_BATCH_MAX_ITEMS} items")
+        jobs = _resolve_batch_items(parsed_items, template_id, output_format)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=f"Invalid batch request: {str(e)}")
+    
+    return StreamingResponse(
+        _stream_resume_zip(jobs),
+        media_type="application/zip",
+        headers={
+            "Content-Disposition": f'attachment; filename="resumes_{datetime.now().strftime("%Y%m%d_%H%M%S")}.zip"'
+        }
+    )
+
 @app.post("/save-and-generate-pdf")
 async def save_and_generate_pdf(
     resume_data: str = Form(...),
@@ -1278,10 +4598,10 @@ async def save_and_generate_pdf(
         }
         
         resume_versions[version_id] = version_data
-        save_resume_versions()
         
         # Generate PDF
-        pdf_path = create_ats_friendly_pdf(resume_data_dict, template_id)
+        # Rendering is CPU-bound; keep it off the event loop
+        pdf_path = await run_in_threadpool(create_ats_friendly_pdf, resume_data_dict, template_id)
         
         return FileResponse(
             path=pdf_path,
@@ -1316,7 +4636,6 @@ async def save_resume_version(
         }
         
         resume_versions[version_id] = version_data
-        save_resume_versions()
         
         return {
             "success": True,
@@ -1372,7 +4691,6 @@ async def delete_resume_version(version_id: str):
             raise HTTPException(status_code=404, detail="Resume version not found")
         
         deleted_version = resume_versions.pop(version_id)
-        save_resume_versions()
         
         return {
             "success": True,
@@ -1381,5 +4699,97 @@ async def delete_resume_version(version_id: str):
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error deleting resume version: {str(e)}")
 
+# ==================== PRE-FORK SERVER ====================
+# `python main.py --workers N` loads everything once in a parent process, freezes it out of
+# the GC and forks N uvicorn workers that accept on one shared listening socket. Read-only
+# state (spaCy model, skill index, catalog, role matrices, compiled templates, ReportLab
+# fonts) stays shared copy-on-write. Resume versions are shared through SQLite; editor
+# sessions, caches and metrics stay per worker.
+
+def warm_shared_resources() -> None:
+    """Build lazily-loaded read-only state in the parent so workers inherit it instead of each loading it"""
+    sample = (
+        "Jordan Lee\nSoftware Engineer\nExperience\n"
+        "• Built Python APIs on AWS with Docker, cutting latency by 30%\n"
+        "Skills\nPython, SQL, React, Machine Learning"
+    )
+    _analyze_ats_internal(sample, "software engineer")
+    _skill_gap_internal(sample, "software engineer")
+    select_bullets_for_improvement(extract_bullet_points(sample), 3)
+    improve_bullet_heuristically("Worked on APIs", "software engineer")
+    render_resume({"name": "Jordan Lee", "experience": [], "skills": ["Python"]}, "professional", "pdf")
+
+def _run_worker(sock: socket.socket, worker_id: int) -> None:
+    global WORKER_ID
+    WORKER_ID = worker_id
+    # Drop the parent's handlers; uvicorn installs its own for a graceful shutdown
+    signal.signal(signal.SIGTERM, signal.SIG_DFL)
+    signal.signal(signal.SIGINT, signal.SIG_DFL)
+    server = uvicorn.Server(uvicorn.Config(app, log_level=os.getenv("LOG_LEVEL", "info")))
+    server.run(sockets=[sock])
+
+def run_prefork(host: str, port: int, workers: int) -> None:
+    """Serve with `workers` forked processes sharing one listening socket, restarting any that die"""
+    global client_rate_limiter
+    # Each worker would otherwise give a client its own full bucket
+    client_rate_limiter = SharedClientRateLimiter(RATE_LIMIT_PER_MINUTE, RATE_LIMIT_BURST, shared_state_db)
+    warm_shared_resources()
+    sock = socket.create_server((host, port), backlog=2048)
+    sock.set_inheritable(True)
+    # Objects that exist now are never collected in the workers, so GC passes don't dirty shared pages
+    gc.collect()
+    gc.freeze()
+    
+    children: Dict[int, int] = {}
+    stopping = False
+    
+    def spawn(worker_id: int) -> None:
+        pid = os.fork()
+        if pid == 0:
+            try:
+                _run_worker(sock, worker_id)
+            finally:
+                os._exit(0)
+        children[pid] = worker_id
+    
+    def stop(signum, frame) -> None:
+        nonlocal stopping
+        stopping = True
+        for pid in list(children):
+            try:
+                os.kill(pid, signal.SIGTERM)
+            except ProcessLookupError:
+                pass
+    
+    signal.signal(signal.SIGTERM, stop)
+    signal.signal(signal.SIGINT, stop)
+    print(f"Starting {workers} workers on {host}:{port} (parent pid {os.getpid()})")
+    for worker_id in range(1, workers + 1):
+        spawn(worker_id)
+    
+    while children:
+        try:
+            pid, status = os.wait()
+        except ChildProcessError:
+            break
+        worker_id = children.pop(pid, None)
+        if worker_id is not None and not stopping:
+            print(f"Worker {worker_id} (pid {pid}) exited with status {status}; restarting")
+            time.sleep(1)
+            spawn(worker_id)
+    sock.close()
+
 if __name__ == "__main__":
-    uvicorn.run(app, host="0.0.0.0", port=8000) 
+    import argparse
+    
+    parser = argparse.ArgumentParser(description="Run the ResuScan API")
+    parser.add_argument("--host", default=os.getenv("HOST", "0.0.0.0"))
+    parser.add_argument("--port", type=int, default=int(os.getenv("PORT", "8000")))
+    parser.add_argument("--workers", type=int, default=int(os.getenv("WEB_CONCURRENCY", "1")))
+    args = parser.parse_args()
+    
+    if args.workers > 1 and hasattr(os, "fork"):
+        run_prefork(args.host, args.port, args.workers)
+    else:
+        uvicorn.run(app, host=args.host, port=args.port)
+
@@ -0,0 +1,14 @@
+import os
+import sys
+import tempfile
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BACKEND_DIR)
+
+# main reads its settings at import time; keep tests offline and out of the real data directory
+_data_dir = tempfile.mkdtemp(prefix="resuscan-tests-")
+os.environ.setdefault("LLM_PROVIDER", "mock")
+os.environ.setdefault("MOCK_LLM_LATENCY", "fixed:0")
+os.environ.setdefault("SKILL_INDEX_DIR", os.path.join(_data_dir, "skill_index"))
+os.environ.setdefault("VERSIONS_DB_PATH", os.path.join(_data_dir, "resume_versions.db"))
+os.environ.setdefault("SHARED_STATE_DB_PATH", os.path.join(_data_dir, "shared_state.db"))
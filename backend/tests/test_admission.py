@@ -0,0 +1,76 @@
+import asyncio
+
+import pytest
+from fastapi.testclient import TestClient
+
+import main
+
+RESUME = {"resume_text": "Python developer", "job_title": "software engineer"}
+
+
+def test_rate_limiter_allows_a_burst_then_reports_the_wait():
+    limiter = main.ClientRateLimiter(rate_per_minute=60, burst=2, max_clients=10)
+    assert limiter.take("client") == 0
+    assert limiter.take("client") == 0
+    assert 0.9 < limiter.take("client") <= 1.0
+    # Buckets are per client
+    assert limiter.take("other") == 0
+
+
+def test_rate_limiter_forgets_the_oldest_client():
+    limiter = main.ClientRateLimiter(rate_per_minute=60, burst=1, max_clients=2)
+    limiter.take("a")
+    limiter.take("b")
+    limiter.take("c")
+    assert list(limiter._buckets) == ["b", "c"]
+    assert limiter.take("a") == 0
+
+
+def test_concurrency_limiter_queues_then_rejects():
+    async def scenario():
+        limiter = main.ConcurrencyLimiter("test", limit=1, max_queue=1, timeout=0.2)
+        await limiter.acquire()
+        queued = asyncio.ensure_future(limiter.acquire())
+        await asyncio.sleep(0)
+        assert limiter.queued == 1
+        # The queue is full, so the next request is turned away at once
+        with pytest.raises(main.AdmissionRejected):
+            await limiter.acquire()
+
+        # Releasing hands the slot straight to the queued request
+        limiter.release()
+        await queued
+        assert limiter.active == 1 and limiter.queued == 0
+
+        # A queued request that waits past the timeout is rejected
+        with pytest.raises(main.AdmissionRejected) as rejected:
+            await limiter.acquire()
+        assert rejected.value.retry_after >= 1
+        assert limiter.queued == 0
+
+    asyncio.run(scenario())
+
+
+def test_empty_bucket_gets_429_but_health_still_answers(monkeypatch):
+    monkeypatch.setattr(main, "client_rate_limiter", main.ClientRateLimiter(rate_per_minute=6, burst=1, max_clients=10))
+    client = TestClient(main.app)
+    assert client.post("/analyze-ats", data=RESUME).status_code == 200
+
+    response = client.post("/analyze-ats", data=RESUME)
+    assert response.status_code == 429
+    assert response.headers["Retry-After"] == "10"
+    assert client.get("/health").status_code == 200
+
+
+def test_full_class_gets_503_while_other_classes_are_admitted(monkeypatch):
+    busy = main.ConcurrencyLimiter("standard", limit=1, max_queue=0, timeout=1)
+    busy.active = 1
+    monkeypatch.setattr(main, "admission_limiters", {**main.admission_limiters, "standard": busy})
+    client = TestClient(main.app)
+
+    response = client.post("/analyze-ats", data=RESUME)
+    assert response.status_code == 503
+    assert response.json()["detail"] == "Server is busy, please retry"
+    assert int(response.headers["Retry-After"]) >= 1
+    # Light requests have their own slots
+    assert client.get("/get-resume-templates").status_code == 200
@@ -0,0 +1,143 @@
+import argparse
+import csv
+import json
+
+import pytest
+from docx import Document
+
+import batch_analyze
+
+HEADER = {"source": "resumes", "job_titles": ["software engineer"], "format": "jsonl", "taxonomy": "test"}
+
+
+def _rows(index):
+    return [{"id": f"resume-{index}.docx", "job_title": "software engineer", "ats_score": index}]
+
+
+@pytest.mark.parametrize("output_format", ["csv", "jsonl"])
+def test_rollback_drops_rows_written_after_the_checkpoint(tmp_path, output_format):
+    writer = batch_analyze.ResultWriter(str(tmp_path / f"scores.{output_format}"), output_format)
+    writer.write(_rows(0))
+    position = writer.position()
+    writer.write(_rows(1))
+
+    writer.rollback(position)
+    writer.write(_rows(2))
+    content = (tmp_path / f"scores.{output_format}").read_text()
+    assert "resume-1.docx" not in content
+    assert "resume-0.docx" in content and "resume-2.docx" in content
+    if output_format == "csv":
+        # The header is written once, for the first batch
+        assert content.count("ats_score") == 1
+
+
+def test_checkpoint_ignores_and_removes_a_partial_record(tmp_path):
+    path = str(tmp_path / "scores.checkpoint")
+    checkpoint = batch_analyze.Checkpoint(path, HEADER)
+    checkpoint.start()
+    checkpoint.record(["a.docx", "b.docx"], 120)
+    with open(path, "a", encoding="utf-8") as f:
+        f.write('{"ids": ["c.docx"], "posi')
+
+    resumed = batch_analyze.Checkpoint(path, HEADER)
+    assert resumed.load()
+    assert resumed.done == {"a.docx", "b.docx"}
+    assert resumed.position == 120
+
+    # Records appended after a resume are still read by the next one
+    resumed.record(["c.docx"], 180)
+    again = batch_analyze.Checkpoint(path, HEADER)
+    assert again.load()
+    assert again.done == {"a.docx", "b.docx", "c.docx"}
+    assert again.position == 180
+
+
+def test_checkpoint_with_other_settings_is_rejected(tmp_path):
+    path = str(tmp_path / "scores.checkpoint")
+    batch_analyze.Checkpoint(path, HEADER).start()
+    with pytest.raises(SystemExit):
+        batch_analyze.Checkpoint(path, {**HEADER, "taxonomy": "changed"}).load()
+
+
+def _args(source, output, **overrides):
+    values = dict(
+        source=str(source), output=str(output), format=None, job_title=["software engineer"],
+        workers=1, batch_size=2, checkpoint=None, restart=False,
+    )
+    values.update(overrides)
+    return argparse.Namespace(**values)
+
+
+def _scores(path):
+    # Rows of one batch are written in completion order
+    with open(path, newline="", encoding="utf-8") as f:
+        return sorted((row["id"], row["ats_score"]) for row in csv.DictReader(f))
+
+
+def test_interrupted_run_resumes_to_the_same_results(tmp_path):
+    source = tmp_path / "resumes"
+    source.mkdir()
+    for index in range(5):
+        document = Document()
+        document.add_paragraph(f"Candidate {index}")
+        document.add_paragraph("• Built Python APIs on AWS with Docker" + ", SQL" * index)
+        document.save(str(source / f"resume-{index}.docx"))
+
+    complete = tmp_path / "complete.csv"
+    assert batch_analyze.run(_args(source, complete)) == 0
+    expected = _scores(complete)
+    assert [item_id for item_id, _ in expected] == [f"resume-{index}.docx" for index in range(5)]
+
+    # Crash after the second batch reached the output but before its checkpoint record finished
+    interrupted = tmp_path / "interrupted.csv"
+    batch_analyze.run(_args(source, interrupted))
+    checkpoint_path = f"{interrupted}.checkpoint"
+    with open(checkpoint_path, encoding="utf-8") as f:
+        header, first_batch, second_batch = f.readlines()[:3]
+    with open(checkpoint_path, "w", encoding="utf-8") as f:
+        f.write(header + first_batch + second_batch[:10])
+
+    assert batch_analyze.run(_args(source, interrupted)) == 0
+    assert _scores(interrupted) == expected
+    with open(checkpoint_path, encoding="utf-8") as f:
+        assert [json.loads(line) for line in f][-1]["position"] == interrupted.stat().st_size
+
+
+def test_busy_and_partial_ocr_items_are_retried_on_the_next_run(tmp_path, monkeypatch):
+    source = tmp_path / "resumes"
+    source.mkdir()
+    for name in ("busy", "partial", "scored"):
+        document = Document()
+        document.add_paragraph(f"• Built Python APIs on AWS for the {name} team")
+        document.save(str(source / f"{name}.docx"))
+
+    extract = batch_analyze.main.extract_text_from_file
+
+    def flaky(path):
+        if path.endswith("busy.docx"):
+            raise batch_analyze.main.OCRBusyError(5)
+        if path.endswith("partial.docx"):
+            return batch_analyze.main.PartialText(extract(path))
+        return extract(path)
+
+    # Forked workers inherit the patched extractor
+    monkeypatch.setattr(batch_analyze.main, "extract_text_from_file", flaky)
+    output = tmp_path / "scores.csv"
+    assert batch_analyze.run(_args(source, output)) == 1
+    assert [item_id for item_id, _ in _scores(output)] == ["scored.docx"]
+    with open(f"{output}.checkpoint", encoding="utf-8") as f:
+        assert [json.loads(line)["ids"] for line in f.readlines()[1:]] == [["scored.docx"]]
+
+    monkeypatch.setattr(batch_analyze.main, "extract_text_from_file", extract)
+    assert batch_analyze.run(_args(source, output)) == 0
+    assert [item_id for item_id, _ in _scores(output)] == ["busy.docx", "partial.docx", "scored.docx"]
+
+
+def test_batch_workers_run_ocr_inline(monkeypatch):
+    monkeypatch.setattr(batch_analyze.main, "_ocr_process_pool", None)
+    batch_analyze.init_worker()
+    pool = batch_analyze.main.get_ocr_process_pool()
+    assert isinstance(pool, batch_analyze._InlineOCRPool)
+    assert pool.submit(str.upper, "page text").result() == "PAGE TEXT"
+    with pytest.raises(ZeroDivisionError):
+        pool.submit(lambda: 1 / 0).result()
@@ -0,0 +1,36 @@
+import pytest
+from fastapi.testclient import TestClient
+
+import main
+
+RESUME = """Jordan Lee
+Skills: Python, pandas, NumPy, scikit-learn, SQL, Jupyter, statistics
+Experience
+• Trained machine learning models in TensorFlow that cut churn 12%
+• Built data analysis dashboards in SQL for 40 product managers
+"""
+
+
+def test_every_returned_role_matches_its_single_role_analysis():
+    result = main._best_fit_roles_internal(RESUME, main.BEST_FIT_MAX_ROLES)
+    assert result["roles_evaluated"] == len(main.role_matrix.roles)
+    scores = [role["fit_score"] for role in result["roles"]]
+    assert scores == sorted(scores, reverse=True)
+    assert result["roles"][0]["job_title"] == "data scientist"
+
+    for role in result["roles"]:
+        # The one-pass breakdowns are the same as asking about each role separately
+        assert role["ats_analysis"] == main._analyze_ats_internal(RESUME, role["job_title"])
+        assert role["skill_gap_analysis"] == main._skill_gap_internal(RESUME, role["job_title"])
+
+
+def test_endpoint_returns_top_n_roles():
+    response = TestClient(main.app).post("/best-fit-roles", data={"resume_text": RESUME, "top_n": 2})
+    assert response.status_code == 200
+    assert len(response.json()["roles"]) == 2
+
+
+@pytest.mark.parametrize("top_n", [0, main.BEST_FIT_MAX_ROLES + 1])
+def test_top_n_out_of_range_is_rejected(top_n):
+    response = TestClient(main.app).post("/best-fit-roles", data={"resume_text": RESUME, "top_n": top_n})
+    assert response.status_code == 400
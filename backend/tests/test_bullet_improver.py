@@ -0,0 +1,68 @@
+import pytest
+from fastapi.testclient import TestClient
+
+import main
+
+BULLETS = ["Responsible for various server tasks", "• develop APIs that cut latency 40%"]
+
+
+@pytest.mark.parametrize("bullet, improved", [
+    ("Responsible for various server tasks", "Managed server tasks, reducing [latency/cost] by [X]%"),
+    ("• develop APIs that cut latency 40%", "Developed APIs that cut latency 40%"),
+    ("the new billing service", "Delivered the new billing service, reducing [latency/cost] by [X]%"),
+])
+def test_heuristic_rewrite(bullet, improved):
+    assert main.improve_bullet_heuristically(bullet, "software engineer") == improved
+
+
+def test_without_a_provider_bullets_are_rewritten_locally(monkeypatch):
+    monkeypatch.setattr(main, "llm_provider", None)
+    response = TestClient(main.app).post("/improve-bullet-points", data={"bullet_points": BULLETS, "job_title": "software engineer"})
+    # Formerly a 503; now a usable local result
+    assert response.status_code == 200
+    body = response.json()
+    assert body["message"] == main.AI_UNAVAILABLE_MESSAGE
+    assert body["improved_bullet_points"] == [
+        {"original": BULLETS[0], "improved": "Managed server tasks, reducing [latency/cost] by [X]%", "source": "heuristic"},
+        {"original": BULLETS[1], "improved": "Developed APIs that cut latency 40%", "source": "heuristic"},
+    ]
+
+
+def test_llm_results_are_marked_with_their_source():
+    body = TestClient(main.app).post("/improve-bullet-points", data={"bullet_points": BULLETS, "job_title": "software engineer"}).json()
+    assert [entry["source"] for entry in body["improved_bullet_points"]] == ["llm", "llm"]
+    assert "message" not in body
+
+
+def test_busy_llm_falls_back_for_the_remaining_bullets(monkeypatch):
+    calls = []
+
+    def improve(bullet, job_title):
+        calls.append(bullet)
+        if len(calls) > 1:
+            raise main.LLMUnavailableError("LLM circuit breaker is open", retry_after=5)
+        return "Built server tooling used by 40 engineers"
+
+    monkeypatch.setattr(main, "improve_bullet_with_llm", improve)
+    result = main._improve_bullets_internal(BULLETS + ["Helped with deployments"], "software engineer")
+    assert [entry["source"] for entry in result["improved_bullet_points"]] == ["llm", "heuristic", "heuristic"]
+    assert result["message"] == main.AI_DEGRADED_MESSAGE
+    # Once the gateway reports it is unavailable, no further LLM calls are made
+    assert len(calls) == 2
+
+
+def test_failed_bullet_is_rewritten_locally_with_an_error(monkeypatch):
+    def improve(bullet, job_title):
+        raise main.LLMError("bad gateway", status_code=502)
+
+    monkeypatch.setattr(main, "improve_bullet_with_llm", improve)
+    entry = main._improve_bullets_internal(BULLETS[:1], "software engineer")["improved_bullet_points"][0]
+    assert entry["source"] == "heuristic"
+    assert entry["error"] == main.AI_BULLET_ERROR_MESSAGE
+
+
+def test_preview_never_calls_the_llm(monkeypatch):
+    monkeypatch.setattr(main, "improve_bullet_with_llm", pytest.fail)
+    response = TestClient(main.app).post("/improve-bullet-points/preview", data={"bullet_points": BULLETS, "job_title": "software engineer"})
+    assert response.status_code == 200
+    assert [entry["source"] for entry in response.json()["improved_bullet_points"]] == ["heuristic", "heuristic"]
@@ -0,0 +1,28 @@
+import main
+
+
+BULLETS = [
+    "Architected a billing platform processing $2M monthly with 99.99% uptime",
+    "Responsible for various tasks",
+    "Led migration of 40 services to Kubernetes, cutting deploy time by 60%",
+    "Helped with documentation",
+    "Worked on the website",
+]
+
+
+def test_selection_keeps_resume_order():
+    selected = main.select_bullets_for_improvement(BULLETS, 2)
+    assert len(selected) == 2
+    assert selected == [bullet for bullet in BULLETS if bullet in selected]
+    assert "Responsible for various tasks" in selected
+
+
+def test_selection_skips_duplicates_and_strong_bullets():
+    selected = main.select_bullets_for_improvement(BULLETS + ["responsible for various tasks."], 10)
+    assert selected.count("Responsible for various tasks") == 1
+    assert "responsible for various tasks." not in selected
+
+
+def test_no_plan_means_no_limit():
+    assert main.bullet_limit_for_plan(None) is None
+    assert main.bullet_limit_for_plan("pro") == main.BULLET_LIMITS_BY_PLAN["pro"]
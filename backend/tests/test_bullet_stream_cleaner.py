@@ -0,0 +1,62 @@
+import pytest
+
+import main
+
+CHUNK_SIZES = (1, 2, 3, 5, 8, 13, 1000)
+
+REPLIES = {
+    "Reduced build time: from 20 minutes to 5 by parallelizing CI jobs":
+        "Reduced build time: from 20 minutes to 5 by parallelizing CI jobs",
+    "Improved version: Reduced build time by 75% by parallelizing CI jobs":
+        "Reduced build time by 75% by parallelizing CI jobs",
+    "**Improved Bullet Point:**\n\n• Led migration of 12 services to Kubernetes, cutting deploy time 60%\n\n"
+    "This improved version uses metrics.":
+        "Led migration of 12 services to Kubernetes, cutting deploy time 60%",
+    "Here's the improved bullet point:\nDesigned a Python ETL pipeline processing 2M rows daily":
+        "Designed a Python ETL pipeline processing 2M rows daily",
+    "Note-taking app built with Flutter reached 10k installs":
+        "Note-taking app built with Flutter reached 10k installs",
+    "Note: keep it short\nBuilt a React dashboard used by 200 analysts":
+        "Built a React dashboard used by 200 analysts",
+    "New CI pipeline: cut build time from 20 minutes to 5":
+        "cut build time from 20 minutes to 5",
+    "Newly launched search service handled 5k requests per second":
+        "Newly launched search service handled 5k requests per second",
+    '1. "Automated regression testing with Pytest, reducing release bugs by 40%"':
+        "Automated regression testing with Pytest, reducing release bugs by 40%",
+}
+
+
+def _stream(reply, size):
+    cleaner = main.BulletStreamCleaner()
+    deltas = []
+    for offset in range(0, len(reply), size):
+        delta = cleaner.feed(reply[offset:offset + size])
+        if delta:
+            deltas.append(delta)
+        if cleaner.done:
+            break
+    return cleaner.finish(), deltas
+
+
+@pytest.mark.parametrize("reply", list(REPLIES))
+def test_cleaned_bullet_does_not_depend_on_chunk_size(reply):
+    for size in CHUNK_SIZES:
+        bullet, deltas = _stream(reply, size)
+        assert bullet == REPLIES[reply], size
+        # Released text is only ever extended, so the client can append deltas as they come
+        assert "".join(deltas).strip() == bullet, size
+
+
+@pytest.mark.parametrize("reply", [
+    "Newly launched search service handled 5k requests per second",
+    "Note-taking app built with Flutter reached 10k installs",
+])
+def test_bullets_starting_like_a_preamble_or_note_still_stream(reply):
+    _, deltas = _stream(reply, 3)
+    assert len(deltas) > 1
+    assert len(deltas[0]) < len(reply) // 2
+
+
+def test_reply_without_a_bullet_is_empty():
+    assert _stream("Note: no changes needed", 4)[0] == ""
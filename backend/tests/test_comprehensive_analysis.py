@@ -0,0 +1,61 @@
+import io
+import json
+
+import numpy as np
+from docx import Document
+from fastapi.testclient import TestClient
+
+import main
+
+
+def _docx(*paragraphs) -> bytes:
+    document = Document()
+    for paragraph in paragraphs:
+        document.add_paragraph(paragraph)
+    buffer = io.BytesIO()
+    document.save(buffer)
+    return buffer.getvalue()
+
+
+RESUME = _docx("Jordan Lee", "Skills: Python, SQL, Docker", "• Built REST APIs on AWS serving 2M requests a day")
+DOCX_TYPE = "application/vnd.openxmlformats-officedocument.wordprocessingml.document"
+
+
+def _analyze(client, headers=None, **data):
+    return client.post(
+        "/comprehensive-analysis",
+        files={"file": ("resume.docx", RESUME, DOCX_TYPE)},
+        data={"job_title": "software engineer", **data},
+        headers=headers,
+    )
+
+
+def test_selected_fields_are_the_only_keys_returned():
+    response = _analyze(TestClient(main.app), fields="skills, ats", include_resume_text="false")
+    assert response.status_code == 200
+    # Sections keep the historical order whatever order they were asked for in
+    assert list(response.json()) == ["ats_analysis", "skill_gap_analysis"]
+
+
+def test_resume_text_can_be_left_out_of_a_full_analysis():
+    body = _analyze(TestClient(main.app), include_resume_text="false").json()
+    assert "resume_text" not in body
+    assert {"ats_analysis", "skill_gap_analysis", "bullet_point_improvements", "recommendations"} <= set(body)
+
+
+def test_unknown_field_is_rejected():
+    response = _analyze(TestClient(main.app), fields="ats,salary")
+    assert response.status_code == 400
+    assert "salary" in response.json()["detail"]
+
+
+def test_large_json_is_compressed_for_clients_that_accept_it():
+    response = _analyze(TestClient(main.app), headers={"Accept-Encoding": "br"})
+    assert response.status_code == 200
+    assert response.headers["content-encoding"] == "br"
+    assert response.json()["resume_text"].startswith("Jordan Lee")
+
+
+def test_fast_json_response_encodes_numpy_values_and_sets():
+    body = main.FastJSONResponse({"score": np.float32(0.5), "count": np.int64(3), "skills": {"sql"}}).body
+    assert json.loads(body) == {"score": 0.5, "count": 3, "skills": ["sql"]}
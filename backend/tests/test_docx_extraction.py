@@ -0,0 +1,68 @@
+import io
+
+from docx import Document
+from docx.shared import Inches
+
+import main
+
+
+def _save(document) -> io.BytesIO:
+    stream = io.BytesIO()
+    document.save(stream)
+    stream.seek(0)
+    return stream
+
+
+def _resume_document():
+    document = Document()
+    document.sections[0].header.paragraphs[0].text = "Jordan Lee | jordan@example.com"
+    document.add_paragraph("Experience")
+    role = document.add_paragraph()
+    role.paragraph_format.tab_stops.add_tab_stop(Inches(5))
+    role.add_run("Software Engineer, Acme Corp")
+    role.add_run("\t2020 - 2022")
+    # Tab stops alone must not add a tab to the text
+    summary = document.add_paragraph("Built Python APIs on AWS")
+    summary.paragraph_format.tab_stops.add_tab_stop(Inches(1))
+    table = document.add_table(rows=2, cols=2)
+    for row_index, row in enumerate(table.rows):
+        for column_index, cell in enumerate(row.cells):
+            cell.text = f"Skill {row_index}-{column_index}"
+    line_break = document.add_paragraph("Python")
+    line_break.add_run().add_break()
+    line_break.add_run("SQL")
+    return document
+
+
+def test_docx_text_matches_python_docx():
+    document = _resume_document()
+    expected = [paragraph.text for paragraph in document.sections[0].header.paragraphs]
+    body = document.paragraphs
+    expected += [paragraph.text for paragraph in body[:3]]
+    expected += [cell.text for row in document.tables[0].rows for cell in row.cells]
+    expected += [paragraph.text for paragraph in body[3:]]
+
+    assert main.extract_docx_text(_save(document)).splitlines() == "\n".join(expected).splitlines()
+
+
+def test_tab_stop_definitions_are_not_text():
+    text = main.extract_docx_text(_save(_resume_document()))
+    assert "Software Engineer, Acme Corp\t2020 - 2022\n" in text
+    assert "\nBuilt Python APIs on AWS\n" in text
+    assert "\t" not in text.replace("Acme Corp\t2020", "")
+
+
+def test_processed_elements_are_detached():
+    document = Document()
+    for index in range(200):
+        document.add_paragraph(f"Paragraph {index}").paragraph_format.tab_stops.add_tab_stop(Inches(2))
+    stream = _save(document)
+    with main.zipfile.ZipFile(stream) as package, package.open("word/document.xml") as xml_stream:
+        paragraphs = main._iter_docx_paragraphs(xml_stream)
+        for index in range(150):
+            assert next(paragraphs) == f"Paragraph {index}"
+        body = paragraphs.gi_frame.f_locals["open_elements"][1]
+        # Paragraphs read earlier are gone; the current one, any read-ahead and w:sectPr remain
+        assert body[0].tag == f"{main.WORD_NAMESPACE}p"
+        assert len(body) <= 52
+        assert list(paragraphs)[-1] == "Paragraph 199"
@@ -0,0 +1,160 @@
+import time
+
+import pytest
+
+import main
+
+
+def test_rate_budget_rejects_calls_over_the_request_limit():
+    budget = main.RateBudget(rpm_limit=2, tpm_limit=0)
+    budget.reserve(10, max_wait=0)
+    budget.reserve(10, max_wait=0)
+    with pytest.raises(main.LLMUnavailableError) as error:
+        budget.reserve(10, max_wait=0)
+    assert 0 < error.value.retry_after <= main.RateBudget.WINDOW_SECONDS
+
+
+def test_rate_budget_settle_frees_unused_tokens():
+    budget = main.RateBudget(rpm_limit=0, tpm_limit=100)
+    reservation = budget.reserve(80, max_wait=0)
+    with pytest.raises(main.LLMUnavailableError):
+        budget.reserve(30, max_wait=0)
+    budget.settle(reservation, 20)
+    budget.reserve(30, max_wait=0)
+    assert budget._tokens == 50
+
+
+def test_rate_budget_pause_holds_back_every_caller():
+    budget = main.RateBudget(rpm_limit=0, tpm_limit=0)
+    budget.pause(30)
+    with pytest.raises(main.LLMUnavailableError) as error:
+        budget.reserve(1, max_wait=0.01)
+    assert error.value.retry_after > 29
+
+
+def test_circuit_breaker_opens_after_consecutive_failures():
+    breaker = main.CircuitBreaker(failure_threshold=2, cooldown_seconds=60)
+    assert breaker.allow()
+    breaker.record_failure()
+    assert breaker.state == breaker.CLOSED
+    breaker.record_failure()
+    assert breaker.state == breaker.OPEN
+    assert not breaker.allow()
+    assert breaker.retry_after() > 59
+
+
+def test_circuit_breaker_success_resets_the_failure_count():
+    breaker = main.CircuitBreaker(failure_threshold=2, cooldown_seconds=60)
+    breaker.record_failure()
+    breaker.record_success()
+    breaker.record_failure()
+    assert breaker.state == breaker.CLOSED
+
+
+def test_circuit_breaker_half_open_allows_a_single_probe():
+    breaker = main.CircuitBreaker(failure_threshold=1, cooldown_seconds=0.01)
+    breaker.record_failure()
+    time.sleep(0.02)
+    assert breaker.allow()
+    assert breaker.state == breaker.HALF_OPEN
+    assert not breaker.allow()
+    breaker.record_success()
+    assert breaker.state == breaker.CLOSED
+    assert breaker.allow()
+
+
+def test_circuit_breaker_failed_probe_reopens():
+    breaker = main.CircuitBreaker(failure_threshold=3, cooldown_seconds=0.01)
+    for _ in range(3):
+        breaker.record_failure()
+    time.sleep(0.02)
+    assert breaker.allow()
+    breaker.record_failure()
+    assert breaker.state == breaker.OPEN
+    assert not breaker.allow()
+
+
+def test_circuit_breaker_released_probe_does_not_count_as_success():
+    breaker = main.CircuitBreaker(failure_threshold=1, cooldown_seconds=0.01)
+    breaker.record_failure()
+    time.sleep(0.02)
+    assert breaker.allow()
+    breaker.release_probe()
+    assert breaker.state == breaker.OPEN
+
+
+def test_circuit_breaker_released_probe_restarts_the_cooldown():
+    breaker = main.CircuitBreaker(failure_threshold=1, cooldown_seconds=0.2)
+    breaker.record_failure()
+    time.sleep(0.25)
+    assert breaker.allow()
+    breaker.release_probe()
+    # No second probe until another full cooldown has passed
+    assert not breaker.allow()
+    assert breaker.retry_after() > 0.1
+    time.sleep(0.25)
+    assert breaker.allow()
+
+
+class FlakyProvider(main.LLMProvider):
+    """Fails the first `failures` calls with the given status, then answers"""
+
+    def __init__(self, failures: int, status_code: int = 500):
+        self.failures = failures
+        self.status_code = status_code
+        self.calls = 0
+
+    def complete(self, prompt, model, temperature, max_tokens):
+        self.calls += 1
+        if self.calls <= self.failures:
+            raise main.LLMError("boom", status_code=self.status_code)
+        return main.LLMResponse("ok", 5, 1)
+
+
+@pytest.fixture
+def gateway(monkeypatch):
+    monkeypatch.setattr(main, "LLM_BACKOFF_BASE_SECONDS", 0)
+    return main.LLMGateway(rpm_limit=0, tpm_limit=0, max_retries=2, max_queue_wait=0)
+
+
+def test_gateway_retries_transient_failures(gateway):
+    provider = FlakyProvider(failures=2)
+    assert gateway.complete(provider, "x", "m", 0.5, 10).text == "ok"
+    assert provider.calls == 3
+    assert gateway.breaker.state == gateway.breaker.CLOSED
+
+
+def test_gateway_does_not_retry_client_errors(gateway):
+    provider = FlakyProvider(failures=1, status_code=400)
+    with pytest.raises(main.LLMError):
+        gateway.complete(provider, "x", "m", 0.5, 10)
+    assert provider.calls == 1
+
+
+def test_gateway_fails_fast_once_the_breaker_is_open(gateway):
+    gateway.breaker = main.CircuitBreaker(failure_threshold=1, cooldown_seconds=60)
+    provider = FlakyProvider(failures=10)
+    with pytest.raises(main.LLMError):
+        gateway.complete(provider, "x", "m", 0.5, 10)
+    calls = provider.calls
+    with pytest.raises(main.LLMUnavailableError):
+        gateway.complete(provider, "x", "m", 0.5, 10)
+    assert provider.calls == calls
+
+
+class EmptyStreamProvider(FlakyProvider):
+    """Streams that end before any content arrives"""
+
+    def stream(self, prompt, model, temperature, max_tokens):
+        self.calls += 1
+        yield from ()
+
+
+def test_gateway_treats_an_empty_stream_as_a_failure(gateway):
+    gateway.breaker = main.CircuitBreaker(failure_threshold=1, cooldown_seconds=60)
+    provider = EmptyStreamProvider(failures=0)
+    with pytest.raises(main.LLMError) as error:
+        list(gateway.stream(provider, "x", "m", 0.5, 10))
+    assert error.value.status_code == 502
+    assert provider.calls == 3
+    assert gateway.breaker.state == gateway.breaker.OPEN
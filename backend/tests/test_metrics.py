@@ -0,0 +1,32 @@
+from fastapi.testclient import TestClient
+
+import main
+
+
+def test_histogram_renders_cumulative_buckets():
+    histogram = main.Histogram("test_duration_seconds", "Test latency", ("stage",), buckets=(0.1, 1.0))
+    main.METRICS_REGISTRY.remove(histogram)
+    for value in (0.05, 0.5, 0.5, 5.0):
+        histogram.observe(value, stage='say "hi"')
+
+    assert histogram.render() == [
+        'test_duration_seconds_bucket{stage="say \\"hi\\"",le="0.1"} 1',
+        'test_duration_seconds_bucket{stage="say \\"hi\\"",le="1.0"} 3',
+        'test_duration_seconds_bucket{stage="say \\"hi\\"",le="+Inf"} 4',
+        'test_duration_seconds_sum{stage="say \\"hi\\""} 6.05',
+        'test_duration_seconds_count{stage="say \\"hi\\""} 4',
+    ]
+
+
+def test_metrics_label_requests_by_route_template():
+    client = TestClient(main.app)
+    assert client.post("/editor-session/unknown-session", data={"sections": "{}"}).status_code == 404
+
+    response = client.get("/metrics")
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/plain; version=0.0.4")
+    body = response.text
+    assert "# TYPE resuscan_http_request_duration_seconds histogram" in body
+    # Path parameters are collapsed into the route template
+    assert 'resuscan_http_requests_total{method="POST",route="/editor-session/{session_id}",status="404"}' in body
+    assert "unknown-session" not in body
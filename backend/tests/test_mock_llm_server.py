@@ -0,0 +1,39 @@
+import socket
+import threading
+import time
+
+import pytest
+import uvicorn
+
+import main
+from benchmarks import mock_llm_server
+
+
+@pytest.fixture(scope="module")
+def mock_server_url():
+    with socket.socket() as probe:
+        probe.bind(("127.0.0.1", 0))
+        port = probe.getsockname()[1]
+    server = uvicorn.Server(uvicorn.Config(mock_llm_server.app, host="127.0.0.1", port=port, log_level="warning"))
+    thread = threading.Thread(target=server.run, daemon=True)
+    thread.start()
+    while not server.started:
+        time.sleep(0.01)
+    yield f"http://127.0.0.1:{port}"
+    server.should_exit = True
+    thread.join(5)
+
+
+def test_mock_server_answers_completions_and_streams_alike(mock_server_url):
+    provider = main.GroqProvider(api_key="mock", base_url=mock_server_url)
+    prompt = "Improve this bullet.\nOriginal: built an internal API\n"
+    completed = provider.complete(prompt, "mock", 0.5, 200).text
+    streamed = list(provider.stream(prompt, "mock", 0.5, 200))
+    assert len(streamed) > 1
+    assert "".join(streamed) == completed
+
+
+def test_bullet_rewrite_through_the_mock_server_uses_the_llm(mock_server_url, monkeypatch):
+    monkeypatch.setattr(main, "llm_provider", main.GroqProvider(api_key="mock", base_url=mock_server_url))
+    improved = main.improve_bullet_with_llm("built an internal API", "software engineer")
+    assert improved.startswith("Built an internal API")
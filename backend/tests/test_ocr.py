@@ -0,0 +1,96 @@
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+from fastapi.testclient import TestClient
+
+import main
+
+
+@pytest.fixture
+def fake_ocr(monkeypatch):
+    """OCR through a thread pool and a fake recognizer; pages are plain strings"""
+    pool = ThreadPoolExecutor(max_workers=2)
+    recognized = {}
+
+    def recognize(png, language):
+        page = png.decode()
+        if page.startswith("slow"):
+            time.sleep(0.3)
+        if page.startswith("broken"):
+            raise RuntimeError("tesseract failed")
+        recognized[page] = True
+        return f"text of {page}"
+
+    monkeypatch.setattr(main, "pytesseract", object())
+    monkeypatch.setattr(main, "get_ocr_process_pool", lambda: pool)
+    monkeypatch.setattr(main, "_ocr_image", recognize)
+    monkeypatch.setattr(main, "_render_page_png", lambda page: page.encode())
+    monkeypatch.setattr(main, "_ocr_page_key", lambda page: f"test:{page}:{id(pool)}")
+    monkeypatch.setattr(main, "_ocr_slots", threading.BoundedSemaphore(2))
+    monkeypatch.setattr(main, "_ocr_documents", threading.BoundedSemaphore(2))
+    yield recognized
+    pool.shutdown(wait=True)
+
+
+def test_ocr_pages_returns_text_by_page_index(fake_ocr):
+    results, complete = main.ocr_pages([(0, "first"), (2, "second")])
+    assert results == {0: "text of first", 2: "text of second"}
+    assert complete
+
+
+def test_failed_page_marks_result_incomplete(fake_ocr):
+    results, complete = main.ocr_pages([(0, "first"), (1, "broken")])
+    assert results == {0: "text of first"}
+    assert not complete
+
+
+def test_full_page_slots_raise_busy_and_queued_pages_are_cached(fake_ocr):
+    with pytest.raises(main.OCRBusyError) as error:
+        main.ocr_pages([(0, "slow-a"), (1, "slow-b"), (2, "slow-c")])
+    assert error.value.retry_after > 0
+
+    time.sleep(0.5)
+    # The retry finds the queued pages in the page cache and only OCRs the one left out
+    results, complete = main.ocr_pages([(0, "slow-a"), (1, "slow-b"), (2, "slow-c")])
+    assert complete and len(results) == 3
+
+
+def test_document_limit_raises_busy(fake_ocr, monkeypatch):
+    monkeypatch.setattr(main, "_ocr_documents", threading.BoundedSemaphore(1))
+    main._ocr_documents.acquire()
+    with pytest.raises(main.OCRBusyError):
+        main.ocr_pages([(0, "first")])
+    assert "first" not in fake_ocr
+
+
+def test_ocr_timeout_raises_busy(fake_ocr, monkeypatch):
+    monkeypatch.setattr(main, "OCR_TIMEOUT_SECONDS", 0.05)
+    with pytest.raises(main.OCRBusyError):
+        main.ocr_pages([(0, "slow-timeout")])
+
+
+def test_busy_ocr_upload_gets_503_with_retry_after(monkeypatch):
+    def busy(stream, ext):
+        raise main.OCRBusyError(7.2)
+
+    monkeypatch.setattr(main, "extract_text_from_stream", busy)
+    response = TestClient(main.app).post("/upload-resume", files={"file": ("scan.pdf", b"%PDF-busy", "application/pdf")})
+    assert response.status_code == 503
+    assert response.headers["Retry-After"] == "8"
+
+
+def test_partial_text_is_not_cached(monkeypatch):
+    calls = []
+
+    def partial(stream, ext):
+        calls.append(ext)
+        return main.PartialText("Jordan Lee\nPython developer\n")
+
+    monkeypatch.setattr(main, "extract_text_from_stream", partial)
+    client = TestClient(main.app)
+    for _ in range(2):
+        response = client.post("/upload-resume", files={"file": ("scan.pdf", b"%PDF-partial", "application/pdf")})
+        assert response.json()["resume_text"] == "Jordan Lee\nPython developer\n"
+    assert len(calls) == 2
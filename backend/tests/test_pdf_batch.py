@@ -0,0 +1,45 @@
+import io
+import json
+import zipfile
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+from fastapi.testclient import TestClient
+
+import main
+
+
+@pytest.fixture
+def thread_render_pool(monkeypatch):
+    """Render in threads; the fork server pool is covered by the smoke benchmarks"""
+    pool = ThreadPoolExecutor(max_workers=2)
+    monkeypatch.setattr(main, "get_pdf_process_pool", lambda: pool)
+    yield
+    pool.shutdown(wait=True)
+
+
+def test_batch_streams_a_zip_with_one_file_or_error_per_item(thread_render_pool):
+    resume = {"name": "Jordan Lee", "email": "jordan@example.com", "skills": ["Python", "SQL"]}
+    items = [
+        {"resume_data": resume, "filename": "jordan lee"},
+        {"resume_data": resume, "output_format": "docx"},
+        {"version_id": "missing-version"},
+        {"resume_data": resume, "output_format": "rtf"},
+    ]
+    response = TestClient(main.app).post("/generate-resume-pdf-batch", data={"items": json.dumps(items)})
+    assert response.status_code == 200
+    assert response.headers["content-type"] == "application/zip"
+
+    archive = zipfile.ZipFile(io.BytesIO(response.content))
+    assert sorted(archive.namelist()) == [
+        "0001_jordan_lee.pdf", "0002_resume_2.docx", "0003_resume_3.error.txt", "0004_resume_4.error.txt",
+    ]
+    assert archive.read("0001_jordan_lee.pdf").startswith(b"%PDF")
+    assert b"not found" in archive.read("0003_resume_3.error.txt")
+    assert b"Unsupported format" in archive.read("0004_resume_4.error.txt")
+
+
+@pytest.mark.parametrize("items", ["[]", "{}", "not json"])
+def test_invalid_batch_is_rejected(items):
+    response = TestClient(main.app).post("/generate-resume-pdf-batch", data={"items": items})
+    assert response.status_code == 400
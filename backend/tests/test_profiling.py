@@ -0,0 +1,71 @@
+import asyncio
+import time
+
+import pytest
+from fastapi.testclient import TestClient
+
+import main
+
+RESUME = (
+    "Jordan Lee\nSoftware Engineer\nExperience\n"
+    "• Built Python APIs on AWS with Docker, cutting latency by 30%\n"
+    "Skills\nPython, SQL, React, Machine Learning"
+)
+
+
+@pytest.fixture
+def admin_client(monkeypatch):
+    monkeypatch.setattr(main, "ADMIN_TOKEN", "secret")
+    return TestClient(main.app)
+
+
+def test_cprofile_report_names_threadpool_functions(admin_client):
+    response = admin_client.post(
+        "/analyze-ats",
+        data={"resume_text": RESUME, "job_title": "profiling engineer"},
+        headers={"X-Profile": "cprofile", "X-Admin-Token": "secret"},
+    )
+    assert response.status_code == 200
+    profile_id = response.headers["X-Profile-Id"]
+
+    profiles = admin_client.get("/admin/profiles", headers={"X-Admin-Token": "secret"}).json()["profiles"]
+    profile = next(profile for profile in profiles if profile["id"] == profile_id)
+    names = [entry["function"] for entry in profile["main_py_functions"]]
+    # The scoring runs in run_in_threadpool, outside the event-loop thread
+    assert any(name.startswith("main.py:_analyze_ats_internal:") for name in names)
+
+    download = admin_client.get(f"/admin/profiles/{profile_id}", headers={"X-Admin-Token": "secret"})
+    assert download.status_code == 200 and download.content
+
+
+def _busy(seconds):
+    deadline = time.perf_counter() + seconds
+    while time.perf_counter() < deadline:
+        pass
+
+
+def _profiled_work():
+    _busy(0.2)
+
+
+def _other_request_work():
+    _busy(0.2)
+
+
+def test_sampler_only_records_the_profiled_requests_threads():
+    async def scenario():
+        loop = asyncio.get_running_loop()
+        with main.StackSampler(interval=0.002, loop=loop, task=asyncio.current_task()) as sampler:
+            # Another request's threadpool work, started outside the profiled context
+            other = loop.run_in_executor(None, _other_request_work)
+            token = main._request_profile.set(main.RequestProfile("sample", sampler))
+            try:
+                await main.run_in_threadpool(_profiled_work)
+            finally:
+                main._request_profile.reset(token)
+            await other
+        return sampler.collapsed()
+
+    collapsed = asyncio.run(scenario())
+    assert "test_profiling.py:_profiled_work" in collapsed
+    assert "_other_request_work" not in collapsed
@@ -0,0 +1,74 @@
+import asyncio
+
+import main
+
+
+def test_concurrent_callers_share_one_computation():
+    calls = []
+
+    async def work(value):
+        calls.append(value)
+        await asyncio.sleep(0.05)
+        return value * 2
+
+    async def scenario():
+        flights = main.SingleFlight()
+        results = await asyncio.gather(*[flights.run(("test", 1), work, 21) for _ in range(5)])
+        return results, flights.in_flight()
+
+    results, in_flight = asyncio.run(scenario())
+    assert results == [42] * 5
+    assert calls == [21]
+    assert in_flight == 0
+
+
+def test_cancelled_leader_does_not_cancel_followers():
+    async def work():
+        await asyncio.sleep(0.05)
+        return "done"
+
+    async def scenario():
+        flights = main.SingleFlight()
+        leader = asyncio.ensure_future(flights.run(("test",), work))
+        follower = asyncio.ensure_future(flights.run(("test",), work))
+        await asyncio.sleep(0.01)
+        leader.cancel()
+        return await follower
+
+    assert asyncio.run(scenario()) == "done"
+
+
+def test_work_is_cancelled_when_every_caller_leaves():
+    state = {}
+
+    async def work():
+        try:
+            await asyncio.sleep(1)
+        except asyncio.CancelledError:
+            state["cancelled"] = True
+            raise
+
+    async def scenario():
+        flights = main.SingleFlight()
+        callers = [asyncio.ensure_future(flights.run(("test",), work)) for _ in range(2)]
+        await asyncio.sleep(0.01)
+        for caller in callers:
+            caller.cancel()
+        await asyncio.sleep(0.01)
+        return flights.in_flight()
+
+    assert asyncio.run(scenario()) == 0
+    assert state == {"cancelled": True}
+
+
+def test_errors_reach_every_caller():
+    async def work():
+        await asyncio.sleep(0.01)
+        raise ValueError("parse failed")
+
+    async def scenario():
+        flights = main.SingleFlight()
+        return await asyncio.gather(*[flights.run(("test",), work) for _ in range(3)], return_exceptions=True)
+
+    results = asyncio.run(scenario())
+    assert all(isinstance(result, ValueError) for result in results)
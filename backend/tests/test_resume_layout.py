@@ -0,0 +1,15 @@
+from concurrent.futures import ThreadPoolExecutor
+
+import main
+
+
+def test_layout_cache_is_safe_to_share_between_threads(monkeypatch):
+    # A tiny cache evicts on almost every miss, racing the other threads' lookups
+    monkeypatch.setattr(main, "LAYOUT_CACHE_SIZE", 2)
+    monkeypatch.setattr(main, "_layout_cache", main.OrderedDict())
+    resumes = [{"name": f"Candidate {index}", "skills": ["Python", "SQL"]} for index in range(6)]
+
+    with ThreadPoolExecutor(max_workers=8) as pool:
+        layouts = list(pool.map(lambda index: main.build_resume_layout(resumes[index % 6]), range(600)))
+    assert [layout.name for layout in layouts] == [f"Candidate {index % 6}" for index in range(600)]
+    assert len(main._layout_cache) <= 2
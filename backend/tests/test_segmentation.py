@@ -0,0 +1,27 @@
+import pytest
+
+import main
+
+
+@pytest.mark.parametrize("line, bullet", [
+    ("• Built the billing API", "Built the billing API"),
+    ("- Reduced costs by 20%", "Reduced costs by 20%"),
+    ("1. Led a team of five", "Led a team of five"),
+    ("2) Shipped the mobile app", "Shipped the mobile app"),
+])
+def test_bullet_markers_are_stripped(line, bullet):
+    match = main.BULLET_PATTERN.match(line)
+    assert match and line[match.end():] == bullet
+
+
+@pytest.mark.parametrize("line", ["3.5 GPA", "1.5 years of experience", "2020 - 2022", "10x faster builds"])
+def test_numbers_are_not_bullet_markers(line):
+    assert main.BULLET_PATTERN.match(line) is None
+
+
+def test_resume_model_keeps_numeric_lines_intact():
+    model = main.build_resume_model("EDUCATION\nBSc Computer Science\n3.5 GPA\nEXPERIENCE\nAcme Corp\n1. Built the billing API")
+    education, experience = model.sections
+    assert "3.5 GPA" in education.lines
+    assert not any(entry.bullets for entry in education.entries)
+    assert experience.entries[0].bullets == ["Built the billing API"]
@@ -0,0 +1,145 @@
+import asyncio
+import json
+import sqlite3
+import time
+
+from fastapi.testclient import TestClient
+
+import main
+
+
+def test_version_store_round_trip(tmp_path):
+    store = main.ResumeVersionStore(str(tmp_path / "versions.db"), str(tmp_path / "missing.json"))
+    store["v1"] = {"name": "First", "updated_at": "2024-01-01T00:00:00"}
+    store.update_many({"v2": {"name": "Second"}, "v3": {"name": "Third"}})
+    del store["v3"]
+
+    reopened = main.ResumeVersionStore(str(tmp_path / "versions.db"), str(tmp_path / "missing.json"))
+    assert reopened["v1"] == {"name": "First", "updated_at": "2024-01-01T00:00:00"}
+    assert "v2" in reopened and "v3" not in reopened
+    assert sorted(reopened) == ["v1", "v2"]
+    assert dict(reopened.items())["v2"] == {"name": "Second"}
+
+
+def test_version_store_imports_legacy_json_once(tmp_path):
+    legacy_path = tmp_path / "resume_versions.json"
+    legacy_path.write_text(json.dumps({"old": {"name": "Legacy", "updated_at": "2023-05-01T00:00:00"}}))
+
+    store = main.ResumeVersionStore(str(tmp_path / "versions.db"), str(legacy_path))
+    assert store["old"]["name"] == "Legacy"
+
+    # An existing database is never overwritten by the legacy file
+    del store["old"]
+    store["new"] = {"name": "New"}
+    reopened = main.ResumeVersionStore(str(tmp_path / "versions.db"), str(legacy_path))
+    assert list(reopened) == ["new"]
+
+
+def test_shared_rate_limiter_buckets_are_shared_between_instances(tmp_path):
+    db = main.SQLiteConnections(str(tmp_path / "state.db"), [
+        "CREATE TABLE rate_limit_buckets (client TEXT PRIMARY KEY, tokens REAL NOT NULL, updated_at REAL NOT NULL)"
+    ])
+    # Two limiters on one database stand in for two pre-forked workers
+    first = main.SharedClientRateLimiter(rate_per_minute=1, burst=2, db=db)
+    second = main.SharedClientRateLimiter(rate_per_minute=1, burst=2, db=db)
+    assert first.take("client") == 0
+    assert second.take("client") == 0
+    assert first.take("client") > 0
+    assert second.take("other") == 0
+
+
+def test_shared_rate_limit_check_does_not_block_the_event_loop(tmp_path):
+    path = str(tmp_path / "state.db")
+    db = main.SQLiteConnections(path, [
+        "CREATE TABLE rate_limit_buckets (client TEXT PRIMARY KEY, tokens REAL NOT NULL, updated_at REAL NOT NULL)"
+    ])
+    limiter = main.SharedClientRateLimiter(rate_per_minute=60, burst=5, db=db)
+    # Another worker holds the database write lock for a while
+    other_worker = sqlite3.connect(path, isolation_level=None)
+    other_worker.execute("BEGIN IMMEDIATE")
+
+    async def scenario():
+        ticks = 0
+        check = asyncio.ensure_future(limiter.check("client"))
+        started = time.monotonic()
+        while time.monotonic() - started < 0.3:
+            await asyncio.sleep(0.01)
+            ticks += 1
+        assert not check.done()
+        other_worker.execute("COMMIT")
+        return ticks, await check
+
+    ticks, wait = asyncio.run(scenario())
+    assert ticks >= 10
+    assert wait == 0
+
+
+def test_editor_session_continues_after_another_worker_saves():
+    client = TestClient(main.app)
+    started = client.post("/editor-session", data={
+        "job_title": "software engineer",
+        "sections": json.dumps({"summary": "Python developer", "skills": "SQL"})
+    }).json()
+    session_id = started["session_id"]
+
+    # Another worker's edit reaches the store without touching this worker's copy
+    other_worker = main.EditorSession("software engineer")
+    other_worker.sync(*main.editor_session_store.load(session_id))
+    other_worker.apply({"skills": "SQL, Docker, AWS"})
+    assert main.editor_session_store.save(session_id, other_worker)
+
+    updated = client.post(f"/editor-session/{session_id}", data={
+        "sections": json.dumps({"summary": "Python and React developer"})
+    }).json()
+    assert updated["updated_sections"] == ["summary"]
+    session = main.get_editor_session(session_id)
+    assert session.sections == {"summary": "Python and React developer", "skills": "SQL, Docker, AWS"}
+
+    expected = main._skill_gap_internal(session.resume_text(), "software engineer")
+    assert updated["skill_gap_analysis"]["resume_skills"] == expected["resume_skills"]
+
+    assert client.delete(f"/editor-session/{session_id}").status_code == 200
+    assert client.post(f"/editor-session/{session_id}", data={"sections": "{}"}).status_code == 404
+
+
+def test_editor_session_endpoints_store_sessions_off_the_event_loop(monkeypatch):
+    loops = []
+
+    def on_loop():
+        try:
+            asyncio.get_running_loop()
+            loops.append(True)
+        except RuntimeError:
+            loops.append(False)
+
+    create, update = main.create_editor_session, main.update_stored_editor_session
+    monkeypatch.setattr(main, "create_editor_session", lambda *args: (on_loop(), create(*args))[1])
+    monkeypatch.setattr(main, "update_stored_editor_session", lambda *args: (on_loop(), update(*args))[1])
+
+    client = TestClient(main.app)
+    session_id = client.post("/editor-session", data={
+        "job_title": "software engineer", "sections": json.dumps({"skills": "SQL"})
+    }).json()["session_id"]
+    assert client.post(f"/editor-session/{session_id}", data={"sections": json.dumps({"skills": "SQL, AWS"})}).status_code == 200
+    assert loops == [False, False]
+
+
+def test_live_ats_rescores_off_the_event_loop(monkeypatch):
+    loops = []
+    apply = main._apply_editor_changes
+
+    def rescore(*args):
+        try:
+            asyncio.get_running_loop()
+            loops.append(True)
+        except RuntimeError:
+            loops.append(False)
+        return apply(*args)
+
+    monkeypatch.setattr(main, "_apply_editor_changes", rescore)
+    with TestClient(main.app).websocket_connect("/ws/live-ats?job_title=software%20engineer") as websocket:
+        for skills in ("SQL", "SQL, Docker"):
+            websocket.send_text(json.dumps({"sections": {"skills": skills}}))
+            reply = websocket.receive_json()
+            assert reply["type"] == "analysis"
+    assert loops == [False, False]
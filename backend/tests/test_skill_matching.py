@@ -0,0 +1,43 @@
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+import main
+
+
+@pytest.mark.parametrize("text, expected", [
+    ("Skills: Python, R, SQL", {"python", "r", "sql"}),
+    ("Statistical modelling in R", {"r"}),
+    ("Languages (R) and Go", {"r"}),
+])
+def test_one_letter_skill_matches_as_a_standalone_word(text, expected):
+    assert expected <= set(main.match_resume_skills(text))
+
+
+@pytest.mark.parametrize("text", [
+    "Led R&D for the payments team",
+    "Worked with J. R. Smith on the rollout",
+    "Rebalanced every node in the storage cluster",
+])
+def test_fragments_and_prose_do_not_match_skills(text):
+    matched = set(main.match_resume_skills(text))
+    assert "r" not in matched
+    assert "node.js" not in matched
+
+
+def test_node_js_spellings_still_match():
+    assert "node.js" in main.match_resume_skills("APIs in Node.js")
+    assert "node.js" in main.match_resume_skills("APIs in nodejs")
+
+
+def test_phrase_cache_is_safe_to_share_between_threads(monkeypatch):
+    shared = main.get_skill_index()
+    index = main.SkillIndex(shared.variants, shared.labels, shared.matrix)
+    # A tiny cache is cleared on almost every miss, racing the other threads' lookups
+    monkeypatch.setattr(main, "SKILL_PHRASE_CACHE_SIZE", 2)
+    phrases = ["kubernetes cluster", "postgres database", "react frontend", "amazon web services"]
+    expected = index.match_phrases(phrases)
+
+    with ThreadPoolExecutor(max_workers=8) as pool:
+        results = list(pool.map(lambda offset: index.match_phrases(phrases[offset % 4:] + phrases[:offset % 4]), range(400)))
+    assert all(result == expected for result in results)
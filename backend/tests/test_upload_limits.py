@@ -0,0 +1,59 @@
+from fastapi import FastAPI, File, UploadFile
+from fastapi.testclient import TestClient
+
+import main
+
+BOUNDARY = "resuscan-test-boundary"
+
+
+def make_client(max_bytes: int) -> TestClient:
+    app = FastAPI()
+
+    @app.post("/upload")
+    async def upload(file: UploadFile = File(...)):
+        return {"size": len(await file.read())}
+
+    app.add_middleware(main.UploadSizeLimitMiddleware, max_bytes=max_bytes)
+    return TestClient(app)
+
+
+def multipart_body(payload: bytes) -> bytes:
+    return (
+        f"--{BOUNDARY}\r\nContent-Disposition: form-data; name=\"file\"; filename=\"r.pdf\"\r\n"
+        f"Content-Type: application/pdf\r\n\r\n"
+    ).encode() + payload + f"\r\n--{BOUNDARY}--\r\n".encode()
+
+
+def test_upload_within_the_limit_is_accepted():
+    response = make_client(4096).post("/upload", files={"file": ("r.pdf", b"x" * 1000)})
+    assert response.status_code == 200
+    assert response.json() == {"size": 1000}
+
+
+def test_declared_content_length_over_the_limit_is_rejected():
+    response = make_client(4096).post("/upload", files={"file": ("r.pdf", b"x" * 10_000)})
+    assert response.status_code == 413
+    assert "byte limit" in response.json()["detail"]
+
+
+def test_streamed_body_over_the_limit_is_rejected():
+    body = multipart_body(b"x" * 10_000)
+
+    def chunks():
+        # No Content-Length: the body arrives chunked and is counted as it is received
+        for start in range(0, len(body), 1024):
+            yield body[start:start + 1024]
+
+    response = make_client(4096).post(
+        "/upload", content=chunks(), headers={"Content-Type": f"multipart/form-data; boundary={BOUNDARY}"}
+    )
+    assert response.status_code == 413
+
+
+def test_app_rejects_oversized_resume_uploads():
+    response = TestClient(main.app).post(
+        "/upload-resume",
+        headers={"Content-Length": str(main.MAX_REQUEST_BYTES + 1), "Content-Type": f"multipart/form-data; boundary={BOUNDARY}"},
+        content=multipart_body(b"x"),
+    )
+    assert response.status_code == 413
@@ -70,6 +70,46 @@ export const resumeAPI = {
     return response.data;
   },
 
+  // Improve bullet points, receiving each rewrite as it is generated.
+  // onEvent(type, data) is called for "start", "delta", "bullet" and "done" events.
+  improveBulletPointsStream: async (bulletPoints, jobTitle, onEvent) => {
+    const formData = new FormData();
+    bulletPoints.forEach((bullet) => {
+      formData.append("bullet_points", bullet);
+    });
+    formData.append("job_title", jobTitle);
+
+    // axios buffers the whole body in the browser, so read the event stream with fetch
+    const response = await fetch(`${API_BASE_URL}/improve-bullet-points/stream`, {
+      method: "POST",
+      body: formData,
+    });
+    if (!response.ok) {
+      throw new Error(`Bullet improvement failed with status ${response.status}`);
+    }
+
+    const reader = response.body.getReader();
+    const decoder = new TextDecoder();
+    let buffer = "";
+    for (;;) {
+      const { value, done } = await reader.read();
+      if (done) break;
+      buffer += decoder.decode(value, { stream: true });
+      let boundary;
+      while ((boundary = buffer.indexOf("\n\n")) >= 0) {
+        const message = buffer.slice(0, boundary);
+        buffer = buffer.slice(boundary + 2);
+        let type = "message";
+        let data = "";
+        message.split("\n").forEach((line) => {
+          if (line.startsWith("event: ")) type = line.slice(7);
+          else if (line.startsWith("data: ")) data += line.slice(6);
+        });
+        onEvent(type, data ? JSON.parse(data) : {});
+      }
+    }
+  },
+
   // Get project and course recommendations
   getRecommendations: async (missingSkills, jobTitle) => {
     const formData = new FormData();